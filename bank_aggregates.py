@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+
+"""
+@Date: 2026-10-18
+
+This file keeps running balance totals bank-wide, per product type and per
+customer, so dashboards can read total deposits, card debt and loan exposure
+without scanning the account dictionaries.
+
+The totals are computed once when a product dictionary is tracked.  After
+that, every deposit, withdraw, make_purchase, withdraw_cash, apply_interest
+and make_payment updates them in O(1) through the movement listeners in
+"bank_classes_and_io_funcs.py", and accounts added to or removed from the
+EntityDict returned by track() are added or taken out of the totals.
+
+The registry remembers the last balance it saw for every account and adds
+the difference to the current balance.  Fees, interest and the bulk updates
+of "bank_transactions.py" and "bank_month_end.py" are therefore counted
+exactly once, however the movement was reported.  Running float sums drift
+by rounding over millions of updates; rebuild() recomputes them from the
+tracked dictionaries.  In the cents money mode of "bank_money.py" the totals
+are int cents and stay exact.
+
+Example:
+    aggregates = AggregateRegistry()
+    checking_acct_objects_dict = aggregates.track('checking', load_checking_file_to_dict(infile))
+    loan_acct_objects_dict = aggregates.track('loans', load_loan_file_to_dict(loanfile))
+    aggregates.attach()
+    checking_acct_objects_dict['168555105'].deposit(700)
+    aggregates.total_deposits(), aggregates.customer_totals('600003'), aggregates.snapshot()
+
+"""
+
+import math
+import threading
+
+from bank_classes_and_io_funcs import add_movement_listener, remove_movement_listener, logger
+from bank_customer_index import PRODUCT_TYPES, DEPOSIT_TYPES, DEBT_TYPES
+from bank_entity_dict import EntityDict, MISSING
+from bank_money import is_cents_mode
+
+
+class AggregateRegistry:
+    """Running balance totals and account counts, bank-wide, per product type and per customer."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stores = {}
+        self._reset()
+
+    def _reset(self):
+        # int totals in cents mode keep them exact; fsum limits the float rounding
+        self._zero, self._sum = (0, sum) if is_cents_mode() else (0.0, math.fsum)
+        self._totals = {ptype: self._zero for ptype in PRODUCT_TYPES}
+        self._counts = {ptype: 0 for ptype in PRODUCT_TYPES}
+        self._customers = {}
+        # account object -> [product type, customer id, last balance seen]
+        self._accounts = {}
+
+    ##### building the totals
+    def track(self, product_type, data_dict):
+        """Adds every account of data_dict to the totals and keeps following it.
+
+        Returns an EntityDict holding the accounts.  Use it in place of
+        data_dict so that later additions and removals reach the totals.
+        """
+        if product_type not in PRODUCT_TYPES:
+            raise ValueError(f"Unknown product type {product_type!r}. Expected one of {', '.join(PRODUCT_TYPES)}.")
+        if not isinstance(data_dict, EntityDict):
+            data_dict = EntityDict(data_dict)
+        with self._lock:
+            for obj in data_dict.values():
+                self._add(product_type, obj)
+        self._stores[product_type] = data_dict
+        data_dict.add_listener(_AggregateListener(self, product_type))
+        return data_dict
+
+    def rebuild(self):
+        """Recomputes every total from the tracked dictionaries."""
+        with self._lock:
+            self._reset()
+            for product_type, data_dict in self._stores.items():
+                balances = {}
+                for obj in data_dict.values():
+                    self._accounts[obj] = [product_type, obj.customer_id, obj.balance]
+                    balances.setdefault(obj.customer_id, []).append(obj.balance)
+                for cust_id, values in balances.items():
+                    self._customer(cust_id)[product_type] = self._sum(values)
+                self._totals[product_type] = self._sum(obj.balance for obj in data_dict.values())
+                self._counts[product_type] = len(data_dict)
+        logger.info("Aggregates rebuilt for %d accounts.", len(self._accounts))
+
+    def _customer(self, cust_id):
+        totals = self._customers.get(cust_id)
+        if totals is None:
+            totals = self._customers[cust_id] = {ptype: self._zero for ptype in PRODUCT_TYPES}
+        return totals
+
+    def _add(self, product_type, obj):
+        if obj in self._accounts:
+            self._remove(obj)
+        self._accounts[obj] = [product_type, obj.customer_id, obj.balance]
+        self._totals[product_type] += obj.balance
+        self._counts[product_type] += 1
+        self._customer(obj.customer_id)[product_type] += obj.balance
+
+    def _remove(self, obj):
+        entry = self._accounts.pop(obj, None)
+        if entry is None:
+            return
+        product_type, cust_id, balance = entry
+        self._totals[product_type] -= balance
+        self._counts[product_type] -= 1
+        self._customers[cust_id][product_type] -= balance
+
+    def add(self, product_type, obj):
+        with self._lock:
+            self._add(product_type, obj)
+
+    def remove(self, obj):
+        with self._lock:
+            self._remove(obj)
+
+    ##### movement listener
+    def on_movement(self, obj, op, amount, old_balance=None):
+        """Adds the change in obj's balance since it was last seen.  Matches the movement listener signature."""
+        entry = self._accounts.get(obj)
+        if entry is None:
+            # not in a tracked dictionary
+            return
+        with self._lock:
+            balance = obj.balance
+            delta = balance - entry[2]
+            entry[2] = balance
+            self._totals[entry[0]] += delta
+            self._customers[entry[1]][entry[0]] += delta
+
+    __call__ = on_movement
+
+    def attach(self):
+        add_movement_listener(self)
+
+    def detach(self):
+        try:
+            remove_movement_listener(self)
+        except ValueError:
+            pass
+
+    def __enter__(self):
+        self.attach()
+        return self
+
+    def __exit__(self, *exc):
+        self.detach()
+
+    ##### totals
+    def total(self, product_type):
+        """Total balance of all accounts of product_type."""
+        return self._totals[product_type]
+
+    def count(self, product_type):
+        return self._counts[product_type]
+
+    def total_deposits(self):
+        """Checking plus savings balances, bank-wide."""
+        return sum(self._totals[ptype] for ptype in DEPOSIT_TYPES)
+
+    def total_debt(self):
+        """Credit card plus loan balances, bank-wide."""
+        return sum(self._totals[ptype] for ptype in DEBT_TYPES)
+
+    def customer_total(self, cust_id, product_type):
+        totals = self._customers.get(cust_id)
+        return totals[product_type] if totals is not None else self._zero
+
+    def customer_totals(self, cust_id):
+        """{product type -> total balance} for cust_id, plus total_deposits and total_debt."""
+        with self._lock:
+            totals = dict(self._customers.get(cust_id) or {ptype: self._zero for ptype in PRODUCT_TYPES})
+        totals['total_deposits'] = sum(totals[ptype] for ptype in DEPOSIT_TYPES)
+        totals['total_debt'] = sum(totals[ptype] for ptype in DEBT_TYPES)
+        return totals
+
+    def snapshot(self):
+        """Bank-wide totals and counts per product type, read consistently."""
+        with self._lock:
+            snapshot = {f"{ptype}_total": self._totals[ptype] for ptype in PRODUCT_TYPES}
+            snapshot.update({f"{ptype}_count": self._counts[ptype] for ptype in PRODUCT_TYPES})
+        snapshot['total_deposits'] = sum(snapshot[f"{ptype}_total"] for ptype in DEPOSIT_TYPES)
+        snapshot['total_debt'] = sum(snapshot[f"{ptype}_total"] for ptype in DEBT_TYPES)
+        return snapshot
+
+
+class _AggregateListener:
+    def __init__(self, registry, product_type):
+        self.registry = registry
+        self.product_type = product_type
+
+    def on_set(self, key, old, new):
+        with self.registry._lock:
+            if old is not MISSING:
+                self.registry._remove(old)
+            self.registry._add(self.product_type, new)
+
+    def on_delete(self, key, old):
+        self.registry.remove(old)
+
+
+### EOF
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+
+"""
+@Date: 2026-10-18
+
+This file computes month-by-month amortization schedules for the whole loan
+book at once, instead of one LoanAccount at a time.
+
+For every loan the schedule holds, per month:
+1. payment    the monthly payment from LoanAccount.get_monthly_payment; the
+              last payment is adjusted so the loan is paid off exactly
+2. interest   remaining balance * annual_interest_rate/12, rounded to cents
+3. principal  payment - interest
+4. balance    remaining balance after the payment
+
+Each of these is a NumPy array of shape (loans, months), where months is the
+longest term in the book.  Months after a loan's term are zero.
+
+Schedules depend only on (annual_interest_rate, loan_amount, months), so each
+distinct combination is computed once, across all such combinations at the
+same time, and cached for later calls.  Loans with the same terms share one
+computed schedule.  The cache keeps the MAX_CACHED_TERMS most recently
+computed terms.
+
+Schedules are in float dollars.  In the cents money mode of "bank_money.py"
+the loan amounts are converted from cents first.
+
+Example:
+    schedule = amortize_loans(loan_acct_objects_dict)
+    schedule.row('555-678-101')['balance'][:12]
+    schedule.balance_at(24)      # remaining balance of every loan after 2 years
+
+"""
+
+import numpy as np
+
+from bank_classes_and_io_funcs import monthly_payment, logger
+from bank_money import CENTS, get_money_mode, from_cents
+
+
+FIELDS = ('payment', 'interest', 'principal', 'balance')
+
+MAX_CACHED_TERMS = 100000
+
+# (money mode, rate, amount, months) -> {field: 1-d array of length months}; the
+# mode is part of the key because an amount of 1000000 is $1,000,000 or $10,000
+_schedule_cache = {}
+
+
+def clear_schedule_cache():
+    _schedule_cache.clear()
+
+
+def _compute_schedules(terms):
+    """Computes the schedules for a list of (money mode, rate, amount, months) in one vectorized pass."""
+    dollar_terms = [(rate, from_cents(amount) if mode == CENTS else amount, months)
+                    for mode, rate, amount, months in terms]
+    rates = np.array([t[0] for t in dollar_terms], dtype=np.float64)/12
+    balance = np.array([t[1] for t in dollar_terms], dtype=np.float64)
+    months = np.array([t[2] for t in dollar_terms], dtype=np.int64)
+    payments = np.array([monthly_payment(*t) for t in dollar_terms], dtype=np.float64)
+    horizon = int(months.max())
+
+    out = {field: np.zeros((len(terms), horizon)) for field in FIELDS}
+    for m in range(horizon):
+        active = m < months
+        interest = np.round(balance*rates, 2)
+        # the final payment (or any payment larger than what is owed) clears the loan
+        payoff = balance + interest
+        payment = np.where((m == months - 1) | (payments > payoff), payoff, payments)
+        payment = np.where(active, payment, 0.0)
+        interest = np.where(active, interest, 0.0)
+        principal = payment - interest
+        balance = np.round(balance - principal, 2)
+
+        out['payment'][:, m] = payment
+        out['interest'][:, m] = interest
+        out['principal'][:, m] = principal
+        out['balance'][:, m] = balance
+
+    computed = {term: {field: out[field][i, :term[3]] for field in FIELDS} for i, term in enumerate(terms)}
+    _schedule_cache.update(computed)
+    # drop the oldest terms beyond the bound
+    for term in list(_schedule_cache)[:max(0, len(_schedule_cache) - MAX_CACHED_TERMS)]:
+        del _schedule_cache[term]
+    return computed
+
+
+class AmortizationSchedule:
+    """Schedules of many loans as (loans, months) arrays."""
+
+    def __init__(self, keys, payment, interest, principal, balance, months):
+        self.keys = keys
+        self.payment = payment
+        self.interest = interest
+        self.principal = principal
+        self.balance = balance
+        self.months = months
+        self._index = {key: i for i, key in enumerate(keys)}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def row(self, key):
+        """Returns {field: array} with the schedule of one loan, up to the end of its term."""
+        i = self._index[key]
+        n = self.months[i]
+        return {field: getattr(self, field)[i, :n] for field in FIELDS}
+
+    def balance_at(self, month):
+        """Remaining balance of every loan after the given number of payments."""
+        if month <= 0:
+            return self.balance[:, 0] + self.principal[:, 0]
+        month = min(month, self.balance.shape[1])
+        return self.balance[:, month - 1]
+
+    def total_interest(self):
+        """Interest paid over the full term, per loan."""
+        return self.interest.sum(axis=1)
+
+    def total_payments(self):
+        return self.payment.sum(axis=1)
+
+    def book_cash_flows(self):
+        """Payment, interest and principal summed over all loans, per month."""
+        return {field: getattr(self, field).sum(axis=0) for field in FIELDS if field != 'balance'}
+
+
+def amortize_loans(loans):
+    """Builds the AmortizationSchedule of every LoanAccount in the dictionary loans."""
+    keys = list(loans)
+    mode = get_money_mode()
+    terms = [(mode, loan.get_annual_interest_rate(), loan.get_loan_amount(), loan.get_number_of_years()*12)
+             for loan in loans.values()]
+
+    unique = list(dict.fromkeys(terms))
+    schedules = {term: _schedule_cache.get(term) for term in unique}
+    missing = [term for term, schedule in schedules.items() if schedule is None]
+    if missing:
+        schedules.update(_compute_schedules(missing))
+
+    months = np.array([term[3] for term in terms], dtype=np.int64)
+    horizon = int(months.max()) if len(terms) else 0
+
+    # one padded row per distinct term, then fan out to the loans that share it
+    position = {term: i for i, term in enumerate(unique)}
+    inverse = np.array([position[term] for term in terms], dtype=np.int64)
+    arrays = {}
+    for field in FIELDS:
+        shared = np.zeros((len(unique), horizon))
+        for i, term in enumerate(unique):
+            shared[i, :term[3]] = schedules[term][field]
+        arrays[field] = shared[inverse]
+
+    logger.info("Amortization schedules built for %d loans (%d new loan terms computed).", len(keys), len(missing))
+    return AmortizationSchedule(keys, months=months, **arrays)
+
+
+### EOF
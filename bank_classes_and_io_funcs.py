@@ -19,6 +19,25 @@ Each Class comes with two custom I/O functions:
 2. The second function writes data (loaded to memory) back to a csv file.
 The second function is called after applying updates in the main driver program.
 
+The row parsing behind each loader is also available as load_*_rows_to_dict,
+which takes any csv reader positioned after the header row.  This is what the
+parallel loader in "bank_parallel_load.py" uses to parse parts of one file.
+
+For unattended batch jobs, wrap the work in non_interactive() (see
+"bank_data_quality_checks.py") and pass a QuarantineWriter to the loaders.
+Bad data then raises DataQualityError instead of prompting with input(), and
+the loaders write rejected rows with a reason column to the quarantine file:
+
+    with non_interactive(), QuarantineWriter.for_file("quarantine", infile) as q:
+        cust_objects_dict = load_customer_file_to_dict(infile, quarantine=q)
+
+Balances are floats of dollars.  With the opt-in cents money mode of
+"bank_money.py" they are int cents instead, with banker's rounding of interest.
+
+Customers and employees can also be streamed from file in fixed-size chunks
+with iter_customer_file_chunks and iter_employees_file_chunks, so very large
+files can be processed without loading them into one dictionary.
+
 Example:
 The main driver program "bank_main.py" demonstrates examples of usage.
 
@@ -28,24 +47,95 @@ The main driver program "bank_main.py" demonstrates examples of usage.
 #import modules
 import datetime
 import csv
-import pprint as pp
-import pandas as pd
-import re
+import functools
+import sys
 import logging
-from dateutil.relativedelta import relativedelta
 
 # custom module needed to perform validate date and credit card number
 from bank_data_quality_checks import *
+from bank_csv_writer import write_csv_rows
+from bank_money import (is_cents_mode, to_cents, to_money, from_cents, format_money, money_field,
+                        monthly_interest_cents, compounded_cents)
+
+
+# number of records per chunk yielded by the iter_*_file_chunks generators
+DEFAULT_CHUNK_SIZE = 10000
+
+
+def skip_header(csvreader, quarantine=None):
+    """Skips the header row of csvreader and hands it to quarantine, if one is given."""
+    header = next(csvreader)
+    if quarantine is not None:
+        quarantine.set_header(header)
+
+def quarantine_or_raise(quarantine, row, error):
+    """Writes a row that failed to parse to quarantine; without one, raises error as before."""
+    if quarantine is None:
+        raise error
+    quarantine.reject(row, str(error) or type(error).__name__)
+
+def _log_skipped_rows(problem, rows, records, shown=10):
+    # one error record per load for the rows skipped without a quarantine file
+    if not rows:
+        return
+    listed = ', '.join(map(str, rows[:shown])) + (', ...' if len(rows) > shown else '')
+    logger.error("%s detected at %d row(s) (%s) when loading %s from file! Skipping records.",
+                 problem, len(rows), listed, records)
+
+
+# Money movement listeners are called after every balance change made by
+# deposit, withdraw, make_purchase, withdraw_cash, apply_interest and
+# make_payment as listener(obj, op, amount, old_balance).  The transaction
+# journal in "bank_journal.py" is one such listener.
+MOVEMENT_OPS = ('deposit', 'withdraw', 'purchase', 'cash_advance', 'interest', 'payment')
+
+_movement_listeners = []
+
+def add_movement_listener(listener):
+    _movement_listeners.append(listener)
+
+def remove_movement_listener(listener):
+    _movement_listeners.remove(listener)
+
+def has_movement_listeners():
+    return bool(_movement_listeners)
+
+def notify_movement(obj, op, amount, old_balance):
+    for listener in _movement_listeners:
+        listener(obj, op, amount, old_balance)
 
 
+# Change listeners are called after a set_* method updates a record as
+# listener(obj, field, old_value).  The change tracker in "bank_incremental.py"
+# uses them to find dirty records without scanning the dictionaries.
+_change_listeners = []
+
+def add_change_listener(listener):
+    _change_listeners.append(listener)
+
+def remove_change_listener(listener):
+    _change_listeners.remove(listener)
+
+def notify_change(obj, field, old_value):
+    for listener in _change_listeners:
+        listener(obj, field, old_value)
+
+
+def _intern(value):
+    # one shared copy of strings repeated across records (bank names, cities,
+    # states); None and other values are kept as given, sys.intern only takes str
+    return sys.intern(value) if type(value) is str else value
+
 
 ################################################
 ##### Bank class, sub-classes and functions
 ################################################
 class Bank:
+    __slots__ = ('bank_id', 'bank_name')
+
     def __init__(self, bid, bank):
         self.bank_id = bid
-        self.bank_name = bank
+        self.bank_name = _intern(bank)
         
     def get_bank_id(self):
         return self.bank_id
@@ -55,6 +145,8 @@ class Bank:
 
 
 class Branch(Bank):
+    __slots__ = ('location_id', 'branch_name')
+
     def __init__(self, bid, bank, loc_id, branch):
         Bank.__init__(self, bid, bank)
         self.location_id = loc_id
@@ -66,47 +158,53 @@ class Branch(Bank):
     def get_branch_name(self):
         return self.branch_name
         
-def load_bank_locations_file_to_dict(file):
+def load_bank_locations_rows_to_dict(csvreader, first_row=0, quarantine=None):
     branches_dict = {}
     
-    with open(file, 'r') as file:
-        csvreader = csv.reader(file)
-        # This skips the first header row of the CSV file.
-        next(csvreader)
-        
-        for row in csvreader:
+    for row in csvreader:
+        try:
             bank_id, bank_name, location_id, branch_name  = row[0], row[1], row[2], row[3]
             loc = Branch(bank_id, bank_name, location_id, branch_name)  
             branches_dict[location_id] = loc
+        except (ValueError, IndexError) as e:
+            quarantine_or_raise(quarantine, row, e)
+    
+    return branches_dict
+
+def load_bank_locations_file_to_dict(file, quarantine=None):
+    with open(file, 'r') as file:
+        csvreader = csv.reader(file)
+        # This skips the first header row of the CSV file.
+        skip_header(csvreader, quarantine)
+        branches_dict = load_bank_locations_rows_to_dict(csvreader, quarantine=quarantine)
             
     logger.info("Bank locations file loaded to dictionary.")        
     return branches_dict
 
+BANK_LOCATION_COLUMNS = ['bank_id', 'bank_name', 'location_id', 'branch_name']
+
+def bank_location_to_row(val):
+    return [val.get_bank_id(),
+            val.get_bank_name(),
+            val.get_location_id(),
+            val.get_branch_name()]
+
 def write_bank_locations_to_file(data_dict, outfile):
-    rows = []
-    cols = ['bank_id', 'bank_name', 'location_id', 'branch_name']
-    for key, val in data_dict.items():
-        row = []
-        row.append(val.get_bank_id())
-        row.append(val.get_bank_name())
-        row.append(val.get_location_id())
-        row.append(val.get_branch_name())
-        rows.append(row)
-
-    # creating DataFrame from list of lists and write to csv
-    df = pd.DataFrame(rows, columns=cols)
-    df.to_csv(outfile, index=False)
-    logger.info(f"Bank locations data was written to csv file at location {outfile}.")
+    # stream rows straight from the dictionary to csv
+    write_csv_rows(outfile, BANK_LOCATION_COLUMNS, map(bank_location_to_row, data_dict.values()))
+    logger.info("Bank locations data was written to csv file at location %s.", outfile)
        
     
 ################################################
 ##### BankAccount class, sub-classes and functions
 ################################################
 class BankAccount:
+    __slots__ = ('customer_id', 'account_number', 'balance')
+
     def __init__(self, cust_id, acct_num, bal=0):
         self.customer_id = cust_id
         self.account_number = acct_num
-        self.balance = float(bal)
+        self.balance = to_money(bal)
         
         if self.balance < 0:
             print("Initial balance cannot be less than 0!")
@@ -122,13 +220,21 @@ class BankAccount:
         return self.balance
 
     def deposit(self, amount):
+        old_balance = self.balance
         self.balance += amount
+        if _movement_listeners:
+            notify_movement(self, 'deposit', amount, old_balance)
         
     def withdraw(self, amount):
+        old_balance = self.balance
         self.balance -= amount
+        if _movement_listeners:
+            notify_movement(self, 'withdraw', amount, old_balance)
      
         
 class SavingsAccount(BankAccount):
+    __slots__ = ('annual_interest_rate',)
+
     def __init__(self, cust_id, acct_num, bal, ann_int_rate=0.008):
         BankAccount.__init__(self, cust_id, acct_num, bal)
         self.annual_interest_rate = float(ann_int_rate)
@@ -137,106 +243,133 @@ class SavingsAccount(BankAccount):
         return self.annual_interest_rate
     
     def get_balance_next_month(self):
+        if is_cents_mode():
+            return self.balance + monthly_interest_cents(self.balance, self.annual_interest_rate)
         return round(self.balance*(1 + (self.annual_interest_rate/12)),2)
     
-    def get_compounded_balance(self):
-        print("Enter number of months to compound: ")
-        months = int(input())
+    def get_compounded_balance(self, months=None):
+        if months is None:
+            months = int(prompt_for("Enter number of months to compound: ",
+                                    "Number of months to compound must be given when running non-interactively."))
+        if is_cents_mode():
+            return compounded_cents(self.balance, self.annual_interest_rate, months)
         return round(  self.balance*(1 + (self.annual_interest_rate/12))**(12*months/12),2)
 
         
-def load_savings_file_to_dict(file):
+def load_savings_rows_to_dict(csvreader, first_row=0, quarantine=None):
     savings_account_dict = {}
     
-    with open(file, 'r') as file:
-        csvreader = csv.reader(file)
-        # This skips the first header row of the CSV file.
-        next(csvreader)
-        
-        for row in csvreader:
+    for row in csvreader:
+        try:
             cust_id, acct_num, bal, ann_int_rate  = row[0], row[1], row[2], row[3]
             acct = SavingsAccount(cust_id, acct_num, bal, ann_int_rate)   
             savings_account_dict[acct_num] = acct
+        except (ValueError, IndexError) as e:
+            quarantine_or_raise(quarantine, row, e)
+    
+    return savings_account_dict
+
+def load_savings_file_to_dict(file, quarantine=None):
+    with open(file, 'r') as file:
+        csvreader = csv.reader(file)
+        # This skips the first header row of the CSV file.
+        skip_header(csvreader, quarantine)
+        savings_account_dict = load_savings_rows_to_dict(csvreader, quarantine=quarantine)
             
     logger.info("Savings account file loaded to dictionary.")        
     return savings_account_dict 
                     
+SAVINGS_ACCOUNT_COLUMNS = ['customer_id', 'account_number', 'balance', 'annual_interest_rate']
+
+def savings_account_to_row(val):
+    return [val.get_customer_id(),
+            val.get_account_number(),
+            money_field(val.get_balance()),
+            val.get_annual_interest_rate()]
+
 def write_savings_accounts_to_file(data_dict, outfile):
-    rows = []
-    cols = ['customer_id', 'account_number', 'balance', 'annual_interest_rate']
-    for key, val in data_dict.items():
-        row = []
-        row.append(val.get_customer_id())
-        row.append(val.get_account_number())
-        row.append(round(val.get_balance(),2))
-        row.append(val.get_annual_interest_rate())
-        rows.append(row)
-
-    # creating DataFrame from list of lists and write to csv
-    df = pd.DataFrame(rows, columns=cols)
-    df.to_csv(outfile, index=False)
-    logger.info(f"Savings accounts data was written to csv file at location {outfile}.")
+    # stream rows straight from the dictionary to csv
+    write_csv_rows(outfile, SAVINGS_ACCOUNT_COLUMNS, map(savings_account_to_row, data_dict.values()))
+    logger.info("Savings accounts data was written to csv file at location %s.", outfile)
                     
 class CheckingAccount(BankAccount):
     
+    # fees and the minimum balance are the same for every account, so they
+    # live on the class rather than on each instance
     MIN_BALANCE = 25.00
     WITHDRAWAL_FEE = 0.25
     OVERDRAFT_FEE = 18.00
+    # the same amounts in cents, for the cents money mode (see "bank_money.py")
+    MIN_BALANCE_CENTS = to_cents(MIN_BALANCE)
+    WITHDRAWAL_FEE_CENTS = to_cents(WITHDRAWAL_FEE)
+    OVERDRAFT_FEE_CENTS = to_cents(OVERDRAFT_FEE)
+
+    __slots__ = ()
     
     def __init__(self, cust_id, acct_num, bal):
         BankAccount.__init__(self, cust_id, acct_num, bal)
-        self.__min_balance = float(CheckingAccount.MIN_BALANCE)
-        self.__withdrawal_fee = float(CheckingAccount.WITHDRAWAL_FEE)
-        self.__overdraft_fee = float(CheckingAccount.OVERDRAFT_FEE)
+        minimum = CheckingAccount.MIN_BALANCE_CENTS if is_cents_mode() else CheckingAccount.MIN_BALANCE
         
-        if self.balance < self.__min_balance:
+        if self.balance < minimum:
+            reason = f"Initial balance for checking account {acct_num} is below the minimum of ${CheckingAccount.MIN_BALANCE:,.2f}."
+            if not is_interactive():
+                raise DataQualityError(reason)
             print("Minimum balance for checking must be at least $25.00!")
-            while self.balance < self.__min_balance:
-                print(f"Re-enter initial balance of at least ${self.__min_balance:,.2f}: ")
-                self.balance = int(input())
+            while self.balance < minimum:
+                entered = int(prompt_for(f"Re-enter initial balance of at least ${CheckingAccount.MIN_BALANCE:,.2f}: ", reason))
+                self.balance = to_cents(entered) if is_cents_mode() else entered
 
     def withdraw(self, amount):
+        cents = is_cents_mode()
+        old_balance = self.balance
         self.balance -= amount
-        self.balance -= self.__withdrawal_fee
-        print(f"Amount withdrawn is ${amount:,.2f}. New balance with applied fees is ${self.balance:,.2f}")
+        self.balance -= CheckingAccount.WITHDRAWAL_FEE_CENTS if cents else CheckingAccount.WITHDRAWAL_FEE
+        print(f"Amount withdrawn is {format_money(amount)}. New balance with applied fees is {format_money(self.balance)}")
         
         if self.balance < 0:
-            self.balance -= self.__overdraft_fee
-            print(f"An overdraft fee of ${self.__overdraft_fee:,.2f} has been applied due to negative balance!")
-            print(f"Your new balance is: ${self.balance:,.2f}")
+            self.balance -= CheckingAccount.OVERDRAFT_FEE_CENTS if cents else CheckingAccount.OVERDRAFT_FEE
+            print(f"An overdraft fee of ${CheckingAccount.OVERDRAFT_FEE:,.2f} has been applied due to negative balance!")
+            print(f"Your new balance is: {format_money(self.balance)}")
+        
+        if _movement_listeners:
+            notify_movement(self, 'withdraw', amount, old_balance)
 
                   
-def load_checking_file_to_dict(file):
+def load_checking_rows_to_dict(csvreader, first_row=0, quarantine=None):
     checking_account_dict = {}
     
-    with open(file, 'r') as file:
-        csvreader = csv.reader(file)
-        # This skips the first header row of the CSV file.
-        next(csvreader)
-        
-        for row in csvreader:
+    for row in csvreader:
+        try:
             cust_id, acct_num, bal  = row[0], row[1], row[2]
             acct = CheckingAccount(cust_id, acct_num, bal)   
             checking_account_dict[acct_num] = acct
+        except (ValueError, IndexError) as e:
+            quarantine_or_raise(quarantine, row, e)
+    
+    return checking_account_dict
+
+def load_checking_file_to_dict(file, quarantine=None):
+    with open(file, 'r') as file:
+        csvreader = csv.reader(file)
+        # This skips the first header row of the CSV file.
+        skip_header(csvreader, quarantine)
+        checking_account_dict = load_checking_rows_to_dict(csvreader, quarantine=quarantine)
     
     logger.info("Checking account file loaded to dictionary.")
     return checking_account_dict     
 
 
+CHECKING_ACCOUNT_COLUMNS = ['customer_id', 'account_number', 'balance']
+
+def checking_account_to_row(val):
+    return [val.get_customer_id(),
+            val.get_account_number(),
+            money_field(val.get_balance())]
+
 def write_checking_accounts_to_file(data_dict, outfile):
-    rows = []
-    cols = ['customer_id', 'account_number', 'balance']
-    for key, val in data_dict.items():
-        row = []
-        row.append(val.get_customer_id())
-        row.append(val.get_account_number())
-        row.append(round(val.get_balance(),2))
-        rows.append(row)
-
-    # creating DataFrame from list of lists and write to csv
-    df = pd.DataFrame(rows, columns=cols)
-    df.to_csv(outfile, index=False)
-    logger.info(f"Checking accounts data was written to csv file at location {outfile}.")
+    # stream rows straight from the dictionary to csv
+    write_csv_rows(outfile, CHECKING_ACCOUNT_COLUMNS, map(checking_account_to_row, data_dict.values()))
+    logger.info("Checking accounts data was written to csv file at location %s.", outfile)
      
  
     
@@ -245,6 +378,9 @@ def write_checking_accounts_to_file(data_dict, outfile):
 ################################################
 
 class Customer:
+    __slots__ = ('customer_id', 'membership_date', 'first_name', 'last_name', 'birth_date',
+                 'street_address', 'city', 'state', 'zip_code', 'phone_number')
+
     def __init__(self, cust_id, member_dt, first, last, birth_dt, st_addr, cty, st, zipc, phone):
         self.customer_id = cust_id
         
@@ -252,9 +388,9 @@ class Customer:
             if is_valid_date(member_dt): 
                 self.membership_date = datetime.date.fromisoformat(member_dt)
             else:
-                logger.error(f"Invalid membership date entered for cust {cust_id}!")
-                print(f"Invalid membership date entered for cust {cust_id}! Re-enter date (YYYY-MM-DD): ")
-                mem_dt = input()
+                logger.error("Invalid membership date entered for cust %s!", cust_id)
+                mem_dt = prompt_for(f"Invalid membership date entered for cust {cust_id}! Re-enter date (YYYY-MM-DD): ",
+                                    f"Invalid membership date entered for cust {cust_id}!")
                 self.set_membership_date(mem_dt)
                 
         except AttributeError:
@@ -267,65 +403,91 @@ class Customer:
             if is_valid_date(birth_dt):
                 self.birth_date = birth_dt
             else:
-                logger.error(f"Invalid birth date entered for cust {cust_id}!")
-                print(f"Invalid birth date entered for cust {cust_id}! Re-enter date (YYYY-MM-DD): ")
-                dob = input()
+                logger.error("Invalid birth date entered for cust %s!", cust_id)
+                dob = prompt_for(f"Invalid birth date entered for cust {cust_id}! Re-enter date (YYYY-MM-DD): ",
+                                 f"Invalid birth date entered for cust {cust_id}!")
                 self.set_birth_date(dob)
         except AttributeError:
             pass
         
         self.street_address = st_addr
-        self.city = cty
-        self.state = st
+        # few distinct cities and states are shared by many customers
+        self.city = _intern(cty)
+        self.state = _intern(st)
         self.zip_code = zipc
         self.phone_number = phone
     
     # set methods for updating attributes
     def set_membership_date(self, member_dt):
         if is_valid_date(member_dt):
+            old = getattr(self, 'membership_date', None)
             self.membership_date = datetime.date.fromisoformat(member_dt)
-            logger.info(f"Membership date updated to {self.membership_date} for cust {self.customer_id}.")
+            log_info("Membership date updated to %s for cust %s.", self.membership_date, self.customer_id)
+            if _change_listeners:
+                notify_change(self, 'membership_date', old)
         else:
-            print('Enter valid membership date: ')
-            mem_dt = input()
+            mem_dt = prompt_for('Enter valid membership date: ', f"Invalid membership date {member_dt!r} for cust {self.customer_id}.")
             self.set_membership_date(mem_dt)
     
     def set_first_name(self, first):
+        old = self.first_name
         self.first_name = first
-        logger.info(f"First name updated for cust {self.customer_id}.")
+        log_info("First name updated for cust %s.", self.customer_id)
+        if _change_listeners:
+            notify_change(self, 'first_name', old)
         
     def set_last_name(self, last):
+        old = self.last_name
         self.last_name = last
-        logger.info(f"Last name updated for cust {self.customer_id}.")
+        log_info("Last name updated for cust %s.", self.customer_id)
+        if _change_listeners:
+            notify_change(self, 'last_name', old)
     
     def set_birth_date(self, birth_dt):
         if is_valid_date(birth_dt):
+            old = getattr(self, 'birth_date', None)
             self.birth_date = datetime.date.fromisoformat(birth_dt)
-            logger.info(f"Birth date updated to {self.birth_date} for cust {self.customer_id}.")
+            log_info("Birth date updated to %s for cust %s.", self.birth_date, self.customer_id)
+            if _change_listeners:
+                notify_change(self, 'birth_date', old)
         else:
-            print('Enter valid birth date: ')
-            dob = input()
+            dob = prompt_for('Enter valid birth date: ', f"Invalid birth date {birth_dt!r} for cust {self.customer_id}.")
             self.set_birth_date(dob)
         
     def set_street_address(self, addr):
+        old = self.street_address
         self.street_address = addr
-        logger.info(f"Street address updated for cust {self.customer_id}.")
+        log_info("Street address updated for cust %s.", self.customer_id)
+        if _change_listeners:
+            notify_change(self, 'street_address', old)
         
     def set_city(self, cty):
-        self.city = cty
-        logger.info(f"City updated for cust {self.customer_id}.")
+        old = self.city
+        self.city = _intern(cty)
+        log_info("City updated for cust %s.", self.customer_id)
+        if _change_listeners:
+            notify_change(self, 'city', old)
         
     def set_state(self, st):
-        self.state = st
-        logger.info(f"State updated for cust {self.customer_id}.")
+        old = self.state
+        self.state = _intern(st)
+        log_info("State updated for cust %s.", self.customer_id)
+        if _change_listeners:
+            notify_change(self, 'state', old)
     
     def set_zip_code(self, zipc):
+        old = self.zip_code
         self.zip_code = zipc
-        logger.info(f"Zip code updated for cust {self.customer_id}.")
+        log_info("Zip code updated for cust %s.", self.customer_id)
+        if _change_listeners:
+            notify_change(self, 'zip_code', old)
         
     def set_phone_number(self, phone):
+        old = self.phone_number
         self.phone_number = phone
-        logger.info(f"Phone updated for cust {self.customer_id}.")
+        log_info("Phone updated for cust %s.", self.customer_id)
+        if _change_listeners:
+            notify_change(self, 'phone_number', old)
         
     # get methods
     def get_customer_id(self):
@@ -365,52 +527,83 @@ class Customer:
         return "{}, {}, {}  {}".format(self.street_address, self.city, self.state, self.zip_code)
 
 
-def load_customer_file_to_dict(file):
+def iter_customer_row_chunks(csvreader, chunk_size=DEFAULT_CHUNK_SIZE, first_row=0, quarantine=None):
+    """Yields lists of at most chunk_size validated Customer objects.
+
+    Rows are parsed lazily, so only one chunk is held in memory at a time no
+    matter how large the file is.  Rows with an invalid membership or birth
+    date are logged and skipped, or written to quarantine if one is given.
+    """
+    chunk = []
+    skipped = []
+    
+    for i, row in enumerate(csvreader, first_row):
+        try:
+            member_dt = row[1]
+            birth_dt = row[4]
+            if is_valid_date(member_dt) and is_valid_date(birth_dt):
+                cust_id, member_dt, first, last, birth_dt, st_addr, cty, st, zipc, phone = row[0], row[1], row[2], row[3], row[4], row[5], row[6], row[7], row[8], row[9]
+                chunk.append(Customer(cust_id,  member_dt, first, last, birth_dt, st_addr, cty, st, zipc, phone))
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+            elif quarantine is not None:
+                quarantine.reject(row, "Invalid membership date" if not is_valid_date(member_dt) else "Invalid birth date")
+            else:
+                skipped.append(i)
+        except (ValueError, IndexError) as e:
+            quarantine_or_raise(quarantine, row, e)
+    
+    _log_skipped_rows("Invalid date", skipped, "customers")
+    if chunk:
+        yield chunk
+
+def iter_customer_file_chunks(file, chunk_size=DEFAULT_CHUNK_SIZE, quarantine=None):
+    with open(file, 'r') as file:
+        csvreader = csv.reader(file)
+        # This skips the first header row of the CSV file.
+        skip_header(csvreader, quarantine)
+        yield from iter_customer_row_chunks(csvreader, chunk_size, quarantine=quarantine)
+
+
+def load_customer_rows_to_dict(csvreader, first_row=0, quarantine=None):
     customers_dict = {}
     
+    for chunk in iter_customer_row_chunks(csvreader, first_row=first_row, quarantine=quarantine):
+        for cust in chunk:
+            customers_dict[cust.get_customer_id()] = cust
+    
+    return customers_dict
+
+def load_customer_file_to_dict(file, quarantine=None):
     with open(file, 'r') as file:
         csvreader = csv.reader(file)
         # This skips the first header row of the CSV file.
-        next(csvreader)
-        
-        for i, row in enumerate(csvreader):
-            member_dt = row[1]
-            birth_dt = row[4]
-            try:
-                if is_valid_date(member_dt) and is_valid_date(birth_dt):
-                    cust_id, member_dt, first, last, birth_dt, st_addr, cty, st, zipc, phone = row[0], row[1], row[2], row[3], row[4], row[5], row[6], row[7], row[8], row[9]
-                    cust = Customer(cust_id,  member_dt, first, last, birth_dt, st_addr, cty, st, zipc, phone)   
-                    customers_dict[cust_id] = cust
-                else:
-                    logger.error(f"Invalid date detected at row {i} when loading customers from file! Skipping record.")
-            except AttributeError:
-                next(csvreader)
+        skip_header(csvreader, quarantine)
+        customers_dict = load_customer_rows_to_dict(csvreader, quarantine=quarantine)
                 
     logger.info("Customers file loaded to dictionary.")       
     return customers_dict
 
 
+CUSTOMER_COLUMNS = ['customer_id', 'membership_date', 'first_name', 'last_name', 'birth_date', 'street_address', 'city', 'state', 'zip_code', 'phone_number']
+
+def customer_to_row(val):
+    return [val.get_customer_id(),
+            val.get_membership_date(),
+            val.get_first_name(),
+            val.get_last_name(),
+            val.get_birth_date(),
+            val.get_street_address(),
+            val.get_city(),
+            val.get_state(),
+            val.get_zip_code(),
+            val.get_phone_number()]
+
 def write_customers_to_file(data_dict, outfile):
-    rows = []
-    cols = ['customer_id', 'membership_date', 'first_name', 'last_name', 'birth_date', 'street_address', 'city', 'state', 'zip_code', 'phone_number']
-    for key, val in data_dict.items():
-        row = []
-        row.append(val.get_customer_id())
-        row.append(val.get_membership_date())
-        row.append(val.get_first_name())
-        row.append(val.get_last_name())
-        row.append(val.get_birth_date())
-        row.append(val.get_street_address())
-        row.append(val.get_city())
-        row.append(val.get_state())
-        row.append(val.get_zip_code())
-        row.append(val.get_phone_number())
-        rows.append(row)
-
-    # creating DataFrame from list of lists and write to csv
-    df = pd.DataFrame(rows, columns=cols)
-    df.to_csv(outfile, index=False)
-    logger.info(f"Customers data was written to csv file at location {outfile}.")
+    # stream rows straight from the dictionary to csv
+    write_csv_rows(outfile, CUSTOMER_COLUMNS, map(customer_to_row, data_dict.values()))
+    logger.info("Customers data was written to csv file at location %s.", outfile)
     
 
     
@@ -418,6 +611,9 @@ def write_customers_to_file(data_dict, outfile):
 ##### Employee class and functions
 ################################################
 class Employee:
+    __slots__ = ('employee_id', 'location_id', 'emp_first_name', 'emp_last_name', 'salary',
+                 'start_date', 'termination_date')
+
     def __init__(self, emp_id, loc_id, first, last, sal, start_dt, term_dt=None):
         self.employee_id = emp_id
         self.location_id = loc_id
@@ -429,8 +625,8 @@ class Employee:
             if is_valid_date(start_dt):
                 self.start_date = datetime.date.fromisoformat(start_dt)
             else:
-                logger.error(f"Invalid start date entered for employee {emp_id}! Re-enter date (YYYY-MM-DD): ")
-                st_dt = input()
+                logger.error("Invalid start date entered for employee %s! Re-enter date (YYYY-MM-DD): ", emp_id)
+                st_dt = prompt_for(None, f"Invalid start date entered for employee {emp_id}!")
                 self.set_start_date(st_dt)
         except AttributeError:
             pass
@@ -439,37 +635,53 @@ class Employee:
        
     # set methods for updating
     def set_location_id(self, loc_id):
+        old = self.location_id
         self.location_id = loc_id
-        logger.info(f"Location ID updated to {self.location_id} for employee {self.employee_id}.")
+        log_info("Location ID updated to %s for employee %s.", self.location_id, self.employee_id)
+        if _change_listeners:
+            notify_change(self, 'location_id', old)
         
     def set_emp_first_name(self, first):
+        old = self.emp_first_name
         self.emp_first_name = first
-        logger.info(f"First name updated to {self.emp_first_name} for employee {self.employee_id}.")
+        log_info("First name updated to %s for employee %s.", self.emp_first_name, self.employee_id)
+        if _change_listeners:
+            notify_change(self, 'emp_first_name', old)
         
     def set_emp_last_name(self, last):
+        old = self.emp_last_name
         self.emp_last_name = last
-        logger.info(f"Last name updated to {self.emp_last_name} for employee {self.employee_id}.")
+        log_info("Last name updated to %s for employee %s.", self.emp_last_name, self.employee_id)
+        if _change_listeners:
+            notify_change(self, 'emp_last_name', old)
         
     def set_salary(self, sal):
+        old = self.salary
         self.salary = float(sal)
-        logger.info(f"Salary updated to {self.salary} for employee {self.employee_id}.")
+        log_info("Salary updated to %s for employee %s.", self.salary, self.employee_id)
+        if _change_listeners:
+            notify_change(self, 'salary', old)
         
     def set_start_date(self, start_dt):
         if is_valid_date(start_dt):
+            old = getattr(self, 'start_date', None)
             self.start_date = datetime.date.fromisoformat(start_dt)
-            logger.info(f"Start date updated to {self.start_date} for employee {self.employee_id}.")
+            log_info("Start date updated to %s for employee %s.", self.start_date, self.employee_id)
+            if _change_listeners:
+                notify_change(self, 'start_date', old)
         else:
-            print('Enter valid start date: ')
-            st_dt = input()
+            st_dt = prompt_for('Enter valid start date: ', f"Invalid start date {start_dt!r} for employee {self.employee_id}.")
             self.set_start_date(st_dt)
 
     def set_termination_date(self, term_dt):
         if is_valid_date(term_dt):
+            old = getattr(self, 'termination_date', None)
             self.termination_date = datetime.date.fromisoformat(term_dt)
-            logger.info(f"Termination date updated to {self.termination_date} for employee {self.employee_id}.")
+            log_info("Termination date updated to %s for employee %s.", self.termination_date, self.employee_id)
+            if _change_listeners:
+                notify_change(self, 'termination_date', old)
         else:
-            print('Enter valid termination date: ')
-            t_dt = input()
+            t_dt = prompt_for('Enter valid termination date: ', f"Invalid termination date {term_dt!r} for employee {self.employee_id}.")
             self.set_termination_date(t_dt)
     
     # get methods
@@ -495,68 +707,108 @@ class Employee:
         return self.termination_date
     
     def get_tenure_years(self):
-        if self.termination_date is None:
-            return relativedelta(datetime.date.today(), self.start_date).years
-        else:
-            return relativedelta(self.termination_date, self.start_date).years
-        
-def load_employees_file_to_dict(file):
+        # imported here to keep dateutil out of the import path of every script
+        from dateutil.relativedelta import relativedelta
+        end_date = self.termination_date
+        # employees loaded from file have '' (or a date string) as termination date
+        if not end_date:
+            end_date = datetime.date.today()
+        elif isinstance(end_date, str):
+            end_date = datetime.date.fromisoformat(end_date)
+        return relativedelta(end_date, self.start_date).years
+        
+def iter_employee_row_chunks(csvreader, chunk_size=DEFAULT_CHUNK_SIZE, first_row=0, quarantine=None):
+    """Yields lists of at most chunk_size validated Employee objects.
+
+    Works like iter_customer_row_chunks.  Rows with an invalid start date
+    are logged and skipped, or written to quarantine if one is given.
+    """
+    chunk = []
+    skipped = []
+    
+    for i, row in enumerate(csvreader, first_row):
+        try:
+            start_dt = row[5]
+            if is_valid_date(start_dt):
+                emp_id, loc_id, first, last, sal, start_dt, term_dt = row[0], row[1], row[2], row[3], row[4], row[5], row[6]
+                chunk.append(Employee(emp_id, loc_id, first, last, sal, start_dt, term_dt))
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+            elif quarantine is not None:
+                quarantine.reject(row, "Invalid start date")
+            else:
+                skipped.append(i)
+        except (ValueError, IndexError) as e:
+            quarantine_or_raise(quarantine, row, e)
+    
+    _log_skipped_rows("Invalid start date", skipped, "employees")
+    if chunk:
+        yield chunk
+
+def iter_employees_file_chunks(file, chunk_size=DEFAULT_CHUNK_SIZE, quarantine=None):
+    with open(file, 'r') as file:
+        csvreader = csv.reader(file)
+        # This skips the first header row of the CSV file.
+        skip_header(csvreader, quarantine)
+        yield from iter_employee_row_chunks(csvreader, chunk_size, quarantine=quarantine)
+
+
+def load_employees_rows_to_dict(csvreader, first_row=0, quarantine=None):
     employees_dict = {}
     
+    # create dictionary of employee objects
+    for chunk in iter_employee_row_chunks(csvreader, first_row=first_row, quarantine=quarantine):
+        for emp in chunk:
+            employees_dict[emp.get_employee_id()] = emp
+    
+    return employees_dict
+
+def load_employees_file_to_dict(file, quarantine=None):
     with open(file, 'r') as file:
         csvreader = csv.reader(file)
         # This skips the first header row of the CSV file.
-        next(csvreader)
-        
-        # create dictionary of employee objects
-        for i, row in enumerate(csvreader):
-            start_dt = row[5]
-            try:
-                if is_valid_date(start_dt):
-                    emp_id, loc_id, first, last, sal, start_dt, term_dt = row[0], row[1], row[2], row[3], row[4], row[5], row[6]
-                    emp = Employee(emp_id, loc_id, first, last, sal, start_dt, term_dt)
-                    employees_dict[emp_id] = emp
-                else:
-                    logger.error(f"Invalid start date detected at row {i} when loading employees from file! Skipping record.")
-            except AttributeError:
-                next(csvreader)
+        skip_header(csvreader, quarantine)
+        employees_dict = load_employees_rows_to_dict(csvreader, quarantine=quarantine)
     
     logger.info("Employees file loaded to dictionary.")
     return employees_dict
 
 
+EMPLOYEE_COLUMNS = ['employee_id', 'location_id', 'first_name', 'last_name', 'salary', 'start_date', 'termination_date']
+
+def employee_to_row(val):
+    return [val.get_employee_id(),
+            val.get_location_id(),
+            val.get_emp_first_name(),
+            val.get_emp_last_name(),
+            round(val.get_salary(),2),
+            val.get_start_date(),
+            val.get_termination_date()]
+
 def write_employees_to_file(data_dict, outfile):
-    rows = []
-    cols = ['employee_id', 'location_id', 'first_name', 'last_name', 'salary', 'start_date', 'termination_date']
-    for key, val in data_dict.items():
-        row = []
-        row.append(val.get_employee_id())
-        row.append(val.get_location_id())
-        row.append(val.get_emp_first_name())
-        row.append(val.get_emp_last_name())
-        row.append(round(val.get_salary(),2))
-        row.append(val.get_start_date())
-        row.append(val.get_termination_date())
-        rows.append(row)
-        
-    # creating DataFrame from list of lists and write to csv
-    df = pd.DataFrame(rows, columns=cols)
-    df.to_csv(outfile, index=False)
-    logger.info(f"Employees data was written to csv file at location {outfile}.")
+    # stream rows straight from the dictionary to csv
+    write_csv_rows(outfile, EMPLOYEE_COLUMNS, map(employee_to_row, data_dict.values()))
+    logger.info("Employees data was written to csv file at location %s.", outfile)
     
 
 ################################################
 ##### Service class, sub-classes and functions
 ################################################
 class Service:
+    __slots__ = ('customer_id', 'annual_interest_rate', 'balance')
+
     def __init__(self, cust_id, ann_int_rate, bal=0):
         self.customer_id = cust_id
         self.annual_interest_rate = float(ann_int_rate)
-        self.balance = float(bal)
+        self.balance = to_money(bal)
         
     def set_annual_interest_rate(self, ann_int_rate):
+        old = self.annual_interest_rate
         self.annual_interest_rate = float(ann_int_rate)
-        logger.info(f"Annual interest rate updated to {self.annual_interest_rate} for cust {cust_id}.")
+        log_info("Annual interest rate updated to %s for cust %s.", self.annual_interest_rate, self.customer_id)
+        if _change_listeners:
+            notify_change(self, 'annual_interest_rate', old)
         
     def get_balance(self):
         return self.balance
@@ -568,39 +820,64 @@ class Service:
         return self.customer_id
     
     def make_payment(self, amount):
-        print("Prior balance was ${:,.2f}".format(self.balance))
+        old_balance = self.balance
+        print("Prior balance was {}".format(format_money(self.balance)))
         self.balance -= amount
-        print("Payment of ${:,.2f} received. New balance is ${:,.2f}.".format(amount, self.balance))
+        print("Payment of {} received. New balance is {}.".format(format_money(amount), format_money(self.balance)))
+        if _movement_listeners:
+            notify_movement(self, 'payment', amount, old_balance)
 
 # Class CreditCard inherits from parent class Service
 class CreditCard(Service):
     
     CASH_ADVANCE_FEE = 50
     CREDIT_LINE = 8000
+    # the same amounts in cents, for the cents money mode (see "bank_money.py")
+    CASH_ADVANCE_FEE_CENTS = to_cents(CASH_ADVANCE_FEE)
+    CREDIT_LINE_CENTS = to_cents(CREDIT_LINE)
+
+    __slots__ = ('available_credit', 'credit_card_number')
     
-    def __init__(self, cust_id, ann_int_rate, bal, ccn):
+    def __init__(self, cust_id, ann_int_rate, bal, ccn, validated=False):
         Service.__init__(self, cust_id, ann_int_rate, bal)
-        self.available_credit = float(CreditCard.CREDIT_LINE) - float(bal)
-        self.balance = float(bal)
-               
-        if is_valid_card_number(ccn):
+        if is_cents_mode():
+            self.available_credit = CreditCard.CREDIT_LINE_CENTS - self.balance
+        else:
+            self.available_credit = float(CreditCard.CREDIT_LINE) - self.balance
+        
+        # validated=True is passed by loaders that already checked the card number in bulk
+        if validated or is_valid_card_number(ccn):
             self.credit_card_number = ccn
         else:
             raise Exception('Invalid card number entered. Object instance not created!')
         
     def make_purchase(self, amount):
+        old_balance = self.balance
         self.balance += amount
         self.available_credit -= amount
+        if _movement_listeners:
+            notify_movement(self, 'purchase', amount, old_balance)
         
     def withdraw_cash(self, amount):
+        fee = CreditCard.CASH_ADVANCE_FEE_CENTS if is_cents_mode() else CreditCard.CASH_ADVANCE_FEE
+        old_balance = self.balance
         self.balance += amount
-        self.balance += CreditCard.CASH_ADVANCE_FEE
+        self.balance += fee
         self.available_credit -= amount
-        self.available_credit -= CreditCard.CASH_ADVANCE_FEE
+        self.available_credit -= fee
+        if _movement_listeners:
+            notify_movement(self, 'cash_advance', amount, old_balance)
     
     def apply_interest(self):
-        self.balance = self.balance*(1+self.annual_interest_rate/12)
-        self.available_credit = CreditCard.CREDIT_LINE - self.balance
+        old_balance = self.balance
+        if is_cents_mode():
+            self.balance += monthly_interest_cents(self.balance, self.annual_interest_rate)
+            self.available_credit = CreditCard.CREDIT_LINE_CENTS - self.balance
+        else:
+            self.balance = self.balance*(1+self.annual_interest_rate/12)
+            self.available_credit = CreditCard.CREDIT_LINE - self.balance
+        if _movement_listeners:
+            notify_movement(self, 'interest', self.balance - old_balance, old_balance)
     
     def get_available_credit(self):
         return self.available_credit
@@ -609,53 +886,67 @@ class CreditCard(Service):
         return self.credit_card_number
 
 
-def load_credit_card_file_to_dict(file):
+def load_credit_card_rows_to_dict(csvreader, first_row=0, quarantine=None):
     credit_card_account_dict = {}
     
+    # validate the whole card number column once, then build only the valid rows
+    rows = list(csvreader)
+    mask, reasons = validate_card_numbers([row[3] if len(row) > 3 else '' for row in rows])
+    invalid_cards, invalid_values = [], []
+    
+    for i, (row, valid, reason) in enumerate(zip(rows, mask, reasons), first_row):
+        if not valid:
+            if quarantine is not None:
+                quarantine.reject(row, f"Invalid credit card number ({reason})")
+            else:
+                invalid_cards.append(i)
+            continue
+        try:
+            cust_id, ann_int_rate, bal, ccn  = row[0], row[1], row[2], row[3]
+            acct = CreditCard(cust_id, ann_int_rate, bal, ccn, validated=True)   
+            credit_card_account_dict[ccn] = acct
+        except ValueError as e:
+            if quarantine is not None:
+                quarantine.reject(row, str(e))
+            else:
+                invalid_values.append(i)
+    
+    _log_skipped_rows("Invalid credit card", invalid_cards, "credit cards")
+    _log_skipped_rows("Invalid rate or balance", invalid_values, "credit cards")
+    return credit_card_account_dict
+
+def load_credit_card_file_to_dict(file, quarantine=None):
     with open(file, 'r') as file:
         csvreader = csv.reader(file)
         # This skips the first header row of the CSV file.
-        next(csvreader)
-        
-        for i,row in enumerate(csvreader):
-            ccn = row[3]
-            try:
-                if is_valid_card_number(ccn):
-                    cust_id, ann_int_rate, bal, ccn  = row[0], row[1], row[2], row[3]
-                    acct = CreditCard(cust_id, ann_int_rate, bal, ccn)   
-                    credit_card_account_dict[ccn] = acct
-                else:
-                    logger.error(f"Invalid credit card detected at row {i} when loading credit cards from file! Skipping record.")
-            except ValueError:
-                next(csvreader)
+        skip_header(csvreader, quarantine)
+        credit_card_account_dict = load_credit_card_rows_to_dict(csvreader, quarantine=quarantine)
                 
     logger.info("Credit card file loaded to dictionary.")        
     return credit_card_account_dict
 
 
+CREDIT_CARD_COLUMNS = ['customer_id', 'annual_interest_rate', 'balance', 'credit_card_number']
+
+def credit_card_to_row(val):
+    return [val.get_customer_id(),
+            val.get_annual_interest_rate(),
+            money_field(val.get_balance()),
+            val.get_credit_card_number()]
+
 def write_credit_card_accounts_to_file(data_dict, outfile):
-    rows = []
-    cols = ['customer_id', 'annual_interest_rate', 'balance', 'credit_card_number']
-    for key, val in data_dict.items():
-        row = []
-        row.append(val.get_customer_id())
-        row.append(val.get_annual_interest_rate())
-        row.append(round(val.get_balance(),2))
-        row.append(val.get_credit_card_number())
-        rows.append(row)
-
-    # creating DataFrame from list of lists and write to csv
-    df = pd.DataFrame(rows, columns=cols)
-    df.to_csv(outfile, index=False)
-    logger.info(f"Credit cards data was written to csv file at location {outfile}.")
+    # stream rows straight from the dictionary to csv
+    write_csv_rows(outfile, CREDIT_CARD_COLUMNS, map(credit_card_to_row, data_dict.values()))
+    logger.info("Credit cards data was written to csv file at location %s.", outfile)
 
 
 # Class LoanAccount
 class LoanAccount(Service):
+    __slots__ = ('loan_amount', 'loan_account_number', 'number_of_years')
     
     def __init__(self, cust_id, ann_int_rate, bal, loan_amt, loan_acct_num, num_years):
         Service.__init__(self, cust_id, ann_int_rate, bal)
-        self.loan_amount = float(loan_amt)
+        self.loan_amount = to_money(loan_amt)
         self.loan_account_number = loan_acct_num
         self.number_of_years = int(num_years)
         
@@ -669,48 +960,61 @@ class LoanAccount(Service):
         return self.number_of_years
     
     def get_monthly_payment(self):
-        P = self.get_loan_amount()
-        months = self.get_number_of_years() * 12
-        rate = self.get_annual_interest_rate()
+        if is_cents_mode():
+            return to_cents(monthly_payment(self.get_annual_interest_rate(), from_cents(self.loan_amount),
+                                            self.get_number_of_years() * 12))
+        return monthly_payment(self.get_annual_interest_rate(), self.get_loan_amount(), self.get_number_of_years() * 12)
+
+
+@functools.lru_cache(maxsize=4096)
+def monthly_payment(rate, P, months):
+    # many loans share the same terms, so each (rate, amount, term) is computed once
+    if rate == 0:
+        return round(P/months,2)
 
-        #calculate monthly payment
-        monthly_payment = (rate/12) * (1/(1-(1+rate/12)**(-months)))*P
-        return round(monthly_payment,2)
+    #calculate monthly payment
+    payment = (rate/12) * (1/(1-(1+rate/12)**(-months)))*P
+    return round(payment,2)
 
-def load_loan_file_to_dict(file):
+
+def load_loan_rows_to_dict(csvreader, first_row=0, quarantine=None):
     loan_account_dict = {}
     
-    with open(file, 'r') as file:
-        csvreader = csv.reader(file)
-        # This skips the first header row of the CSV file.
-        next(csvreader)
-        
-        for row in csvreader:
+    for row in csvreader:
+        try:
             cust_id, ann_int_rate, bal, loan_amt, acct_num, years  = row[0], row[1], row[2], row[3], row[4], row[5]
             acct = LoanAccount(cust_id, ann_int_rate, bal, loan_amt, acct_num, years)   
             loan_account_dict[acct_num] = acct
+        except (ValueError, IndexError) as e:
+            quarantine_or_raise(quarantine, row, e)
+    
+    return loan_account_dict
+
+def load_loan_file_to_dict(file, quarantine=None):
+    with open(file, 'r') as file:
+        csvreader = csv.reader(file)
+        # This skips the first header row of the CSV file.
+        skip_header(csvreader, quarantine)
+        loan_account_dict = load_loan_rows_to_dict(csvreader, quarantine=quarantine)
     
     logger.info("Loan accounts file loaded to dictionary.")
     return loan_account_dict
 
     
+LOAN_ACCOUNT_COLUMNS = ['customer_id', 'annual_interest_rate', 'balance', 'loan_amount', 'loan_account_number', 'number_of_years']
+
+def loan_account_to_row(val):
+    return [val.get_customer_id(),
+            val.get_annual_interest_rate(),
+            money_field(val.get_balance()),
+            money_field(val.get_loan_amount()),
+            val.get_loan_account_number(),
+            int(val.get_number_of_years())]
+
 def write_loan_accounts_to_file(data_dict, outfile):
-    rows = []
-    cols = ['customer_id', 'annual_interest_rate', 'balance', 'loan_amount', 'loan_account_number', 'number_of_years']
-    for key, val in data_dict.items():
-        row = []
-        row.append(val.get_customer_id())
-        row.append(val.get_annual_interest_rate())
-        row.append(round(val.get_balance(),2))
-        row.append(round(val.get_loan_amount(),2))
-        row.append(val.get_loan_account_number())
-        row.append(int(val.get_number_of_years()))
-        rows.append(row)
-
-    # creating DataFrame from list of lists and write to csv
-    df = pd.DataFrame(rows, columns=cols)
-    df.to_csv(outfile, index=False)
-    logger.info(f"Loan accounts data was written to csv file at location {outfile}.")
+    # stream rows straight from the dictionary to csv
+    write_csv_rows(outfile, LOAN_ACCOUNT_COLUMNS, map(loan_account_to_row, data_dict.values()))
+    logger.info("Loan accounts data was written to csv file at location %s.", outfile)
    
     
 ### EOF
\ No newline at end of file
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+
+"""
+@Date: 2026-10-18
+
+This file makes the account mutators safe to call from many threads.
+
+deposit, withdraw, make_payment, make_purchase, withdraw_cash and
+apply_interest all read, modify and write self.balance (and
+available_credit) without synchronisation, so two threads updating the same
+account can lose an update.  AccountLocks guards every account with one of a
+fixed number of lock stripes, chosen from the account's key: operations on
+different accounts rarely wait for each other, and memory does not grow with
+the number of accounts.
+
+transfer() locks both accounts before moving money.  Stripes are always
+acquired in ascending stripe order, so two opposite transfers between the
+same accounts cannot deadlock.
+
+Example:
+    locks = AccountLocks()
+    with ThreadPoolExecutor(8) as pool:
+        pool.submit(locks.deposit, checking_acct_objects_dict['168555105'], 700)
+        pool.submit(locks.transfer, savings_acct_objects_dict['168555102'],
+                    checking_acct_objects_dict['168555105'], 250)
+
+Run this file to benchmark throughput as the number of threads increases.
+Note that pure Python updates still run one at a time under the GIL; the
+benchmark compares striped locks against one global lock, which is what
+serialising all traffic amounts to.
+
+"""
+
+import contextlib
+import random
+import threading
+import time
+
+from bank_classes_and_io_funcs import SavingsAccount, logger
+from bank_data_quality_checks import configure_logging
+
+
+DEFAULT_STRIPES = 1024
+
+# attribute holding the unique key of each account type
+_KEY_ATTRS = ('account_number', 'credit_card_number', 'loan_account_number')
+_key_attr_by_type = {}
+
+
+def account_key(obj):
+    attr = _key_attr_by_type.get(type(obj))
+    if attr is None:
+        for attr in _KEY_ATTRS:
+            if getattr(obj, attr, None) is not None:
+                _key_attr_by_type[type(obj)] = attr
+                break
+        else:
+            raise TypeError(f"Cannot lock {type(obj).__name__} objects; no account key found.")
+    return getattr(obj, attr)
+
+
+class AccountLocks:
+    """Striped per-account locks and locked versions of the account mutators."""
+
+    def __init__(self, stripes=DEFAULT_STRIPES):
+        self.stripes = stripes
+        self._locks = [threading.RLock() for _ in range(stripes)]
+
+    def stripe_for(self, obj):
+        # accounts of different types that share a stripe only share a lock
+        return hash(account_key(obj)) % self.stripes
+
+    def lock_for(self, obj):
+        return self._locks[self.stripe_for(obj)]
+
+    @contextlib.contextmanager
+    def locked(self, *accounts):
+        """Holds the locks of all accounts, taken in stripe order to avoid deadlocks."""
+        stripes = sorted({self.stripe_for(obj) for obj in accounts})
+        for i in stripes:
+            self._locks[i].acquire()
+        try:
+            yield
+        finally:
+            for i in reversed(stripes):
+                self._locks[i].release()
+
+    def deposit(self, acct, amount):
+        with self.lock_for(acct):
+            acct.deposit(amount)
+
+    def withdraw(self, acct, amount):
+        with self.lock_for(acct):
+            acct.withdraw(amount)
+
+    def make_payment(self, acct, amount):
+        with self.lock_for(acct):
+            acct.make_payment(amount)
+
+    def make_purchase(self, card, amount):
+        with self.lock_for(card):
+            card.make_purchase(amount)
+
+    def withdraw_cash(self, card, amount):
+        with self.lock_for(card):
+            card.withdraw_cash(amount)
+
+    def apply_interest(self, card):
+        with self.lock_for(card):
+            card.apply_interest()
+
+    def transfer(self, source, target, amount):
+        """Withdraws amount from source and deposits it to target as one atomic step."""
+        with self.locked(source, target):
+            source.withdraw(amount)
+            target.deposit(amount)
+
+
+class _GlobalLock(AccountLocks):
+    # one lock for every account; the baseline the benchmark compares against
+    def __init__(self):
+        AccountLocks.__init__(self, stripes=1)
+
+    def stripe_for(self, obj):
+        return 0
+
+
+################################################
+##### Benchmark
+################################################
+def _worker(locks, accounts, ops, seed):
+    rng = random.Random(seed)
+    n = len(accounts)
+    for _ in range(ops):
+        a = accounts[rng.randrange(n)]
+        if rng.random() < 0.5:
+            locks.deposit(a, 1.0)
+            locks.withdraw(a, 1.0)
+        else:
+            locks.transfer(a, accounts[rng.randrange(n)], 1.0)
+
+
+def run_benchmark(num_accounts=10000, ops_per_thread=20000, thread_counts=(1, 2, 4, 8), seed=0):
+    """Times random deposits, withdrawals and transfers from a growing number of threads.
+
+    Returns one dictionary per (lock scheme, thread count) with the operations
+    per second and whether the total balance was conserved.
+    """
+    results = []
+    for scheme, make_locks in (('striped', AccountLocks), ('global', _GlobalLock)):
+        for threads in thread_counts:
+            accounts = [SavingsAccount('600000', str(100000000 + i), 1000) for i in range(num_accounts)]
+            locks = make_locks()
+            workers = [threading.Thread(target=_worker, args=(locks, accounts, ops_per_thread, seed + t))
+                       for t in range(threads)]
+            start = time.perf_counter()
+            for w in workers:
+                w.start()
+            for w in workers:
+                w.join()
+            elapsed = time.perf_counter() - start
+
+            total = sum(a.balance for a in accounts)
+            results.append({'scheme': scheme,
+                            'threads': threads,
+                            'operations': threads*ops_per_thread,
+                            'seconds': elapsed,
+                            'ops_per_second': threads*ops_per_thread/elapsed,
+                            'balance_conserved': abs(total - 1000*num_accounts) < 1e-6})
+    logger.info("Concurrency benchmark finished for thread counts %s.", list(thread_counts))
+    return results
+
+
+if __name__ == "__main__":
+    configure_logging()
+    for r in run_benchmark():
+        print(f"{r['scheme']:<8} {r['threads']:>2} threads  {r['ops_per_second']:>12,.0f} ops/s  "
+              f"balance conserved: {r['balance_conserved']}")
+
+
+### EOF
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+
+"""
+@Date: 2026-10-18
+
+This file provides the streaming CSV writer used by the write_*_to_file
+functions in "bank_classes_and_io_funcs.py".
+
+Rows are pulled from an iterable and written to disk in buffered batches, so
+the records are never copied into an intermediate list or DataFrame.  The
+output goes to a temporary file in the same folder which is renamed over the
+target only after it has been fully written and flushed, so a crash never
+leaves a half-written csv file behind.
+
+The format matches pandas.DataFrame.to_csv(outfile, index=False): minimal
+quoting, os.linesep line endings, empty fields for None, and str() of every
+other value.
+
+"""
+
+import csv
+import os
+import tempfile
+
+
+# number of rows handed to the csv writer at a time
+DEFAULT_BATCH_SIZE = 10000
+
+
+def _default_file_mode():
+    # mkstemp creates files as 0600; give the output the usual umask-based mode
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def output_file_mode(outfile):
+    """The permission bits for a new version of outfile: those of the existing file, else the umask default."""
+    try:
+        return os.stat(outfile).st_mode & 0o777
+    except FileNotFoundError:
+        return _default_file_mode()
+
+
+def write_csv_rows(outfile, cols, rows, batch_size=DEFAULT_BATCH_SIZE):
+    """Writes the header cols and every row in rows to outfile atomically.
+
+    Returns the number of data rows written.
+    """
+    outdir = os.path.dirname(os.path.abspath(outfile))
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(outfile) + '.', suffix='.tmp', dir=outdir)
+    count = 0
+    try:
+        with os.fdopen(fd, 'w', newline='') as file:
+            csvwriter = csv.writer(file, lineterminator=os.linesep)
+            csvwriter.writerow(cols)
+
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    csvwriter.writerows(batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                csvwriter.writerows(batch)
+                count += len(batch)
+
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.chmod(tmp_path, output_file_mode(outfile))
+        os.replace(tmp_path, outfile)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    return count
+
+
+### EOF
@@ -0,0 +1,297 @@
+#!/usr/bin/env python
+
+"""
+@Date: 2026-10-18
+
+This file provides a searchable directory over the customer dictionary, so
+call-centre lookups by name, phone, zip code or city do not scan every
+Customer object.
+
+1. Phone number and zip code: exact lookup in a hash table.  Phone numbers
+   are compared on their digits only, so 213-555-4434 and (213) 555 4434
+   find the same customer.
+2. Last name and first name: prefix search in a sorted list with bisect.
+   Names are compared case-insensitively.
+3. City and state: exact lookup of (city, state) or of a whole state.
+
+search() combines any of these criteria, starting from the most selective
+one, and returns the matches in customer_id order.  The directory is filled once when the customer dictionary is tracked.
+It then follows the dictionary through the EntityDict returned by track(),
+and follows every tracked customer through the change listeners in
+"bank_classes_and_io_funcs.py".  So set_last_name, set_phone_number,
+set_zip_code, set_city and the other setters are reflected right away.
+
+Example:
+    directory = CustomerDirectory()
+    cust_objects_dict = directory.track(load_customer_file_to_dict(infile))
+    directory.find_by_phone('213-555-4434')
+    directory.find_by_last_name('gar')                   # Garcia, Gardner, ...
+    directory.search(last_name='Sm', city='Los Angeles', state='CA')
+
+"""
+
+import bisect
+
+from bank_classes_and_io_funcs import add_change_listener, remove_change_listener, logger
+from bank_entity_dict import EntityDict, MISSING
+
+
+# fields of Customer the directory indexes
+INDEXED_FIELDS = ('first_name', 'last_name', 'phone_number', 'zip_code', 'city', 'state')
+
+# separates the name from the customer id in the sorted name keys
+_SEP = '\0'
+
+
+def normalize_phone(phone):
+    phone = str(phone)
+    digits = phone.replace('-', '')
+    if digits.isdigit():
+        return digits
+    return ''.join(filter(str.isdigit, phone))
+
+
+def normalize_name(name):
+    return str(name).strip().casefold()
+
+
+def _place(city, state):
+    return (normalize_name(city), str(state).strip().upper())
+
+
+def _bucket_add(table, key, cust_id):
+    # a bucket is one customer id, or a set of them once several customers share the key
+    ids = table.get(key)
+    if ids is None:
+        table[key] = cust_id
+    elif isinstance(ids, set):
+        ids.add(cust_id)
+    elif ids != cust_id:
+        table[key] = {ids, cust_id}
+
+
+def _bucket_remove(table, key, cust_id):
+    ids = table.get(key)
+    if isinstance(ids, set):
+        ids.discard(cust_id)
+        if len(ids) == 1:
+            table[key] = next(iter(ids))
+    elif ids == cust_id:
+        del table[key]
+
+
+def _bucket_ids(table, key):
+    ids = table.get(key)
+    if ids is None:
+        return ()
+    return ids if isinstance(ids, set) else (ids,)
+
+
+class CustomerDirectory:
+    """Phone, zip, name-prefix and city/state lookups over one customer dictionary."""
+
+    def __init__(self):
+        self._customers = {}
+        self._phones = {}
+        self._zips = {}
+        self._places = {}
+        self._states = {}
+        self._last_names = []
+        self._first_names = []
+        self._listener = None
+        self._listening = False
+
+    def track(self, data_dict):
+        """Indexes every customer of data_dict and keeps following it.
+
+        Returns an EntityDict holding the customers.  Use it in place of
+        data_dict so that later additions and removals reach the directory.
+        Tracking another dictionary replaces the one tracked before.
+        """
+        if not isinstance(data_dict, EntityDict):
+            data_dict = EntityDict(data_dict)
+        self._untrack()
+        self._customers = data_dict
+        self._phones, self._zips, self._places, self._states = {}, {}, {}, {}
+        for cust in data_dict.values():
+            self._add_exact(cust)
+        # sort once instead of inserting one name at a time
+        self._last_names = sorted(_name_key(c.last_name, c.customer_id) for c in data_dict.values())
+        self._first_names = sorted(_name_key(c.first_name, c.customer_id) for c in data_dict.values())
+        self._listener = _DirectoryListener(self)
+        data_dict.add_listener(self._listener)
+        if not self._listening:
+            add_change_listener(self.on_change)
+            self._listening = True
+        logger.info("Customer directory built for %d customers.", len(data_dict))
+        return data_dict
+
+    def _untrack(self):
+        if self._listener is not None:
+            self._customers.remove_listener(self._listener)
+            self._listener = None
+
+    def close(self):
+        """Stops following the customer dictionary and the customers' set_* methods."""
+        self._untrack()
+        if self._listening:
+            remove_change_listener(self.on_change)
+            self._listening = False
+
+    ##### keeping the indexes current
+    def _add_exact(self, cust):
+        cust_id = cust.customer_id
+        _bucket_add(self._phones, normalize_phone(cust.phone_number), cust_id)
+        _bucket_add(self._zips, str(cust.zip_code).strip(), cust_id)
+        place = _place(cust.city, cust.state)
+        _bucket_add(self._places, place, cust_id)
+        _bucket_add(self._states, place[1], cust_id)
+
+    def add(self, cust):
+        self._add_exact(cust)
+        bisect.insort(self._last_names, _name_key(cust.last_name, cust.customer_id))
+        bisect.insort(self._first_names, _name_key(cust.first_name, cust.customer_id))
+
+    def remove(self, cust):
+        cust_id = cust.customer_id
+        _bucket_remove(self._phones, normalize_phone(cust.phone_number), cust_id)
+        _bucket_remove(self._zips, str(cust.zip_code).strip(), cust_id)
+        place = _place(cust.city, cust.state)
+        _bucket_remove(self._places, place, cust_id)
+        _bucket_remove(self._states, place[1], cust_id)
+        _sorted_remove(self._last_names, _name_key(cust.last_name, cust_id))
+        _sorted_remove(self._first_names, _name_key(cust.first_name, cust_id))
+
+    def on_change(self, obj, field, old_value):
+        """Moves obj to its new index entries.  Matches the change listener signature."""
+        if field not in INDEXED_FIELDS or self._customers.get(getattr(obj, 'customer_id', None)) is not obj:
+            return
+        cust_id = obj.customer_id
+        if field == 'last_name':
+            _sorted_remove(self._last_names, _name_key(old_value, cust_id))
+            bisect.insort(self._last_names, _name_key(obj.last_name, cust_id))
+        elif field == 'first_name':
+            _sorted_remove(self._first_names, _name_key(old_value, cust_id))
+            bisect.insort(self._first_names, _name_key(obj.first_name, cust_id))
+        elif field == 'phone_number':
+            _bucket_remove(self._phones, normalize_phone(old_value), cust_id)
+            _bucket_add(self._phones, normalize_phone(obj.phone_number), cust_id)
+        elif field == 'zip_code':
+            _bucket_remove(self._zips, str(old_value).strip(), cust_id)
+            _bucket_add(self._zips, str(obj.zip_code).strip(), cust_id)
+        else:
+            old_place = _place(old_value, obj.state) if field == 'city' else _place(obj.city, old_value)
+            new_place = _place(obj.city, obj.state)
+            _bucket_remove(self._places, old_place, cust_id)
+            _bucket_add(self._places, new_place, cust_id)
+            _bucket_remove(self._states, old_place[1], cust_id)
+            _bucket_add(self._states, new_place[1], cust_id)
+
+    ##### lookups
+    def _resolve(self, ids, limit=None):
+        customers = self._customers
+        found = [customers[cust_id] for cust_id in ids]
+        found.sort(key=lambda c: c.customer_id)
+        return found[:limit] if limit is not None else found
+
+    def find_by_phone(self, phone):
+        return self._resolve(_bucket_ids(self._phones, normalize_phone(phone)))
+
+    def find_by_zip(self, zip_code):
+        return self._resolve(_bucket_ids(self._zips, str(zip_code).strip()))
+
+    def find_in_city(self, city, state):
+        return self._resolve(_bucket_ids(self._places, _place(city, state)))
+
+    def find_in_state(self, state):
+        return self._resolve(_bucket_ids(self._states, str(state).strip().upper()))
+
+    def find_by_last_name(self, prefix, limit=None):
+        """Customers whose last name starts with prefix, in name order."""
+        return [self._customers[cust_id] for cust_id in _prefix_ids(self._last_names, prefix, limit)]
+
+    def find_by_first_name(self, prefix, limit=None):
+        """Customers whose first name starts with prefix, in name order."""
+        return [self._customers[cust_id] for cust_id in _prefix_ids(self._first_names, prefix, limit)]
+
+    def search(self, last_name=None, first_name=None, phone=None, zip_code=None, city=None, state=None, limit=100):
+        """Customers matching every given criterion, in customer_id order; names match by prefix, the others exactly."""
+        # start from the most selective index, then check the other criteria on each candidate
+        if phone is not None:
+            candidates = _bucket_ids(self._phones, normalize_phone(phone))
+        elif zip_code is not None:
+            candidates = _bucket_ids(self._zips, str(zip_code).strip())
+        elif city is not None and state is not None:
+            candidates = _bucket_ids(self._places, _place(city, state))
+        elif last_name is not None:
+            candidates = _prefix_ids(self._last_names, last_name)
+        elif first_name is not None:
+            candidates = _prefix_ids(self._first_names, first_name)
+        elif state is not None:
+            candidates = _bucket_ids(self._states, str(state).strip().upper())
+        else:
+            candidates = self._customers
+
+        checks = []
+        if last_name is not None:
+            checks.append(lambda c, p=normalize_name(last_name): normalize_name(c.last_name).startswith(p))
+        if first_name is not None:
+            checks.append(lambda c, p=normalize_name(first_name): normalize_name(c.first_name).startswith(p))
+        if phone is not None:
+            checks.append(lambda c, p=normalize_phone(phone): normalize_phone(c.phone_number) == p)
+        if zip_code is not None:
+            checks.append(lambda c, z=str(zip_code).strip(): str(c.zip_code).strip() == z)
+        if city is not None:
+            checks.append(lambda c, n=normalize_name(city): normalize_name(c.city) == n)
+        if state is not None:
+            checks.append(lambda c, s=str(state).strip().upper(): str(c.state).strip().upper() == s)
+
+        found = []
+        # sorted first, so that limit keeps the same customers on every call
+        for cust_id in sorted(candidates):
+            cust = self._customers[cust_id]
+            if all(check(cust) for check in checks):
+                found.append(cust)
+                if limit is not None and len(found) >= limit:
+                    break
+        return found
+
+
+def _name_key(name, cust_id):
+    return f"{normalize_name(name)}{_SEP}{cust_id}"
+
+
+def _sorted_remove(keys, key):
+    i = bisect.bisect_left(keys, key)
+    if i < len(keys) and keys[i] == key:
+        del keys[i]
+
+
+def _prefix_ids(keys, prefix, limit=None):
+    # customer ids of every key starting with the normalized prefix, in key order
+    prefix = normalize_name(prefix)
+    ids = []
+    for i in range(bisect.bisect_left(keys, prefix), len(keys)):
+        key = keys[i]
+        if not key.startswith(prefix):
+            break
+        ids.append(key[key.index(_SEP) + 1:])
+        if limit is not None and len(ids) >= limit:
+            break
+    return ids
+
+
+class _DirectoryListener:
+    def __init__(self, directory):
+        self.directory = directory
+
+    def on_set(self, key, old, new):
+        if old is not MISSING:
+            self.directory.remove(old)
+        self.directory.add(new)
+
+    def on_delete(self, key, old):
+        self.directory.remove(old)
+
+
+### EOF
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+
+"""
+@Date: 2026-10-18
+
+This file maintains a secondary index from customer_id to every product the
+customer holds: checking accounts, savings accounts, credit cards and loans.
+
+Looking up "everything customer 600003 holds" would otherwise mean a scan of
+four dictionaries.  The index is filled once when a product dictionary is
+tracked, and is then kept up to date as records are created or removed
+through the EntityDict returned by CustomerIndex.track().
+
+Example:
+    index = CustomerIndex()
+    checking_acct_objects_dict = index.track('checking', load_checking_file_to_dict(infile))
+    checking_acct_objects_dict['168555140'] = CheckingAccount('600008', '168555140', '800.50')
+    index.products_for('600008')['checking']
+    index.total_deposits('600008')
+
+"""
+
+from bank_entity_dict import EntityDict, MISSING
+
+
+CHECKING = 'checking'
+SAVINGS = 'savings'
+CREDIT_CARDS = 'credit_cards'
+LOANS = 'loans'
+
+PRODUCT_TYPES = (CHECKING, SAVINGS, CREDIT_CARDS, LOANS)
+DEPOSIT_TYPES = (CHECKING, SAVINGS)
+DEBT_TYPES = (CREDIT_CARDS, LOANS)
+
+
+class CustomerIndex:
+    """customer_id -> {product type -> {product key -> object}} with O(1) lookup."""
+
+    def __init__(self):
+        self._customers = {}
+
+    def track(self, product_type, data_dict):
+        """Indexes every record of data_dict and keeps following it.
+
+        Returns an EntityDict holding the records.  Use it in place of
+        data_dict so that later additions and removals reach the index.
+        """
+        if product_type not in PRODUCT_TYPES:
+            raise ValueError(f"Unknown product type {product_type!r}. Expected one of {', '.join(PRODUCT_TYPES)}.")
+        if not isinstance(data_dict, EntityDict):
+            data_dict = EntityDict(data_dict)
+        for key, obj in data_dict.items():
+            self.add(product_type, key, obj)
+        data_dict.add_listener(_IndexListener(self, product_type))
+        return data_dict
+
+    def add(self, product_type, key, obj):
+        products = self._customers.get(obj.get_customer_id())
+        if products is None:
+            products = {ptype: {} for ptype in PRODUCT_TYPES}
+            self._customers[obj.get_customer_id()] = products
+        products[product_type][key] = obj
+
+    def remove(self, product_type, key, obj):
+        cust_id = obj.get_customer_id()
+        products = self._customers.get(cust_id)
+        if products is None:
+            return
+        products[product_type].pop(key, None)
+        if not any(products.values()):
+            del self._customers[cust_id]
+
+    def __contains__(self, cust_id):
+        return cust_id in self._customers
+
+    def __len__(self):
+        return len(self._customers)
+
+    def customer_ids(self):
+        return self._customers.keys()
+
+    def products_for(self, cust_id):
+        """Returns {product type -> list of objects} for cust_id; empty lists if none."""
+        products = self._customers.get(cust_id)
+        if products is None:
+            return {ptype: [] for ptype in PRODUCT_TYPES}
+        return {ptype: list(objs.values()) for ptype, objs in products.items()}
+
+    def product_keys_for(self, cust_id, product_type):
+        products = self._customers.get(cust_id)
+        if products is None:
+            return []
+        return list(products[product_type])
+
+    def _total(self, cust_id, product_types):
+        products = self._customers.get(cust_id)
+        if products is None:
+            return 0.0
+        return sum(obj.get_balance() for ptype in product_types for obj in products[ptype].values())
+
+    def total_deposits(self, cust_id):
+        """Checking plus savings balances held by cust_id."""
+        return self._total(cust_id, DEPOSIT_TYPES)
+
+    def total_debt(self, cust_id):
+        """Credit card plus loan balances owed by cust_id."""
+        return self._total(cust_id, DEBT_TYPES)
+
+    def summary(self, cust_id):
+        products = self._customers.get(cust_id) or {ptype: {} for ptype in PRODUCT_TYPES}
+        summary = {f"{ptype}_count": len(products[ptype]) for ptype in PRODUCT_TYPES}
+        summary['total_deposits'] = self.total_deposits(cust_id)
+        summary['total_debt'] = self.total_debt(cust_id)
+        summary['net_position'] = summary['total_deposits'] - summary['total_debt']
+        return summary
+
+
+class _IndexListener:
+    def __init__(self, index, product_type):
+        self.index = index
+        self.product_type = product_type
+
+    def on_set(self, key, old, new):
+        if old is not MISSING:
+            self.index.remove(self.product_type, key, old)
+        self.index.add(self.product_type, key, new)
+
+    def on_delete(self, key, old):
+        self.index.remove(self.product_type, key, old)
+
+
+### EOF
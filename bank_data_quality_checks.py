@@ -8,36 +8,288 @@ This file serves as a set of utility functions to validate
 a date string and credit card number used in the Bank Model.
 The file should be imported to the file "bank_classes_and_io_funcs.py"
 
+A whole column of card numbers can be validated at once with
+validate_card_numbers, which also reports a reason code per card
+and can check the Luhn checksum.
+
+It also holds the interactive/non-interactive switch used by the
+classes when bad data is found, and the QuarantineWriter that
+collects rejected rows in non-interactive bulk runs.
+
+Logging: the "main" logger gets its handlers from configure_logging(),
+which the driver program calls, so importing this file opens no log
+file.  configure_logging(queued=True) hands records to a background
+thread that formats and writes them.  Inside log_batch(), the per-record
+messages logged with log_info (the set_* methods) are counted instead of
+written, and one summary record per message is logged when the batch ends.
+
 """
 
+import atexit
+import contextlib
 import datetime
 import csv
-import pprint as pp
-import pandas as pd
+import os
 import re
 import logging
-from dateutil.relativedelta import relativedelta
 
 
-# set-up logger main
+# set-up logger main; handlers are added by configure_logging()
 logger = logging.getLogger('main')
 logger.setLevel(logging.INFO)
 
-fileHandler = logging.FileHandler('main.log')
-fileHandler.setLevel(logging.INFO)
-format = logging.Formatter('%(asctime)s %(name)s %(levelname)s: %(message)s')
-fileHandler.setFormatter(format)
+LOG_FORMAT = '%(asctime)s %(name)s %(levelname)s: %(message)s'
+
+_queue_listener = None
+_batch_counts = None
+
+
+class _DeferredQueueHandler(logging.Handler):
+    # like logging.handlers.QueueHandler, but the message is formatted in the
+    # listener thread rather than here.  Log arguments must not change after
+    # the call, which holds for the ids, names, numbers and dates logged here.
+    def __init__(self, records):
+        logging.Handler.__init__(self)
+        self.records = records
+
+    def emit(self, record):
+        self.records.put_nowait(record)
+
+
+def configure_logging(log_file='main.log', console=True, level=logging.INFO, queued=False):
+    """Sets up the handlers of the main logger and returns it.
+
+    log_file gets timestamped records and the console gets the bare
+    messages, as before.  With queued=True, records go through a queue to a
+    background thread; call shutdown_logging() (also run at exit) to flush it.
+    """
+    global _queue_listener
+    shutdown_logging()
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+
+    handlers = []
+    if log_file:
+        fileHandler = logging.FileHandler(log_file)
+        fileHandler.setLevel(level)
+        fileHandler.setFormatter(logging.Formatter(LOG_FORMAT))
+        handlers.append(fileHandler)
+    if console:
+        consoleHandler = logging.StreamHandler()
+        consoleHandler.setLevel(level)
+        handlers.append(consoleHandler)
+
+    logger.setLevel(level)
+    if queued:
+        # imported here: logging.handlers pulls in socket and pickle
+        from logging.handlers import QueueListener
+        from queue import SimpleQueue
+        records = SimpleQueue()
+        logger.addHandler(_DeferredQueueHandler(records))
+        _queue_listener = QueueListener(records, *handlers, respect_handler_level=True)
+        _queue_listener.start()
+        atexit.register(shutdown_logging)
+    else:
+        for handler in handlers:
+            logger.addHandler(handler)
+    return logger
+
+
+def shutdown_logging():
+    """Writes out every queued record and stops the background logging thread."""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+        atexit.unregister(shutdown_logging)
+
+
+def log_info(msg, *args):
+    """logger.info for per-record messages; counted instead of logged inside log_batch()."""
+    if _batch_counts is not None:
+        # the arguments of the first call are kept as the example for the summary
+        entry = _batch_counts.setdefault(msg, [0, args])
+        entry[0] += 1
+    elif logger.isEnabledFor(logging.INFO):
+        logger.info(msg, *args)
+
+
+@contextlib.contextmanager
+def log_batch(name='batch'):
+    """Logs one summary record per log_info message instead of one record per call.
+
+    The summary gives the number of calls and the message of the first call,
+    e.g. 'updates: 3 x, e.g. "Phone updated for cust 100000001."'.
+    """
+    global _batch_counts
+    if _batch_counts is not None:
+        # nested batches are summarised by the outermost one
+        yield _batch_counts
+        return
+    counts = _batch_counts = {}
+    try:
+        yield counts
+    finally:
+        _batch_counts = None
+        for msg, (n, args) in counts.items():
+            example = msg % args if args else msg
+            logger.info('%s: %d x, e.g. "%s"', name, n, example)
+
+
+# interactive vs non-interactive (bulk) mode
+# In interactive mode bad data is corrected by prompting the user with input().
+# In non-interactive mode a DataQualityError is raised instead, so unattended
+# batch jobs never block; the loaders send those rows to a quarantine file.
+class DataQualityError(ValueError):
+    """Raised instead of prompting for input when running non-interactively."""
+
+_interactive = True
+
+def set_interactive(flag):
+    global _interactive
+    _interactive = bool(flag)
+
+def is_interactive():
+    return _interactive
+
+@contextlib.contextmanager
+def non_interactive():
+    """Context manager that turns off input() prompts for the enclosed block."""
+    previous = is_interactive()
+    set_interactive(False)
+    try:
+        yield
+    finally:
+        set_interactive(previous)
 
-consoleHandler = logging.StreamHandler()
-consoleHandler.setLevel(logging.INFO)
+def prompt_for(prompt, reason):
+    """Prints prompt and returns the user's input, or raises DataQualityError(reason) when non-interactive."""
+    if not _interactive:
+        raise DataQualityError(reason)
+    if prompt:
+        print(prompt)
+    return input()
 
-logger.addHandler(fileHandler)
-logger.addHandler(consoleHandler)
+
+# quarantine files for rows rejected by the loaders
+class QuarantineWriter:
+    """Appends rejected rows, plus a reason column, to a quarantine csv file.
+
+    The file is only created when the first row is rejected.  Use
+    QuarantineWriter.for_file to put the quarantine file for an input file in
+    quarantine_dir, e.g. Customers.csv -> quarantine_dir/Customers_quarantine.csv.
+    """
+
+    def __init__(self, path, header=None):
+        self.path = path
+        self.header = header
+        self.count = 0
+        self._file = None
+        self._csvwriter = None
+
+    @classmethod
+    def for_file(cls, quarantine_dir, input_file):
+        name = os.path.splitext(os.path.basename(input_file))[0]
+        return cls(os.path.join(quarantine_dir, f"{name}_quarantine.csv"))
+
+    def set_header(self, header):
+        if self.header is None:
+            self.header = list(header) + ['reason']
+
+    def reject(self, row, reason):
+        if self._csvwriter is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._file = open(self.path, 'w', newline='')
+            self._csvwriter = csv.writer(self._file, lineterminator=os.linesep)
+            if self.header is not None:
+                self._csvwriter.writerow(self.header)
+        self._csvwriter.writerow(list(row) + [reason])
+        self.count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._csvwriter = None
+            logger.warning("%d rejected rows were written to quarantine file %s.", self.count, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
 
 # check for valid credit card
-pattern1 = "^[456][0-9]{3}-?[0-9]{4}-?[0-9]{4}-?[0-9]{4}$"
-pattern2 = r"((\d)(?!\2{3})){16}"
+# reason codes returned by card_number_reason and validate_card_numbers
+CARD_VALID = 'VALID'
+CARD_BAD_FORMAT = 'BAD_FORMAT'
+CARD_BAD_PREFIX = 'BAD_PREFIX'
+CARD_REPEATED_DIGITS = 'REPEATED_DIGITS'
+CARD_BAD_CHECKSUM = 'BAD_CHECKSUM'
+
+CARD_PREFIXES = frozenset('456')
+_DIGITS = frozenset('0123456789')
+_REPEATED_RUNS = tuple(d*4 for d in '0123456789')
+
+def _luhn_checksum_ok(digits):
+    total = 0
+    for i, c in enumerate(reversed(digits)):
+        d = ord(c) - 48
+        if i % 2:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    return total % 10 == 0
+
+def card_number_reason(sequence, check_luhn=False):
+    """Returns the reason code for a credit card number, CARD_VALID if it passes.
+
+    Same rules as is_valid_card_number, checked without regular expressions.
+    With check_luhn the Luhn checksum must also be correct.
+    """
+    if not isinstance(sequence, str):
+        return CARD_BAD_FORMAT
+    
+    # four groups of four digits, optionally separated by one hyphen each
+    n = len(sequence)
+    groups = []
+    pos = 0
+    for g in range(4):
+        if g and pos < n and sequence[pos] == '-':
+            pos += 1
+        group = sequence[pos:pos + 4]
+        if len(group) != 4 or not _DIGITS.issuperset(group):
+            return CARD_BAD_FORMAT
+        groups.append(group)
+        pos += 4
+    if pos != n:
+        return CARD_BAD_FORMAT
+    
+    if sequence[0] not in CARD_PREFIXES:
+        return CARD_BAD_PREFIX
+    
+    digits = ''.join(groups)
+    for run in _REPEATED_RUNS:
+        if run in digits:
+            return CARD_REPEATED_DIGITS
+    
+    if check_luhn and not _luhn_checksum_ok(digits):
+        return CARD_BAD_CHECKSUM
+    
+    return CARD_VALID
+
+def validate_card_numbers(sequences, check_luhn=False):
+    """Validates a whole column of credit card numbers in one pass.
+
+    Returns (mask, reasons): mask[i] is True if sequences[i] is valid and
+    reasons[i] is its reason code.
+    """
+    reasons = [card_number_reason(seq, check_luhn) for seq in sequences]
+    mask = [reason == CARD_VALID for reason in reasons]
+    return mask, reasons
 
 def is_valid_card_number(sequence):
     """Returns True if the sequence is a valid credit card number.
@@ -51,14 +303,7 @@ def is_valid_card_number(sequence):
     - must NOT have 4 or more consecutive repeated digits.
     """
 
-    if re.match(pattern1,sequence) == None:
-        return False
-    
-    sequence = sequence.replace("-", "")
-    if re.match(pattern2, sequence) == None:
-        return False
-    
-    return True
+    return card_number_reason(sequence) == CARD_VALID
     
 
 # check for valid date string
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+
+"""
+@Date: 2026-10-18
+
+This file provides EntityDict, a drop-in replacement for the plain
+dictionaries of objects returned by the load_*_file_to_dict functions.
+
+An EntityDict behaves exactly like a dict, but tells its listeners whenever a
+record is added, replaced or removed.  Secondary structures such as the
+customer index in "bank_customer_index.py" register as listeners so they stay
+in step with the dictionary without rescanning it.
+
+A listener is any object with two methods:
+    on_set(key, old, new)   called after dict[key] = new; old is MISSING for a new key
+    on_delete(key, old)     called after key was removed
+
+Example:
+    checking_acct_objects_dict = EntityDict(load_checking_file_to_dict(infile))
+    checking_acct_objects_dict.add_listener(my_listener)
+
+"""
+
+
+# marker passed as the old value when a key is new
+MISSING = object()
+
+
+class EntityDict(dict):
+    """A dict that notifies listeners about added, replaced and removed records."""
+
+    def __init__(self, *args, **kwargs):
+        dict.__init__(self, *args, **kwargs)
+        self._listeners = []
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self._listeners.remove(listener)
+
+    def __setitem__(self, key, value):
+        old = dict.get(self, key, MISSING)
+        dict.__setitem__(self, key, value)
+        for listener in self._listeners:
+            listener.on_set(key, old, value)
+
+    def __delitem__(self, key):
+        old = dict.__getitem__(self, key)
+        dict.__delitem__(self, key)
+        for listener in self._listeners:
+            listener.on_delete(key, old)
+
+    def pop(self, key, *default):
+        if key not in self:
+            return dict.pop(self, key, *default)
+        old = dict.pop(self, key)
+        for listener in self._listeners:
+            listener.on_delete(key, old)
+        return old
+
+    def popitem(self):
+        key, old = dict.popitem(self)
+        for listener in self._listeners:
+            listener.on_delete(key, old)
+        return key, old
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self):
+        while self:
+            self.popitem()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __reduce__(self):
+        # pickle as a plain mapping; listeners belong to the local process
+        return (self.__class__, (dict(self),))
+
+
+### EOF
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+
+"""
+@Date: 2026-10-18
+
+This file measures how long importing the bank modules takes, and checks each
+one against an import-cost budget, so that short command line runs keep
+starting fast.
+
+Every module is imported in a fresh interpreter, several times, with the
+median taken.  Besides the time, each run records:
+1. which of the heavy optional dependencies (pandas, numpy, dateutil,
+   pprint, logging.handlers) the import loaded, none of which the core
+   modules need until a code path uses them,
+2. the files the import opened (still open file descriptors, and files that
+   appeared in the working directory, such as main.log).
+
+A module fails the check when its median import time is over its budget,
+when it loads a heavy dependency it is not allowed, or when the import leaves
+a file behind.
+
+Example:
+    python bank_import_benchmark.py            # exits with status 1 if a check fails
+    python bank_import_benchmark.py 10         # 10 runs per module
+
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# median import time allowed per module, in milliseconds, on top of interpreter startup
+IMPORT_BUDGET_MS = {
+    'bank_data_quality_checks': 20,
+    'bank_classes_and_io_funcs': 30,
+    'bank_main': 30,
+}
+
+HEAVY_MODULES = ('pandas', 'numpy', 'dateutil', 'pprint', 'logging.handlers')
+
+# heavy modules a module may load at import because it needs them
+ALLOWED_HEAVY = {}
+
+# run in the child interpreter: import one module and report on it as JSON
+_CHILD = """
+import json, os, sys, time
+def fds():
+    try:
+        return set(os.listdir('/proc/self/fd'))
+    except OSError:
+        return set()
+before_fds, before_files = fds(), set(os.listdir('.'))
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+opened = sorted(os.readlink('/proc/self/fd/' + fd) for fd in fds() - before_fds
+                if os.path.exists('/proc/self/fd/' + fd))
+print(json.dumps({{'seconds': seconds,
+                  'heavy': [m for m in {heavy!r} if m in sys.modules],
+                  'opened': opened,
+                  'new_files': sorted(set(os.listdir('.')) - before_files)}}))
+"""
+
+
+def _run_child(code, cwd, pycache_dir):
+    # byte-code is cached outside the repository, as an installed copy would have it
+    env = dict(os.environ, PYTHONPATH=REPO_DIR + os.pathsep + os.environ.get('PYTHONPATH', ''),
+               PYTHONPYCACHEPREFIX=pycache_dir)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    proc = subprocess.run([sys.executable, '-c', code], cwd=cwd, env=env, capture_output=True, text=True,
+                          check=True)
+    return proc.stdout
+
+
+def measure_import(module, pycache_dir, runs=5):
+    """Imports module in runs fresh interpreters and returns the median time and what the import touched."""
+    samples, heavy, opened, new_files = [], set(), set(), set()
+    code = _CHILD.format(module=module, heavy=HEAVY_MODULES)
+    # the first import compiles and caches the byte-code; it is not counted
+    with tempfile.TemporaryDirectory(prefix='bank_import_') as cwd:
+        _run_child(code, cwd, pycache_dir)
+    for _ in range(runs):
+        # an empty working directory per run shows any file the import creates
+        with tempfile.TemporaryDirectory(prefix='bank_import_') as cwd:
+            result = json.loads(_run_child(code, cwd, pycache_dir).splitlines()[-1])
+        samples.append(result['seconds'])
+        heavy.update(result['heavy'])
+        opened.update(result['opened'])
+        new_files.update(result['new_files'])
+    return {'module': module,
+            'median_ms': 1000*statistics.median(samples),
+            'min_ms': 1000*min(samples),
+            'heavy': sorted(heavy),
+            'opened': sorted(opened),
+            'new_files': sorted(new_files)}
+
+
+def interpreter_startup_ms(runs=5):
+    """Median wall time of starting and stopping an interpreter that imports nothing."""
+    samples = []
+    with tempfile.TemporaryDirectory(prefix='bank_import_') as cwd:
+        for _ in range(runs + 1):
+            start = time.perf_counter()
+            _run_child("pass", cwd, cwd)
+            samples.append(time.perf_counter() - start)
+    return 1000*statistics.median(samples[1:])
+
+
+def run_benchmark(modules=tuple(IMPORT_BUDGET_MS), runs=5):
+    """Measures every module and returns the results, each with 'ok' and the reasons it failed."""
+    results = []
+    with tempfile.TemporaryDirectory(prefix='bank_import_pycache_') as pycache_dir:
+        for module in modules:
+            results.append(check_import(measure_import(module, pycache_dir, runs)))
+    return results
+
+
+def check_import(result):
+    """Adds the budget, 'ok' and the reasons the import failed its checks to a measure_import result."""
+    module = result['module']
+    budget = IMPORT_BUDGET_MS.get(module)
+    problems = []
+    if budget is not None and result['median_ms'] > budget:
+        problems.append(f"over budget ({result['median_ms']:.1f} ms > {budget} ms)")
+    unexpected = sorted(set(result['heavy']) - set(ALLOWED_HEAVY.get(module, ())))
+    if unexpected:
+        problems.append(f"loads {', '.join(unexpected)}")
+    if result['opened'] or result['new_files']:
+        problems.append(f"opens {', '.join(result['opened'] + result['new_files'])}")
+    result.update({'budget_ms': budget, 'ok': not problems, 'problems': problems})
+    return result
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"interpreter startup {interpreter_startup_ms(runs):.1f} ms")
+    results = run_benchmark(runs=runs)
+    for r in results:
+        print(f"{r['module']:<26} {r['median_ms']:7.1f} ms  budget {r['budget_ms']:>4} ms  "
+              f"{'ok' if r['ok'] else 'FAIL: ' + '; '.join(r['problems'])}")
+    sys.exit(0 if all(r['ok'] for r in results) else 1)
+
+
+### EOF
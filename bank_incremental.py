@@ -0,0 +1,341 @@
+#!/usr/bin/env python
+
+"""
+@Date: 2026-10-18
+
+This file persists only what changed since the last write, instead of
+rewriting a whole csv file with write_*_to_file after every update.
+
+1. ChangeTracker follows the entity dictionaries and records, per entity,
+   which keys are dirty (changed by a set_* method or a money movement),
+   which are new and which were deleted.  It listens for changes instead of
+   scanning, so finding the changes costs nothing per untouched record.
+2. IncrementalStore keeps each entity on disk as a base csv file (the usual
+   write_*_to_file output) plus an append-only delta file next to it.  persist()
+   appends one row per changed key to the delta file, and the base file is
+   compacted (rewritten in full) once the delta grows past compact_ratio times
+   the number of records.
+
+The delta file "<base>.delta" has the same columns as the base file with two
+in front: _op ('upsert' or 'delete') and _key.  load_incremental_file_to_dict
+reads a base file and applies its delta.  A last delta line without its line
+break was cut short by a crash; it is ignored on load and dropped before the
+next append.
+
+Example:
+    tracker = ChangeTracker()
+    cust_objects_dict = tracker.track('customers', load_customer_file_to_dict(infile))
+    store = IncrementalStore(tracker, {'customers': "sample_output/Customers.csv"})
+    cust_objects_dict['600000'].set_last_name('Smith-Coleman')
+    store.persist()      # appends one row to sample_output/Customers.csv.delta
+    tracker.close()      # stops listening for changes
+
+"""
+
+import csv
+import io
+import os
+
+from bank_classes_and_io_funcs import (Branch, Customer, Employee, CheckingAccount, SavingsAccount,
+                                       CreditCard, LoanAccount,
+                                       BANK_LOCATION_COLUMNS, CUSTOMER_COLUMNS, EMPLOYEE_COLUMNS,
+                                       CHECKING_ACCOUNT_COLUMNS, SAVINGS_ACCOUNT_COLUMNS,
+                                       CREDIT_CARD_COLUMNS, LOAN_ACCOUNT_COLUMNS,
+                                       bank_location_to_row, customer_to_row, employee_to_row,
+                                       checking_account_to_row, savings_account_to_row,
+                                       credit_card_to_row, loan_account_to_row,
+                                       write_bank_locations_to_file, write_customers_to_file,
+                                       write_employees_to_file, write_checking_accounts_to_file,
+                                       write_savings_accounts_to_file, write_credit_card_accounts_to_file,
+                                       write_loan_accounts_to_file,
+                                       load_bank_locations_rows_to_dict, load_customer_rows_to_dict,
+                                       load_employees_rows_to_dict, load_checking_rows_to_dict,
+                                       load_savings_rows_to_dict, load_credit_card_rows_to_dict,
+                                       load_loan_rows_to_dict,
+                                       add_change_listener, remove_change_listener, add_movement_listener,
+                                       remove_movement_listener, logger)
+from bank_entity_dict import EntityDict, MISSING
+
+
+UPSERT = 'upsert'
+DELETE = 'delete'
+DELTA_SUFFIX = '.delta'
+DELTA_PREFIX_COLUMNS = ['_op', '_key']
+
+# compact once the delta file holds more rows than this fraction of the records
+DEFAULT_COMPACT_RATIO = 0.5
+
+
+class EntitySpec:
+    def __init__(self, cls, key_attr, columns, to_row, write, load_rows):
+        self.cls = cls
+        self.key_attr = key_attr
+        self.columns = columns
+        self.to_row = to_row
+        self.write = write
+        self.load_rows = load_rows
+
+
+ENTITIES = {
+    'branches': EntitySpec(Branch, 'location_id', BANK_LOCATION_COLUMNS, bank_location_to_row,
+                           write_bank_locations_to_file, load_bank_locations_rows_to_dict),
+    'customers': EntitySpec(Customer, 'customer_id', CUSTOMER_COLUMNS, customer_to_row,
+                            write_customers_to_file, load_customer_rows_to_dict),
+    'employees': EntitySpec(Employee, 'employee_id', EMPLOYEE_COLUMNS, employee_to_row,
+                            write_employees_to_file, load_employees_rows_to_dict),
+    'checking': EntitySpec(CheckingAccount, 'account_number', CHECKING_ACCOUNT_COLUMNS, checking_account_to_row,
+                           write_checking_accounts_to_file, load_checking_rows_to_dict),
+    'savings': EntitySpec(SavingsAccount, 'account_number', SAVINGS_ACCOUNT_COLUMNS, savings_account_to_row,
+                          write_savings_accounts_to_file, load_savings_rows_to_dict),
+    'credit_cards': EntitySpec(CreditCard, 'credit_card_number', CREDIT_CARD_COLUMNS, credit_card_to_row,
+                               write_credit_card_accounts_to_file, load_credit_card_rows_to_dict),
+    'loans': EntitySpec(LoanAccount, 'loan_account_number', LOAN_ACCOUNT_COLUMNS, loan_account_to_row,
+                        write_loan_accounts_to_file, load_loan_rows_to_dict),
+}
+
+
+################################################
+##### Change tracking
+################################################
+class EntityChanges:
+    """Dirty, new and deleted keys of one entity since the last persist."""
+
+    def __init__(self):
+        self.dirty = set()
+        self.new = set()
+        self.deleted = set()
+
+    def __bool__(self):
+        return bool(self.dirty or self.new or self.deleted)
+
+    def __len__(self):
+        return len(self.dirty | self.new) + len(self.deleted)
+
+    def clear(self):
+        self.dirty.clear()
+        self.new.clear()
+        self.deleted.clear()
+
+
+class ChangeTracker:
+    """Records which keys of each tracked entity dictionary changed."""
+
+    def __init__(self):
+        self.dicts = {}
+        self.changes = {}
+        self._by_class = {}
+        add_change_listener(self._on_change)
+        add_movement_listener(self._on_movement)
+        self._listening = True
+
+    def close(self):
+        """Stops following the set_* methods and money movements."""
+        if self._listening:
+            remove_change_listener(self._on_change)
+            remove_movement_listener(self._on_movement)
+            self._listening = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def track(self, entity, data_dict):
+        """Starts tracking data_dict as entity.  Returns the EntityDict to use in its place."""
+        spec = ENTITIES[entity]
+        if not isinstance(data_dict, EntityDict):
+            data_dict = EntityDict(data_dict)
+        data_dict.add_listener(_TrackerListener(self, entity))
+        self.dicts[entity] = data_dict
+        self.changes[entity] = EntityChanges()
+        self._by_class[spec.cls] = entity
+        return data_dict
+
+    def mark_dirty(self, entity, key):
+        changes = self.changes[entity]
+        if key not in changes.new:
+            changes.dirty.add(key)
+
+    def _mark_obj(self, obj):
+        entity = self._by_class.get(type(obj))
+        if entity is None:
+            return
+        key = getattr(obj, ENTITIES[entity].key_attr)
+        # ignore objects that are not (or no longer) the record held under their key
+        if self.dicts[entity].get(key) is obj:
+            self.mark_dirty(entity, key)
+
+    def _on_change(self, obj, field, old_value):
+        self._mark_obj(obj)
+
+    def _on_movement(self, obj, op, amount, old_balance):
+        self._mark_obj(obj)
+
+    def clear(self, entity=None):
+        for name in ([entity] if entity else self.changes):
+            self.changes[name].clear()
+
+
+class _TrackerListener:
+    def __init__(self, tracker, entity):
+        self.tracker = tracker
+        self.entity = entity
+
+    def on_set(self, key, old, new):
+        changes = self.tracker.changes[self.entity]
+        if old is MISSING and key not in changes.deleted:
+            changes.new.add(key)
+        else:
+            changes.deleted.discard(key)
+            self.tracker.mark_dirty(self.entity, key)
+
+    def on_delete(self, key, old):
+        changes = self.tracker.changes[self.entity]
+        changes.dirty.discard(key)
+        if key in changes.new:
+            changes.new.discard(key)
+        else:
+            changes.deleted.add(key)
+
+
+################################################
+##### Incremental store
+################################################
+class IncrementalStore:
+    """Base csv file plus append-only delta file per tracked entity."""
+
+    def __init__(self, tracker, paths, compact_ratio=DEFAULT_COMPACT_RATIO):
+        self.tracker = tracker
+        self.paths = dict(paths)
+        self.compact_ratio = compact_ratio
+        self.delta_rows = {}
+        for entity, path in self.paths.items():
+            if entity not in tracker.dicts:
+                raise ValueError(f"Entity {entity!r} is not tracked by the change tracker.")
+            if not os.path.exists(path):
+                self.compact(entity)
+            else:
+                self.delta_rows[entity] = _count_delta_rows(path + DELTA_SUFFIX)
+
+    def _append_changes(self, entity):
+        changes = self.tracker.changes[entity]
+        if not changes:
+            return 0
+        spec = ENTITIES[entity]
+        data_dict = self.tracker.dicts[entity]
+        blank = [''] * len(spec.columns)
+        rows = [[UPSERT, key] + spec.to_row(data_dict[key]) for key in sorted(changes.dirty | changes.new)]
+        rows += [[DELETE, key] + blank for key in sorted(changes.deleted)]
+        _append_delta(self.paths[entity] + DELTA_SUFFIX, spec.columns, rows)
+        self.delta_rows[entity] = self.delta_rows.get(entity, 0) + len(rows)
+        changes.clear()
+        return len(rows)
+
+    def persist(self):
+        """Appends every pending change to the delta files.  Returns {entity: rows written}."""
+        written = {}
+        for entity in self.paths:
+            count = self._append_changes(entity)
+            if not count:
+                continue
+            written[entity] = count
+            if self.delta_rows[entity] > self.compact_ratio * max(len(self.tracker.dicts[entity]), 1):
+                self.compact(entity)
+
+        if written:
+            logger.info("Persisted incremental changes: %s.", written)
+        return written
+
+    def compact(self, entity=None):
+        """Rewrites the base file from memory and removes its delta file."""
+        for name in ([entity] if entity else self.paths):
+            path = self.paths[name]
+            # the delta gets the pending changes first: after a crash before it is removed,
+            # replaying it over the new base then gives the same records again
+            self._append_changes(name)
+            ENTITIES[name].write(self.tracker.dicts[name], path)
+            try:
+                os.remove(path + DELTA_SUFFIX)
+            except FileNotFoundError:
+                pass
+            self.delta_rows[name] = 0
+            self.tracker.clear(name)
+
+
+def _count_delta_rows(delta_path):
+    if not os.path.exists(delta_path):
+        return 0
+    with open(delta_path, 'r') as file:
+        return max(sum(1 for _ in file) - 1, 0)
+
+
+def _drop_torn_tail(delta_path):
+    # cut the file back to its last line break, so the next row does not get glued to a partial line
+    with open(delta_path, 'rb+') as file:
+        end = pos = file.seek(0, os.SEEK_END)
+        while pos > 0:
+            step = min(64*1024, pos)
+            pos -= step
+            file.seek(pos)
+            chunk = file.read(step)
+            if pos + step == end and chunk.endswith(b'\n'):
+                return
+            i = chunk.rfind(b'\n')
+            if i >= 0:
+                file.truncate(pos + i + 1)
+                return
+        file.truncate(0)
+
+
+def _append_delta(delta_path, columns, rows):
+    if os.path.exists(delta_path):
+        _drop_torn_tail(delta_path)
+    new_file = not os.path.exists(delta_path) or os.path.getsize(delta_path) == 0
+    with open(delta_path, 'a', newline='') as file:
+        csvwriter = csv.writer(file, lineterminator=os.linesep)
+        if new_file:
+            csvwriter.writerow(DELTA_PREFIX_COLUMNS + columns)
+        csvwriter.writerows(rows)
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def load_incremental_file_to_dict(entity, path, quarantine=None):
+    """Loads the base csv file at path, applies its delta file and returns the dictionary of objects."""
+    spec = ENTITIES[entity]
+    key_col = spec.columns.index(spec.key_attr)
+    width = len(DELTA_PREFIX_COLUMNS) + len(spec.columns)
+
+    rows = {}
+    with open(path, 'r') as file:
+        csvreader = csv.reader(file)
+        # This skips the first header row of the CSV file.
+        next(csvreader)
+        for row in csvreader:
+            rows[row[key_col]] = row
+
+    delta_path = path + DELTA_SUFFIX
+    if os.path.exists(delta_path):
+        with open(delta_path, 'r') as file:
+            data = file.read()
+        # a crash can leave a partial last line; only lines that end in a line break are complete
+        if not data.endswith('\n'):
+            data = data[:data.rfind('\n') + 1]
+        csvreader = csv.reader(io.StringIO(data))
+        if next(csvreader, None) is not None:
+            for row in csvreader:
+                if len(row) != width:
+                    continue
+                op, key = row[0], row[1]
+                if op == UPSERT:
+                    rows[key] = row[2:]
+                elif op == DELETE:
+                    rows.pop(key, None)
+
+    data_dict = spec.load_rows(iter(rows.values()), quarantine=quarantine)
+    logger.info("%s and its delta file loaded to dictionary.", path)
+    return data_dict
+
+
+### EOF
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+
+"""
+@Date: 2026-10-18
+
+This file times loading, updating and writing every entity file at several
+sizes, on synthetic data from "bank_synthetic_data.py", and writes the
+timings to a JSON report so runs can be compared to catch regressions.
+
+For each size and entity the benchmark:
+1. generates the input file (not timed as part of the I/O figures),
+2. loads it with load_*_file_to_dict inside non_interactive(), rejected rows
+   going to a quarantine file,
+3. updates mutate_ratio of the loaded records with the usual methods
+   (deposit, make_purchase, set_salary, ...) inside log_batch(), so the
+   set_* methods log one summary instead of one record each,
+4. writes the records back with write_*_to_file.
+
+The report holds the run settings, the Python and platform versions, the
+generation time per size and one result per (size, entity) with seconds and
+rows per second for each step.
+
+Example:
+    python bank_io_benchmark.py io_report.json 1000 10000 100000
+
+"""
+
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+from bank_classes_and_io_funcs import (load_bank_locations_file_to_dict, load_customer_file_to_dict,
+                                       load_employees_file_to_dict, load_checking_file_to_dict,
+                                       load_savings_file_to_dict, load_credit_card_file_to_dict,
+                                       load_loan_file_to_dict,
+                                       write_bank_locations_to_file, write_customers_to_file,
+                                       write_employees_to_file, write_checking_accounts_to_file,
+                                       write_savings_accounts_to_file, write_credit_card_accounts_to_file,
+                                       write_loan_accounts_to_file, logger)
+from bank_data_quality_checks import QuarantineWriter, configure_logging, log_batch, non_interactive
+from bank_synthetic_data import FILE_NAMES, generate_dataset
+
+
+DEFAULT_SIZES = (1000, 10000, 100000, 1000000, 10000000)
+DEFAULT_MUTATE_RATIO = 0.01
+REPORT_VERSION = 1
+
+LOADERS = {
+    'branches': load_bank_locations_file_to_dict,
+    'customers': load_customer_file_to_dict,
+    'employees': load_employees_file_to_dict,
+    'checking': load_checking_file_to_dict,
+    'savings': load_savings_file_to_dict,
+    'credit_cards': load_credit_card_file_to_dict,
+    'loans': load_loan_file_to_dict,
+}
+
+WRITERS = {
+    'branches': write_bank_locations_to_file,
+    'customers': write_customers_to_file,
+    'employees': write_employees_to_file,
+    'checking': write_checking_accounts_to_file,
+    'savings': write_savings_accounts_to_file,
+    'credit_cards': write_credit_card_accounts_to_file,
+    'loans': write_loan_accounts_to_file,
+}
+
+# one representative update per entity; branches have no update methods
+MUTATORS = {
+    'customers': lambda c: c.set_last_name(c.get_last_name().upper()),
+    'employees': lambda e: e.set_salary(e.get_salary()*1.03),
+    'checking': lambda a: a.deposit(10),
+    'savings': lambda a: a.deposit(10),
+    'credit_cards': lambda c: c.make_purchase(10),
+    'loans': lambda l: l.set_annual_interest_rate(l.get_annual_interest_rate()),
+}
+
+
+def _rate(rows, seconds):
+    return rows/seconds if seconds > 0 else None
+
+
+def benchmark_entity(entity, path, out_dir, mutate_ratio=DEFAULT_MUTATE_RATIO):
+    """Loads, updates and writes one file; returns the timings."""
+    start = time.perf_counter()
+    with non_interactive(), QuarantineWriter.for_file(out_dir, path) as quarantine:
+        data_dict = LOADERS[entity](path, quarantine=quarantine)
+    load_seconds = time.perf_counter() - start
+
+    mutate_seconds, mutated = None, 0
+    if entity in MUTATORS:
+        step = max(1, round(1/mutate_ratio)) if mutate_ratio > 0 else 0
+        records = list(data_dict.values())[::step] if step else []
+        mutate = MUTATORS[entity]
+        start = time.perf_counter()
+        # keep the receipts some methods print and the per-record log messages out of the timings' way
+        with contextlib.redirect_stdout(io.StringIO()), log_batch(f"{entity} updates"):
+            for obj in records:
+                mutate(obj)
+        mutate_seconds = time.perf_counter() - start
+        mutated = len(records)
+
+    start = time.perf_counter()
+    WRITERS[entity](data_dict, os.path.join(out_dir, FILE_NAMES[entity]))
+    write_seconds = time.perf_counter() - start
+
+    loaded = len(data_dict)
+    return {'loaded': loaded,
+            'rejected': quarantine.count,
+            'load_seconds': load_seconds,
+            'load_rows_per_second': _rate(loaded + quarantine.count, load_seconds),
+            'mutated': mutated,
+            'mutate_seconds': mutate_seconds,
+            'mutate_per_second': _rate(mutated, mutate_seconds) if mutated else None,
+            'write_seconds': write_seconds,
+            'write_rows_per_second': _rate(loaded, write_seconds),
+            'file_bytes': os.path.getsize(path)}
+
+
+def run_benchmark(sizes=DEFAULT_SIZES, seed=0, dirty_ratio=0.01, mutate_ratio=DEFAULT_MUTATE_RATIO,
+                  entities=tuple(FILE_NAMES), work_dir=None, report_path=None):
+    """Runs the benchmark at every size and returns the report; writes it to report_path if given."""
+    report = {'version': REPORT_VERSION,
+              'python': platform.python_version(),
+              'platform': platform.platform(),
+              'seed': seed,
+              'dirty_ratio': dirty_ratio,
+              'mutate_ratio': mutate_ratio,
+              'generate_seconds': {},
+              'results': []}
+    own_work_dir = work_dir is None
+    work_dir = work_dir or tempfile.mkdtemp(prefix='bank_io_benchmark_')
+    try:
+        for rows in sizes:
+            in_dir = os.path.join(work_dir, f"in_{rows}")
+            out_dir = os.path.join(work_dir, f"out_{rows}")
+            os.makedirs(out_dir, exist_ok=True)
+            start = time.perf_counter()
+            files = generate_dataset(in_dir, rows, seed, dirty_ratio)
+            generate_seconds = time.perf_counter() - start
+
+            for entity in entities:
+                result = {'entity': entity, 'rows': rows}
+                result.update(benchmark_entity(entity, files[entity], out_dir, mutate_ratio))
+                report['results'].append(result)
+                logger.info("I/O benchmark %s at %d rows: load %.3fs, write %.3fs.",
+                            entity, rows, result['load_seconds'], result['write_seconds'])
+            report['generate_seconds'][str(rows)] = generate_seconds
+            shutil.rmtree(in_dir)
+            shutil.rmtree(out_dir)
+    finally:
+        if own_work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    if report_path is not None:
+        with open(report_path, 'w') as file:
+            json.dump(report, file, indent=2)
+        logger.info("I/O benchmark report written to %s.", report_path)
+    return report
+
+
+if __name__ == "__main__":
+    configure_logging(queued=True)
+    report_path = sys.argv[1] if len(sys.argv) > 1 else "io_benchmark_report.json"
+    sizes = [int(n) for n in sys.argv[2:]] or DEFAULT_SIZES
+    report = run_benchmark(sizes, report_path=report_path)
+    for r in report['results']:
+        print(f"{r['entity']:<13} {r['rows']:>10,} rows  load {r['load_seconds']:8.3f}s  "
+              f"write {r['write_seconds']:8.3f}s  rejected {r['rejected']:,}")
+
+
+### EOF
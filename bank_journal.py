@@ -0,0 +1,306 @@
+#!/usr/bin/env python
+
+"""
+@Date: 2026-10-18
+
+This file provides an append-only, write-ahead transaction journal for money
+movements, so balance changes survive a crash without rewriting every csv
+file after each change.
+
+Once attached, the journal is called by every deposit, withdraw,
+make_purchase, withdraw_cash, apply_interest and make_payment (see
+add_movement_listener in "bank_classes_and_io_funcs.py") and appends one
+compact binary record per movement, after a file header with the money
+mode (see "bank_money.py") the amounts are in:
+
+    header = magic (4 bytes) | money mode (uint8: 0 float dollars, 1 int cents)
+    record = crc32 (uint32) | payload length (uint16) | payload
+    payload = kind (uint8) | op (uint8) | amount, balance, available_credit (3 x float64)
+              | key length (uint16) | key (utf-8)
+
+Every record carries the balance after the movement, so replay does not
+re-run the business rules: it simply sets each account to its last journaled
+balance, converted to the current money mode.  A file without the header
+is refused with a ValueError.  Records are buffered and written with one fsync per group
+(group commit), either when group_size records are pending or when
+group_interval seconds have passed since the last commit; a timer
+thread commits a group that no later record completes.
+
+After the full write_*_to_file dump, call checkpoint() to empty the journal.
+Records still pending at that point are kept in the emptied journal.
+
+Example:
+    journal = TransactionJournal("bank.journal")
+    journal.attach()
+    checking_acct_objects_dict['168555105'].deposit(700)
+    journal.close()
+
+    # after a crash: reload the last csv dump, then
+    replay_journal("bank.journal", {'checking': checking_acct_objects_dict})
+
+"""
+
+import math
+import os
+import struct
+import threading
+import time
+import zlib
+
+from bank_classes_and_io_funcs import (CheckingAccount, SavingsAccount, CreditCard, LoanAccount,
+                                       MOVEMENT_OPS, add_movement_listener, remove_movement_listener, logger)
+from bank_money import FLOAT, CENTS, get_money_mode, to_cents, from_cents
+
+
+CHECKING = 'checking'
+SAVINGS = 'savings'
+CREDIT_CARDS = 'credit_cards'
+LOANS = 'loans'
+
+KINDS = (CHECKING, SAVINGS, CREDIT_CARDS, LOANS)
+_KIND_CODES = {kind: code for code, kind in enumerate(KINDS, 1)}
+_OP_CODES = {op: code for code, op in enumerate(MOVEMENT_OPS, 1)}
+
+_FILE_HEADER = struct.Struct('<4sB')
+_MAGIC = b'BJNL'
+_MODE_CODES = {FLOAT: 0, CENTS: 1}
+_MODES = {code: mode for mode, code in _MODE_CODES.items()}
+
+_HEADER = struct.Struct('<IH')
+_PAYLOAD = struct.Struct('<BBdddH')
+
+# defaults for group commit
+DEFAULT_GROUP_SIZE = 1000
+DEFAULT_GROUP_INTERVAL = 0.05
+
+
+def _kind_and_key(obj):
+    # subclasses first: CheckingAccount and SavingsAccount are both BankAccounts
+    if isinstance(obj, CheckingAccount):
+        return CHECKING, obj.account_number
+    if isinstance(obj, SavingsAccount):
+        return SAVINGS, obj.account_number
+    if isinstance(obj, CreditCard):
+        return CREDIT_CARDS, obj.credit_card_number
+    if isinstance(obj, LoanAccount):
+        return LOANS, obj.loan_account_number
+    raise TypeError(f"Cannot journal movements on {type(obj).__name__} objects.")
+
+
+def encode_record(kind, op, key, amount, balance, available_credit=math.nan):
+    key = key.encode('utf-8')
+    payload = _PAYLOAD.pack(_KIND_CODES[kind], _OP_CODES[op], amount, balance, available_credit, len(key)) + key
+    return _HEADER.pack(zlib.crc32(payload), len(payload)) + payload
+
+
+def iter_journal(path):
+    """Yields (kind, op, key, amount, balance, available_credit) for every intact record.
+
+    Stops at the first torn or corrupt record, which is what a crash in the
+    middle of a write leaves at the end of the file.
+    """
+    for record, _ in _iter_records(path):
+        yield record
+
+
+def _read_file_header(data, path):
+    # returns the money mode and the position of the first record; a crash while
+    # the header of a new journal was written leaves part of it, and no records
+    if len(data) < _FILE_HEADER.size and _FILE_HEADER.pack(_MAGIC, 0).startswith(data[:len(_MAGIC)]):
+        return None, len(data)
+    if data[:len(_MAGIC)] != _MAGIC:
+        raise ValueError(f"{path} is not a transaction journal: the {_MAGIC.decode()} header is missing.")
+    _, code = _FILE_HEADER.unpack_from(data)
+    if code not in _MODES:
+        raise ValueError(f"Journal {path} has an unknown money mode code {code}.")
+    return _MODES[code], _FILE_HEADER.size
+
+
+def journal_money_mode(path):
+    """The money mode the amounts in the journal at path are in, None for a journal cut short in its header."""
+    with open(path, 'rb') as file:
+        return _read_file_header(file.read(_FILE_HEADER.size), path)[0]
+
+
+def _iter_records(path):
+    with open(path, 'rb') as file:
+        data = file.read()
+    _, pos = _read_file_header(data, path)
+    while pos + _HEADER.size <= len(data):
+        crc, length = _HEADER.unpack_from(data, pos)
+        start = pos + _HEADER.size
+        payload = data[start:start + length]
+        if len(payload) < length or length < _PAYLOAD.size or zlib.crc32(payload) != crc:
+            return
+        kind, op, amount, balance, available_credit, key_len = _PAYLOAD.unpack_from(payload)
+        key = payload[_PAYLOAD.size:_PAYLOAD.size + key_len].decode('utf-8')
+        pos = start + length
+        yield (KINDS[kind - 1], MOVEMENT_OPS[op - 1], key, amount, balance, available_credit), pos
+
+
+def _valid_length(path):
+    with open(path, 'rb') as file:
+        end = _read_file_header(file.read(_FILE_HEADER.size), path)[1]
+    for _, end in _iter_records(path):
+        pass
+    return end
+
+
+class TransactionJournal:
+    """Append-only binary journal of money movements with group commit."""
+
+    def __init__(self, path, group_size=DEFAULT_GROUP_SIZE, group_interval=DEFAULT_GROUP_INTERVAL):
+        self.path = path
+        self.group_size = group_size
+        self.group_interval = group_interval
+        self.records_written = 0
+        self._buffer = bytearray()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._last_commit = time.monotonic()
+        self._timer = None
+
+        # drop a torn tail left by a crash before appending after it
+        if os.path.exists(path):
+            valid = _valid_length(path)
+            if valid != os.path.getsize(path):
+                logger.warning("Truncating torn journal tail in %s at byte %d.", path, valid)
+                os.truncate(path, valid)
+            # amounts of both money modes must not end up in one journal
+            mode = journal_money_mode(path)
+            if mode is None:
+                os.truncate(path, 0)
+            elif mode != get_money_mode():
+                if any(True for _ in _iter_records(path)):
+                    raise ValueError(f"Journal {path} holds {mode} amounts but the money mode is "
+                                     f"{get_money_mode()}. Replay it and checkpoint it in {mode} mode first.")
+                os.truncate(path, 0)
+        self._file = open(path, 'ab')
+        if self._file.tell() == 0:
+            self._write_file_header()
+
+    def _write_file_header(self):
+        self._file.write(_FILE_HEADER.pack(_MAGIC, _MODE_CODES[get_money_mode()]))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def record(self, obj, op, amount, old_balance=None):
+        """Journals one movement on obj.  Matches the movement listener signature."""
+        kind, key = _kind_and_key(obj)
+        available_credit = obj.available_credit if kind == CREDIT_CARDS else math.nan
+        data = encode_record(kind, op, key, amount, obj.balance, available_credit)
+        with self._lock:
+            self._buffer += data
+            self._pending += 1
+            if (self._pending >= self.group_size
+                    or time.monotonic() - self._last_commit >= self.group_interval):
+                self._commit_locked()
+            elif self._timer is None:
+                # commit this group once group_interval expires, even if no other record arrives
+                self._timer = threading.Timer(self.group_interval, self._commit_expired)
+                self._timer.daemon = True
+                self._timer.start()
+
+    __call__ = record
+
+    def commit(self):
+        """Writes and fsyncs every pending record."""
+        with self._lock:
+            self._commit_locked()
+
+    def _commit_expired(self):
+        with self._lock:
+            if not self._file.closed:
+                self._commit_locked()
+
+    def _commit_locked(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.records_written += self._pending
+            self._buffer.clear()
+            self._pending = 0
+        self._last_commit = time.monotonic()
+
+    def checkpoint(self):
+        """Empties the journal.  Call after all balances were written out with write_*_to_file.
+
+        Pending records may be newer than the dump, so they are committed to
+        the emptied journal rather than dropped.
+        """
+        with self._lock:
+            self._file.truncate(0)
+            self._write_file_header()
+            self._commit_locked()
+        logger.info("Transaction journal %s checkpointed.", self.path)
+
+    def attach(self):
+        add_movement_listener(self)
+
+    def detach(self):
+        try:
+            remove_movement_listener(self)
+        except ValueError:
+            pass
+
+    def close(self):
+        self.detach()
+        with self._lock:
+            self._commit_locked()
+            self._file.close()
+
+    def __enter__(self):
+        self.attach()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _to_mode(amount, saved_mode, mode):
+    # the journal stores float64, which holds cents up to 2**53 exactly
+    if saved_mode == CENTS:
+        return int(amount) if mode == CENTS else from_cents(amount)
+    return to_cents(amount) if mode == CENTS else amount
+
+
+def replay_journal(path, stores):
+    """Restores balances from the journal at path into stores.
+
+    stores maps kind ('checking', 'savings', 'credit_cards', 'loans') to the
+    dictionary of objects for that kind, as reloaded from the last csv dump.
+    Only the last record for each account is applied, converted from the
+    journal's money mode to the current one.  Returns a dictionary
+    with the number of records read, accounts restored and records whose
+    account was not found.
+    """
+    latest = {}
+    records = 0
+    for kind, op, key, amount, balance, available_credit in iter_journal(path):
+        latest[(kind, key)] = (balance, available_credit)
+        records += 1
+
+    restored = missing = 0
+    saved_mode, mode = journal_money_mode(path), get_money_mode()
+    for (kind, key), (balance, available_credit) in latest.items():
+        obj = stores.get(kind, {}).get(key)
+        if obj is None:
+            missing += 1
+            continue
+        balance = _to_mode(balance, saved_mode, mode)
+        if kind == CREDIT_CARDS:
+            available_credit = _to_mode(available_credit, saved_mode, mode)
+        obj.balance = balance
+        if kind == CREDIT_CARDS:
+            obj.available_credit = available_credit
+        restored += 1
+
+    logger.info("Replayed %d journal records from %s onto %d accounts.", records, path, restored)
+    return {'records': records, 'restored': restored, 'missing': missing}
+
+
+### EOF
@@ -0,0 +1,383 @@
+#!/usr/bin/env python
+
+"""
+@Date: 2026-10-18
+
+This file provides a columnar alternative to the dictionary of CheckingAccount
+and SavingsAccount objects built by "bank_classes_and_io_funcs.py".
+
+Instead of one Python object per account, an AccountLedger keeps every column
+(customer_id, account_number, balance, annual_interest_rate) in a NumPy array
+and maps account number -> row number in a plain dictionary.  Single account
+operations follow the same rules as BankAccount/CheckingAccount, and the bulk
+operations work on whole arrays at once.
+
+Example:
+    ledger = load_savings_file_to_ledger("sample_input/SavingsAccounts.csv")
+    ledger.deposit('168444660', 2000)
+    ledger.deposit_many(['168444555', '168444660'], [100, 250])
+    write_savings_accounts_to_file(ledger, "sample_output/SavingsAccounts.csv")
+
+A ledger created in the cents money mode of "bank_money.py" keeps its
+balances as int64 cents, and amounts passed to it are int cents.
+
+"""
+
+import csv
+import numpy as np
+
+from bank_classes_and_io_funcs import CheckingAccount, SavingsAccount, logger
+from bank_money import is_cents_mode, to_cents, format_cents, monthly_interest_cents_array
+
+
+CHECKING = 'checking'
+SAVINGS = 'savings'
+
+
+################################################
+##### AccountLedger class and functions
+################################################
+class AccountLedger:
+    """Columnar store of checking or savings accounts backed by NumPy arrays.
+
+    Rows are kept densely packed in the first len(ledger) slots of each array.
+    The arrays grow by doubling, so appending one account is amortized O(1).
+    """
+
+    DEFAULT_CAPACITY = 1024
+    DEFAULT_INTEREST_RATE = 0.008
+
+    def __init__(self, account_type=SAVINGS, capacity=DEFAULT_CAPACITY):
+        if account_type not in (CHECKING, SAVINGS):
+            raise ValueError(f"Unknown account type {account_type!r}. Use '{CHECKING}' or '{SAVINGS}'.")
+        self.account_type = account_type
+        self._size = 0
+        self._index = {}
+        capacity = max(int(capacity), 1)
+        self._customer_ids = np.empty(capacity, dtype='U16')
+        self._account_numbers = np.empty(capacity, dtype='U16')
+        self._cents = is_cents_mode()
+        self._balances = np.zeros(capacity, dtype=np.int64 if self._cents else np.float64)
+        self._rates = np.zeros(capacity, dtype=np.float64)
+
+    # array views over the live rows
+    @property
+    def customer_ids(self):
+        return self._customer_ids[:self._size]
+
+    @property
+    def account_numbers(self):
+        return self._account_numbers[:self._size]
+
+    @property
+    def balances(self):
+        return self._balances[:self._size]
+
+    @property
+    def annual_interest_rates(self):
+        return self._rates[:self._size]
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, acct_num):
+        return acct_num in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __getitem__(self, acct_num):
+        return LedgerAccount(self, acct_num)
+
+    def keys(self):
+        return self._index.keys()
+
+    def values(self):
+        return (LedgerAccount(self, acct_num) for acct_num in self._index)
+
+    def items(self):
+        return ((acct_num, LedgerAccount(self, acct_num)) for acct_num in self._index)
+
+    def row_of(self, acct_num):
+        return self._index[acct_num]
+
+    def rows_of(self, acct_nums):
+        index = self._index
+        return np.fromiter((index[a] for a in acct_nums), dtype=np.intp, count=len(acct_nums))
+
+    # storage management
+    def _reserve(self, needed):
+        capacity = len(self._balances)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        self._customer_ids = _grow(self._customer_ids, capacity)
+        self._account_numbers = _grow(self._account_numbers, capacity)
+        self._balances = _grow(self._balances, capacity)
+        self._rates = _grow(self._rates, capacity)
+
+    def _fit_strings(self, cust_ids, acct_nums):
+        # widen the fixed-width string columns if a longer id shows up
+        self._customer_ids = _widen(self._customer_ids, cust_ids)
+        self._account_numbers = _widen(self._account_numbers, acct_nums)
+
+    def add_account(self, cust_id, acct_num, bal=0, ann_int_rate=DEFAULT_INTEREST_RATE):
+        self.add_accounts([cust_id], [acct_num], [bal], [ann_int_rate])
+
+    def add_accounts(self, cust_ids, acct_nums, bals, ann_int_rates=None, check_balances=True):
+        """Append many accounts at once.  Existing account numbers are overwritten in place.
+
+        With check_balances the opening balances get the same checks as a new
+        BankAccount/CheckingAccount; pass False when copying existing accounts.
+        """
+        n = len(acct_nums)
+        if n == 0:
+            return
+        cust_ids = np.asarray(cust_ids, dtype=str)
+        acct_nums = np.asarray(acct_nums, dtype=str)
+        bals = np.asarray(bals, dtype=self._balances.dtype)
+        if ann_int_rates is None:
+            rates = np.full(n, self.DEFAULT_INTEREST_RATE if self.account_type == SAVINGS else 0.0)
+        else:
+            rates = np.asarray(ann_int_rates, dtype=np.float64)
+
+        minimum = CheckingAccount.MIN_BALANCE_CENTS if self._cents else CheckingAccount.MIN_BALANCE
+        if check_balances and (bals < 0).any():
+            print("Initial balance cannot be less than 0!")
+            bals = np.where(bals < 0, 0, bals)
+        if check_balances and self.account_type == CHECKING and (bals < minimum).any():
+            logger.error("%d checking accounts loaded below the minimum balance of $%.2f.",
+                         int((bals < minimum).sum()), CheckingAccount.MIN_BALANCE)
+
+        self._fit_strings(cust_ids, acct_nums)
+        self._reserve(self._size + n)
+        index = self._index
+        rows = np.empty(n, dtype=np.intp)
+        for i, acct_num in enumerate(acct_nums.tolist()):
+            row = index.get(acct_num)
+            if row is None:
+                row = self._size
+                index[acct_num] = row
+                self._size += 1
+            rows[i] = row
+        self._customer_ids[rows] = cust_ids
+        self._account_numbers[rows] = acct_nums
+        self._balances[rows] = bals
+        self._rates[rows] = rates
+
+    def remove_account(self, acct_num):
+        # move the last row into the hole so the arrays stay densely packed
+        row = self._index.pop(acct_num)
+        last = self._size - 1
+        if row != last:
+            moved = str(self._account_numbers[last])
+            self._customer_ids[row] = self._customer_ids[last]
+            self._account_numbers[row] = self._account_numbers[last]
+            self._balances[row] = self._balances[last]
+            self._rates[row] = self._rates[last]
+            self._index[moved] = row
+        self._balances[last] = 0
+        self._size = last
+
+    # single account operations, same rules as BankAccount and CheckingAccount
+    def get_customer_id(self, acct_num):
+        return str(self._customer_ids[self._index[acct_num]])
+
+    def get_balance(self, acct_num):
+        return self._balances[self._index[acct_num]].item()
+
+    def get_annual_interest_rate(self, acct_num):
+        return float(self._rates[self._index[acct_num]])
+
+    def deposit(self, acct_num, amount):
+        self._balances[self._index[acct_num]] += amount
+
+    def withdraw(self, acct_num, amount):
+        row = self._index[acct_num]
+        self._balances[row] -= amount
+        if self.account_type == CHECKING:
+            withdrawal_fee, overdraft_fee = self._checking_fees()
+            self._balances[row] -= withdrawal_fee
+            if self._balances[row] < 0:
+                self._balances[row] -= overdraft_fee
+
+    def _checking_fees(self):
+        if self._cents:
+            return CheckingAccount.WITHDRAWAL_FEE_CENTS, CheckingAccount.OVERDRAFT_FEE_CENTS
+        return CheckingAccount.WITHDRAWAL_FEE, CheckingAccount.OVERDRAFT_FEE
+
+    # bulk operations
+    def deposit_many(self, acct_nums, amounts):
+        np.add.at(self._balances, self.rows_of(acct_nums), np.asarray(amounts, dtype=self._balances.dtype))
+
+    def withdraw_many(self, acct_nums, amounts):
+        """Apply withdrawals in the order given.
+
+        Savings withdrawals are a plain scatter-subtract.  Checking withdrawals
+        carry fees, and the overdraft fee depends on the running balance, so
+        the batch is split into rounds where every account appears at most
+        once; each round is then applied as one vectorized step.
+        """
+        rows = self.rows_of(acct_nums)
+        amounts = np.asarray(amounts, dtype=self._balances.dtype)
+        if self.account_type == SAVINGS:
+            np.subtract.at(self._balances, rows, amounts)
+            return
+
+        withdrawal_fee, overdraft_fee = self._checking_fees()
+        for round_rows, round_amounts in _split_into_rounds(rows, amounts):
+            new_bal = self._balances[round_rows] - round_amounts - withdrawal_fee
+            new_bal = np.where(new_bal < 0, new_bal - overdraft_fee, new_bal)
+            self._balances[round_rows] = new_bal
+
+    def get_balances(self, acct_nums):
+        return self._balances[self.rows_of(acct_nums)]
+
+    def get_balances_next_month(self):
+        if self._cents:
+            return self.balances + monthly_interest_cents_array(self.balances, self.annual_interest_rates)
+        return np.round(self.balances*(1 + self.annual_interest_rates/12), 2)
+
+    def total_balance(self):
+        return self.balances.sum().item()
+
+    def total_balance_by_customer(self):
+        cust_ids, inverse = np.unique(self.customer_ids, return_inverse=True)
+        if self._cents:
+            totals = np.zeros(len(cust_ids), dtype=np.int64)
+            np.add.at(totals, inverse, self.balances)
+        else:
+            totals = np.bincount(inverse, weights=self.balances, minlength=len(cust_ids))
+        return dict(zip(cust_ids.tolist(), totals.tolist()))
+
+    def to_dict(self):
+        """Materialize the ledger as the usual dictionary of account objects."""
+        accounts_dict = {}
+        for acct_num, row in self._index.items():
+            cust_id = str(self._customer_ids[row])
+            bal = self._balances[row].item()
+            # the constructors take dollars, as written in the csv files
+            bal = format_cents(bal) if self._cents else bal
+            if self.account_type == SAVINGS:
+                acct = SavingsAccount(cust_id, acct_num, bal, float(self._rates[row]))
+            else:
+                acct = CheckingAccount(cust_id, acct_num, bal)
+            accounts_dict[acct_num] = acct
+        return accounts_dict
+
+    @classmethod
+    def from_dict(cls, data_dict, account_type=SAVINGS):
+        ledger = cls(account_type, capacity=len(data_dict))
+        accts = list(data_dict.values())
+        rates = None
+        if account_type == SAVINGS:
+            rates = [a.get_annual_interest_rate() for a in accts]
+        ledger.add_accounts([a.get_customer_id() for a in accts],
+                            [a.get_account_number() for a in accts],
+                            [a.get_balance() for a in accts],
+                            rates, check_balances=False)
+        return ledger
+
+
+class LedgerAccount:
+    """Lightweight handle on one ledger row with the BankAccount getters.
+
+    Handles are created on demand by AccountLedger.items() and __getitem__,
+    which lets the write_*_accounts_to_file functions take a ledger in place
+    of a dictionary of account objects.
+    """
+
+    __slots__ = ('_ledger', '_acct_num')
+
+    def __init__(self, ledger, acct_num):
+        self._ledger = ledger
+        self._acct_num = acct_num
+
+    def get_customer_id(self):
+        return self._ledger.get_customer_id(self._acct_num)
+
+    def get_account_number(self):
+        return self._acct_num
+
+    def get_balance(self):
+        return self._ledger.get_balance(self._acct_num)
+
+    def get_annual_interest_rate(self):
+        return self._ledger.get_annual_interest_rate(self._acct_num)
+
+    def deposit(self, amount):
+        self._ledger.deposit(self._acct_num, amount)
+
+    def withdraw(self, amount):
+        self._ledger.withdraw(self._acct_num, amount)
+
+
+def _grow(arr, capacity):
+    grown = np.zeros(capacity, dtype=arr.dtype)
+    grown[:len(arr)] = arr
+    return grown
+
+
+def _widen(arr, values):
+    width = max((len(v) for v in values.tolist()), default=0)
+    if width > arr.dtype.itemsize // 4:
+        return arr.astype(f'U{width}')
+    return arr
+
+
+def _split_into_rounds(rows, amounts):
+    """Yield (rows, amounts) batches in which each row occurs at most once.
+
+    Round k holds the k-th occurrence of every row, so applying the rounds in
+    sequence keeps the original per-account order.
+    """
+    if len(rows) == 0:
+        return
+    order = np.argsort(rows, kind='stable')
+    sorted_rows = rows[order]
+    starts = np.r_[0, np.flatnonzero(np.diff(sorted_rows)) + 1]
+    group_start = np.repeat(starts, np.diff(np.r_[starts, len(sorted_rows)]))
+    occurrence = np.empty(len(rows), dtype=np.intp)
+    occurrence[order] = np.arange(len(rows)) - group_start
+    for k in range(int(occurrence.max()) + 1):
+        mask = occurrence == k
+        yield rows[mask], amounts[mask]
+
+
+def _load_accounts_file_to_ledger(file, account_type):
+    cust_ids, acct_nums, bals, rates = [], [], [], []
+
+    with open(file, 'r') as file:
+        csvreader = csv.reader(file)
+        # This skips the first header row of the CSV file.
+        next(csvreader)
+
+        for row in csvreader:
+            cust_ids.append(row[0])
+            acct_nums.append(row[1])
+            bals.append(row[2])
+            if account_type == SAVINGS:
+                rates.append(row[3])
+
+    ledger = AccountLedger(account_type, capacity=len(acct_nums))
+    if ledger._cents:
+        bals = np.fromiter(map(to_cents, bals), dtype=np.int64, count=len(bals))
+    ledger.add_accounts(cust_ids, acct_nums, np.asarray(bals, dtype=ledger._balances.dtype),
+                        np.asarray(rates, dtype=np.float64) if account_type == SAVINGS else None)
+    return ledger
+
+
+def load_checking_file_to_ledger(file):
+    ledger = _load_accounts_file_to_ledger(file, CHECKING)
+    logger.info("Checking account file loaded to ledger.")
+    return ledger
+
+
+def load_savings_file_to_ledger(file):
+    ledger = _load_accounts_file_to_ledger(file, SAVINGS)
+    logger.info("Savings account file loaded to ledger.")
+    return ledger
+
+
+### EOF
@@ -77,11 +77,7 @@ the positional args and their data types.
 
 import datetime
 import csv
-import pprint as pp
-import pandas as pd
-import re
 import logging
-from dateutil.relativedelta import relativedelta
 
 # import custom utilities
 from bank_classes_and_io_funcs import *
@@ -199,10 +195,9 @@ def main():
     credit_card_acct_objects_dict['4147-0989-3995-4678'].withdraw_cash(2000)    
     print("Available credit for card 4147-0989-3995-4678 is now ${:,.2f}".format(credit_card_acct_objects_dict['4147-0989-3995-4678'].get_available_credit()))
     print("Now applying interest rate charges for next month...")
-    credit_card_acct_objects_dict['4147-0989-3947-4110'].apply_interest()
-    credit_card_acct_objects_dict['4147-0989-3995-4678'].apply_interest()
-    credit_card_acct_objects_dict['4147-0989-4458-3321'].apply_interest()
-    credit_card_acct_objects_dict['4147-0989-4412-9987'].apply_interest()
+    # imported here: the month-end batch needs numpy, which importing bank_main should not load
+    from bank_month_end import apply_credit_card_interest
+    apply_credit_card_interest(credit_card_acct_objects_dict)
     
     #### sample code below will raise an exception due to invalid card number and will not create the instance.
     # To demo, uncomment and rerun this file.
@@ -235,6 +230,7 @@ def main():
     
 # driver program
 if __name__ == "__main__":
+    configure_logging()
     main()
 
 
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+
+"""
+@Date: 2026-10-18
+
+This file measures how many bytes each loaded record takes in memory, for
+the slotted entity classes in "bank_classes_and_io_funcs.py" and for the
+previous layout in which every object kept its attributes in a __dict__,
+CheckingAccount kept its fees on each instance and bank names, cities and
+states were not interned.
+
+Each entity's sample_input rows are repeated with distinct keys up to the
+requested number of records, parsed from csv text and turned into objects
+while tracemalloc is tracing, so the figures include the objects, their
+attribute values and the row strings they keep alive.
+
+Example:
+    python bank_memory_benchmark.py 200000
+
+"""
+
+import csv
+import gc
+import io
+import sys
+import tracemalloc
+
+from bank_classes_and_io_funcs import (Branch, Customer, Employee, CheckingAccount, SavingsAccount,
+                                       CreditCard, LoanAccount, logger)
+from bank_data_quality_checks import configure_logging
+from bank_incremental import ENTITIES
+from bank_parallel_load import DEFAULT_INPUT_FILES
+
+
+# row -> object, as the load_*_rows_to_dict functions build them (card numbers are not re-validated)
+BUILDERS = {
+    'branches': lambda r: Branch(r[0], r[1], r[2], r[3]),
+    'customers': lambda r: Customer(r[0], r[1], r[2], r[3], r[4], r[5], r[6], r[7], r[8], r[9]),
+    'employees': lambda r: Employee(r[0], r[1], r[2], r[3], r[4], r[5], r[6]),
+    'checking': lambda r: CheckingAccount(r[0], r[1], r[2]),
+    'savings': lambda r: SavingsAccount(r[0], r[1], r[2], r[3]),
+    'credit_cards': lambda r: CreditCard(r[0], r[1], r[2], r[3], validated=True),
+    'loans': lambda r: LoanAccount(r[0], r[1], r[2], r[3], r[4], r[5]),
+}
+
+# attributes the previous layout stored on every instance on top of the slots
+_LEGACY_EXTRA_ATTRS = {
+    'checking': {'_CheckingAccount__min_balance': CheckingAccount.MIN_BALANCE,
+                 '_CheckingAccount__withdrawal_fee': CheckingAccount.WITHDRAWAL_FEE,
+                 '_CheckingAccount__overdraft_fee': CheckingAccount.OVERDRAFT_FEE},
+}
+_INTERNED_ATTRS = ('bank_name', 'city', 'state')
+
+
+def _slots(cls):
+    return [attr for klass in reversed(cls.__mro__) for attr in getattr(klass, '__slots__', ())]
+
+
+def _legacy_class(entity):
+    # one class per entity, so instance dictionaries share their keys as before
+    return type(f"Legacy{ENTITIES[entity].cls.__name__}", (), {})
+
+
+def _to_legacy(entity, legacy_cls, obj, row):
+    columns = ENTITIES[entity].columns
+    record = legacy_cls()
+    for attr in _slots(type(obj)):
+        if not hasattr(obj, attr):
+            continue
+        if attr in _INTERNED_ATTRS:
+            # keep the string parsed from this row, as the unslotted classes did
+            setattr(record, attr, row[columns.index(attr)])
+        else:
+            setattr(record, attr, getattr(obj, attr))
+    for attr, value in _LEGACY_EXTRA_ATTRS.get(entity, {}).items():
+        setattr(record, attr, value)
+    return record
+
+
+def replicated_csv(entity, num_records):
+    """csv text (without header) with num_records rows of the entity's sample file and distinct keys."""
+    with open(DEFAULT_INPUT_FILES[entity], 'r') as file:
+        csvreader = csv.reader(file)
+        next(csvreader)
+        sample = list(csvreader)
+    key_col = ENTITIES[entity].columns.index(ENTITIES[entity].key_attr)
+
+    out = io.StringIO()
+    csvwriter = csv.writer(out)
+    for i in range(num_records):
+        row = list(sample[i % len(sample)])
+        row[key_col] = f"{row[key_col]}{i}"
+        csvwriter.writerow(row)
+    return out.getvalue()
+
+
+def bytes_per_record(entity, text, num_records, legacy=False):
+    build = BUILDERS[entity]
+    legacy_cls = _legacy_class(entity)
+    gc.collect()
+    tracemalloc.start()
+    records = []
+    for row in csv.reader(io.StringIO(text)):
+        obj = build(row)
+        records.append(_to_legacy(entity, legacy_cls, obj, row) if legacy else obj)
+    del obj, row
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size/num_records
+
+
+def run_benchmark(num_records=100000, entities=tuple(BUILDERS)):
+    """Returns {entity: {'before': bytes, 'after': bytes, 'saved_percent': float}}."""
+    results = {}
+    for entity in entities:
+        text = replicated_csv(entity, num_records)
+        before = bytes_per_record(entity, text, num_records, legacy=True)
+        after = bytes_per_record(entity, text, num_records)
+        results[entity] = {'before': before, 'after': after, 'saved_percent': 100*(1 - after/before)}
+    logger.info("Memory benchmark finished for %d records per entity.", num_records)
+    return results
+
+
+if __name__ == "__main__":
+    configure_logging()
+    num_records = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print(f"{'entity':<13} {'before':>14} {'after':>14} {'saved':>7}")
+    for entity, r in run_benchmark(num_records).items():
+        print(f"{entity:<13} {r['before']:>8.0f} B/rec {r['after']:>8.0f} B/rec {r['saved_percent']:>6.1f}%")
+
+
+### EOF
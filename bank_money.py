@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+
+"""
+@Date: 2026-10-18
+
+This file provides the opt-in integer cents money mode.  By default every
+balance is a float of dollars, as before.  After set_money_mode(CENTS), or
+inside money_mode(CENTS), the classes in "bank_classes_and_io_funcs.py" keep
+balances, available credit and loan amounts as int cents instead:
+
+1. Loaders and constructors still take dollars, as written in the csv files.
+   to_cents converts them exactly, without going through a float.
+2. Stored balances, get_balance() and the amounts passed to deposit,
+   withdraw, make_purchase, withdraw_cash and make_payment are int cents.
+3. Interest is rounded to the cent with banker's rounding (half to even) in
+   SavingsAccount.get_balance_next_month, CreditCard.apply_interest and the
+   month-end run in "bank_month_end.py".  Interest is computed from the
+   decimal rate as written (0.008, 0.1999), not from its binary float.
+4. The writers put exact decimal strings (1234.50) in the csv files, and
+   available credit stays exactly CREDIT_LINE - balance.
+
+Sums of cents are exact, so the batch jobs in "bank_month_end.py",
+"bank_transactions.py" and "bank_ledger.py" work on int64 NumPy arrays.
+Choose the mode before loading any data; objects are not converted when the
+mode changes.  Journals and snapshots record the mode they were written in
+and convert on reading, and worker processes are passed the mode explicitly.
+Rates, salaries and the amortization schedules stay floats.
+
+Example:
+    set_money_mode(CENTS)
+    savings_acct_objects_dict = load_savings_file_to_dict(infile)
+    savings_acct_objects_dict['168444660'].deposit(70000)       # $700.00
+    format_cents(savings_acct_objects_dict['168444660'].get_balance())
+
+"""
+
+import contextlib
+import functools
+
+
+FLOAT = 'float'
+CENTS = 'cents'
+MONEY_MODES = (FLOAT, CENTS)
+
+# array interest works on rates in millionths, which keeps cents*rate inside int64
+RATE_SCALE = 10**6
+
+_mode = FLOAT
+
+def set_money_mode(mode):
+    global _mode
+    if mode not in MONEY_MODES:
+        raise ValueError(f"Unknown money mode {mode!r}. Use '{FLOAT}' or '{CENTS}'.")
+    _mode = mode
+
+def get_money_mode():
+    return _mode
+
+def is_cents_mode():
+    return _mode == CENTS
+
+@contextlib.contextmanager
+def money_mode(mode):
+    """Context manager that sets the money mode for the enclosed block."""
+    previous = get_money_mode()
+    set_money_mode(mode)
+    try:
+        yield
+    finally:
+        set_money_mode(previous)
+
+
+################################################
+##### Conversions
+################################################
+def _div_half_even(num, den):
+    # num/den rounded to the nearest integer, ties to the even one; den > 0
+    q, r = divmod(num, den)
+    if 2*r > den or (2*r == den and q % 2):
+        q += 1
+    return q
+
+def to_cents(dollars):
+    """Exact int cents of a dollar amount (str, int, float or Decimal), rounded half to even."""
+    if isinstance(dollars, int):
+        return dollars*100
+    # repr gives the shortest decimal that reads back as the float, i.e. what was typed
+    text = repr(dollars) if isinstance(dollars, float) else str(dollars).strip()
+    negative = text[:1] == '-'
+    body = text[1:] if text[:1] in ('-', '+') else text
+    whole, _, frac = body.partition('.')
+    if (whole or frac) and (not whole or whole.isdigit()) and (not frac or frac.isdigit()):
+        cents = int(whole or '0')*100 + int(frac[:2].ljust(2, '0'))
+        rest = frac[2:]
+        if rest:
+            half = '5'.ljust(len(rest), '0')
+            if rest > half or (rest == half and cents % 2):
+                cents += 1
+        return -cents if negative else cents
+    # exponents, as in 1e-05 or 1.5E+3
+    return _decimal_to_cents(text)
+
+def _decimal_to_cents(text):
+    from decimal import Decimal, InvalidOperation, ROUND_HALF_EVEN
+    try:
+        value = Decimal(text).quantize(Decimal('0.01'), rounding=ROUND_HALF_EVEN)
+        return int(value.scaleb(2))
+    except (InvalidOperation, ValueError, OverflowError):
+        raise ValueError(f"could not convert string to cents: {text!r}") from None
+
+def to_money(dollars):
+    """A dollar amount from a file or a constructor, in the current money mode."""
+    return to_cents(dollars) if _mode == CENTS else float(dollars)
+
+def from_cents(cents):
+    return cents/100
+
+def format_cents(cents):
+    """The exact decimal string of an amount in cents: -123456 -> '-1234.56'."""
+    cents = int(cents)
+    whole, frac = divmod(abs(cents), 100)
+    return f"{'-' if cents < 0 else ''}{whole}.{frac:02d}"
+
+def format_money(amount):
+    """'$1,234.56' for an amount in the current money mode."""
+    if _mode != CENTS:
+        return f"${amount:,.2f}"
+    whole, frac = divmod(abs(int(amount)), 100)
+    return f"${'-' if amount < 0 else ''}{whole:,}.{frac:02d}"
+
+def money_field(amount):
+    """An amount as the writers put it in the csv files."""
+    return format_cents(amount) if _mode == CENTS else round(amount, 2)
+
+
+################################################
+##### Interest
+################################################
+@functools.lru_cache(maxsize=4096)
+def _rate_ratio(annual_rate):
+    # the decimal rate as written, as numerator/denominator; many accounts share a rate
+    from fractions import Fraction
+    rate = Fraction(repr(float(annual_rate)))
+    return rate.numerator, rate.denominator
+
+def monthly_interest_cents(cents, annual_rate):
+    """One month of interest, cents*annual_rate/12, rounded to the cent half to even."""
+    num, den = _rate_ratio(annual_rate)
+    return _div_half_even(cents*num, den*12)
+
+def compounded_cents(cents, annual_rate, months):
+    """cents*(1 + annual_rate/12)**months, rounded to the cent half to even."""
+    num, den = _rate_ratio(annual_rate)
+    growth, base = 12*den + num, 12*den
+    months = int(months)
+    if months < 0:
+        growth, base, months = base, growth, -months
+    return _div_half_even(cents*growth**months, base**months)
+
+def monthly_interest_cents_array(cents, annual_rates):
+    """monthly_interest_cents for an int64 array of cents and an array of annual rates."""
+    import numpy as np
+    cents = np.asarray(cents, dtype=np.int64)
+    rates = np.asarray(annual_rates, dtype=np.float64)
+    scaled = np.rint(rates*RATE_SCALE)
+    # rates with more than six decimals, or products that would overflow, take the exact scalar path
+    exact = scaled/RATE_SCALE == rates
+    scaled = np.where(exact, scaled, 0).astype(np.int64)
+    exact &= np.abs(cents) <= np.iinfo(np.int64).max // np.maximum(np.abs(scaled), 1)
+    den = 12*RATE_SCALE
+    q, r = np.divmod(np.where(exact, cents, 0)*scaled, den)
+    q += (2*r > den) | ((2*r == den) & (q % 2 == 1))
+    for i in np.flatnonzero(~exact).tolist():
+        q[i] = monthly_interest_cents(int(cents[i]), float(rates[i]))
+    return q
+
+
+### EOF
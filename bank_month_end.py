@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+
+"""
+@Date: 2026-10-18
+
+This file runs the month-end interest close over every savings account and
+credit card in one vectorized pass, instead of calling
+SavingsAccount.get_balance_next_month or CreditCard.apply_interest one
+account at a time.
+
+The month-end rules are the same as the single-account methods:
+1. Savings balances earn annual_interest_rate/12 and are rounded to cents,
+   as in SavingsAccount.get_balance_next_month.
+2. Credit card balances are charged annual_interest_rate/12 and the available
+   credit is reset to CreditCard.CREDIT_LINE - balance, as in
+   CreditCard.apply_interest.
+
+Savings accounts may be passed either as a dictionary of SavingsAccount
+objects or as an AccountLedger from "bank_ledger.py".
+
+In the cents money mode of "bank_money.py" the balances are int64 arrays of
+cents and the interest of every account, savings and credit card alike, is
+rounded to the cent half to even; the summary totals are then int cents.
+
+Example:
+    summary = run_month_end(savings_acct_objects_dict, credit_card_acct_objects_dict)
+    print(summary['savings_interest_credited'], summary['card_interest_charged'])
+
+"""
+
+import numpy as np
+
+from bank_classes_and_io_funcs import CreditCard, has_movement_listeners, notify_movement, logger
+from bank_ledger import AccountLedger
+from bank_money import is_cents_mode, monthly_interest_cents_array
+
+
+################################################
+##### Month-end interest functions
+################################################
+def _money_dtype():
+    return np.int64 if is_cents_mode() else np.float64
+
+
+def _next_month(balances, rates):
+    # as SavingsAccount.get_balance_next_month, for whole arrays
+    if balances.dtype.kind == 'i':
+        return balances + monthly_interest_cents_array(balances, rates)
+    return np.round(balances*(1 + rates/12), 2)
+
+
+def _total(values, ndigits=None):
+    # cents add up exactly; float dollars are rounded where the summary always rounded them
+    if values.dtype.kind == 'i':
+        return int(values.sum())
+    total = float(values.sum())
+    return total if ndigits is None else round(total, ndigits)
+
+
+def apply_savings_interest(savings):
+    """Credit one month of interest to every savings account.
+
+    Returns a dictionary with the account count and the balance totals before
+    and after the run.
+    """
+    if isinstance(savings, AccountLedger):
+        balances = savings.balances
+        before = balances.copy()
+        balances[:] = _next_month(before, savings.annual_interest_rates)
+        after = balances
+    else:
+        accts = list(savings.values())
+        n = len(accts)
+        before = np.fromiter((a.balance for a in accts), dtype=_money_dtype(), count=n)
+        rates = np.fromiter((a.annual_interest_rate for a in accts), dtype=np.float64, count=n)
+        after = _next_month(before, rates)
+        for acct, bal in zip(accts, after.tolist()):
+            acct.balance = bal
+        if has_movement_listeners():
+            for acct, old, bal in zip(accts, before.tolist(), after.tolist()):
+                notify_movement(acct, 'interest', bal - old, old)
+
+    summary = {
+        'savings_accounts': len(before),
+        'savings_balance_before': _total(before),
+        'savings_balance_after': _total(after),
+        'savings_interest_credited': _total(after - before, 2),
+    }
+    logger.info("Month-end interest credited to %d savings accounts.", summary['savings_accounts'])
+    return summary
+
+
+def apply_credit_card_interest(credit_cards):
+    """Charge one month of interest on every credit card and reset available credit.
+
+    Returns a dictionary with the card count, the balance totals before and
+    after the run, the total available credit and the number of cards whose
+    balance is now over the credit line.
+    """
+    cards = list(credit_cards.values())
+    n = len(cards)
+    before = np.fromiter((c.balance for c in cards), dtype=_money_dtype(), count=n)
+    rates = np.fromiter((c.annual_interest_rate for c in cards), dtype=np.float64, count=n)
+    if before.dtype.kind == 'i':
+        after = before + monthly_interest_cents_array(before, rates)
+        available = CreditCard.CREDIT_LINE_CENTS - after
+    else:
+        after = before*(1 + rates/12)
+        available = CreditCard.CREDIT_LINE - after
+
+    for card, bal, avail in zip(cards, after.tolist(), available.tolist()):
+        card.balance = bal
+        card.available_credit = avail
+    if has_movement_listeners():
+        for card, old, bal in zip(cards, before.tolist(), after.tolist()):
+            notify_movement(card, 'interest', bal - old, old)
+
+    summary = {
+        'credit_cards': n,
+        'card_balance_before': _total(before),
+        'card_balance_after': _total(after),
+        'card_interest_charged': _total(after - before, 2),
+        'total_available_credit': _total(available),
+        'cards_over_limit': int((available < 0).sum()),
+    }
+    logger.info("Month-end interest applied to %d credit cards.", n)
+    return summary
+
+
+def run_month_end(savings=None, credit_cards=None):
+    """Run the month-end interest close and return one combined summary."""
+    summary = {}
+    if savings is not None:
+        summary.update(apply_savings_interest(savings))
+    if credit_cards is not None:
+        summary.update(apply_credit_card_interest(credit_cards))
+    return summary
+
+
+### EOF
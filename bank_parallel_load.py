@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+
+"""
+@Date: 2026-10-18
+
+This file loads the seven input csv files in parallel with a process pool,
+instead of calling the load_*_file_to_dict functions one after another.
+
+Every file is cut into byte ranges of roughly chunk_bytes that start and end
+on a line boundary.  Each range is parsed by a worker process with the same
+load_*_rows_to_dict function the sequential loader uses, and the chunks are
+merged back in file order, so the returned dictionaries are identical to the
+sequential ones.  Small files are a single chunk, so a run with seven small
+files still parses all seven at once.
+
+Input files must not contain line breaks inside quoted fields, as none of the
+bank csv files do.
+
+Workers always run non-interactively, since a worker process cannot prompt
+for input.  Pass quarantine_dir to collect rejected rows in per-file
+quarantine csv files instead of failing the load.
+
+Example:
+    dicts, timings = load_files_parallel(DEFAULT_INPUT_FILES)
+    cust_objects_dict = dicts['customers']
+    print(timings['customers']['elapsed_seconds'])
+
+"""
+
+import csv
+import io
+import mmap
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from bank_classes_and_io_funcs import (load_bank_locations_rows_to_dict, load_customer_rows_to_dict,
+                                       load_employees_rows_to_dict, load_checking_rows_to_dict,
+                                       load_savings_rows_to_dict, load_credit_card_rows_to_dict,
+                                       load_loan_rows_to_dict, logger)
+from bank_data_quality_checks import QuarantineWriter, configure_logging, non_interactive
+from bank_money import get_money_mode, money_mode
+
+
+# target size of the byte range parsed by one worker
+DEFAULT_CHUNK_BYTES = 8 * 1024 * 1024
+
+ROW_LOADERS = {
+    'branches': load_bank_locations_rows_to_dict,
+    'customers': load_customer_rows_to_dict,
+    'employees': load_employees_rows_to_dict,
+    'checking': load_checking_rows_to_dict,
+    'savings': load_savings_rows_to_dict,
+    'credit_cards': load_credit_card_rows_to_dict,
+    'loans': load_loan_rows_to_dict,
+}
+
+DEFAULT_INPUT_FILES = {
+    'branches': "sample_input/BankLocations.csv",
+    'customers': "sample_input/Customers.csv",
+    'employees': "sample_input/Employees.csv",
+    'checking': "sample_input/CheckingAccounts.csv",
+    'savings': "sample_input/SavingsAccounts.csv",
+    'credit_cards': "sample_input/CreditCards.csv",
+    'loans': "sample_input/LoanAccounts.csv",
+}
+
+
+def split_file(file, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """Returns a list of (start, end, first_row) ranges covering the rows of file after the header.
+
+    first_row is the zero-based data row number of the first line in the range.
+    """
+    size = os.path.getsize(file)
+    if size == 0:
+        return []
+
+    with open(file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        newline = buf.find(b'\n')
+        start = size if newline == -1 else newline + 1
+        ranges = []
+        first_row = 0
+        while start < size:
+            end = buf.find(b'\n', min(start + chunk_bytes, size) - 1)
+            end = size if end == -1 else end + 1
+            ranges.append((start, end, first_row))
+            first_row += buf[start:end].count(b'\n')
+            start = end
+    return ranges
+
+
+class RejectedRows(list):
+    """Collects a worker's rejected rows so the parent can write them to one quarantine file.
+
+    row_numbers holds the row_number attribute of each rejected row (None for
+    plain rows), for putting the rows of several workers back in file order.
+    """
+    def __init__(self):
+        list.__init__(self)
+        self.row_numbers = []
+
+    def set_header(self, header):
+        pass
+
+    def reject(self, row, reason):
+        self.append(list(row) + [reason])
+        self.row_numbers.append(getattr(row, 'row_number', None))
+
+
+def _load_chunk(entity, file, start, end, first_row, quarantine, mode):
+    t0 = time.perf_counter()
+    with open(file, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8')
+    rejected = RejectedRows() if quarantine else None
+    # workers started with spawn or forkserver do not inherit the parent's money mode
+    with non_interactive(), money_mode(mode):
+        data_dict = ROW_LOADERS[entity](csv.reader(io.StringIO(text, newline='')), first_row, rejected)
+    return data_dict, rejected, time.perf_counter() - t0
+
+
+def read_header(file):
+    """The header row of a csv file, or [] if the file is empty."""
+    with open(file, 'r', newline='') as f:
+        return next(csv.reader(f), [])
+
+
+def load_files_parallel(files=DEFAULT_INPUT_FILES, max_workers=None, chunk_bytes=DEFAULT_CHUNK_BYTES,
+                        quarantine_dir=None):
+    """Loads every entity file in files (entity name -> path) using a process pool.
+
+    Returns (dicts, timings): dicts maps entity name -> dictionary of objects
+    and timings maps entity name -> {'rows', 'chunks', 'parse_seconds',
+    'elapsed_seconds'}.  parse_seconds is the worker time summed over chunks,
+    elapsed_seconds is the wall time until the file's last chunk finished.
+    With quarantine_dir, rejected rows are written to quarantine_dir in file
+    order and counted in timings[entity]['rejected'].
+    """
+    unknown = set(files) - set(ROW_LOADERS)
+    if unknown:
+        raise ValueError(f"Unknown entity {', '.join(sorted(unknown))}. Expected one of {', '.join(ROW_LOADERS)}.")
+
+    t0 = time.perf_counter()
+    ranges = {entity: split_file(file, chunk_bytes) for entity, file in files.items()}
+    chunks = {entity: [None]*len(ranges[entity]) for entity in files}
+    rejects = {entity: [None]*len(ranges[entity]) for entity in files}
+    timings = {entity: {'rows': 0, 'rejected': 0, 'chunks': len(chunks[entity]),
+                        'parse_seconds': 0.0, 'elapsed_seconds': 0.0}
+               for entity in files}
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {}
+        for entity, file in files.items():
+            for i, (start, end, first_row) in enumerate(ranges[entity]):
+                futures[pool.submit(_load_chunk, entity, file, start, end, first_row,
+                                    quarantine_dir is not None, get_money_mode())] = (entity, i)
+
+        for future in as_completed(futures):
+            entity, i = futures[future]
+            data_dict, rejected, seconds = future.result()
+            chunks[entity][i] = data_dict
+            rejects[entity][i] = rejected
+            timings[entity]['parse_seconds'] += seconds
+            timings[entity]['elapsed_seconds'] = time.perf_counter() - t0
+
+    dicts = {}
+    for entity, parts in chunks.items():
+        merged = {}
+        for part in parts:
+            merged.update(part)
+        dicts[entity] = merged
+        timings[entity]['rows'] = len(merged)
+
+        if quarantine_dir is not None and any(rejects[entity]):
+            with QuarantineWriter.for_file(quarantine_dir, files[entity]) as quarantine:
+                quarantine.set_header(read_header(files[entity]))
+                for rejected in rejects[entity]:
+                    for row in rejected:
+                        quarantine.reject(row[:-1], row[-1])
+            timings[entity]['rejected'] = quarantine.count
+        logger.info("%s loaded to dictionary in %d chunks (%.3fs).",
+                    files[entity], timings[entity]['chunks'], timings[entity]['elapsed_seconds'])
+
+    return dicts, timings
+
+
+# driver program
+if __name__ == "__main__":
+    configure_logging()
+    dicts, timings = load_files_parallel()
+    for entity, t in timings.items():
+        print(f"{entity:<13} {t['rows']:>10,} rows  {t['chunks']:>4} chunks  "
+              f"parse {t['parse_seconds']:.3f}s  elapsed {t['elapsed_seconds']:.3f}s")
+
+
+### EOF
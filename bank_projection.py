@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+
+"""
+@Date: 2026-10-18
+
+This file projects savings balances over many horizons at once, without
+prompting, instead of calling SavingsAccount.get_compounded_balance for one
+account and one month count at a time.
+
+project_savings_balances returns an accounts x horizons matrix of balances
+compounded monthly at annual_interest_rate/12 and rounded to cents, the same
+figure get_compounded_balance(months) returns for each cell.  The growth
+factors (1 + rate/12)**months are computed once per distinct rate and shared
+by every account with that rate.  In the cents money mode of "bank_money.py"
+the matrix holds int64 cents rounded half to even; the few cells whose float
+product is too close to a half cent to round safely are recomputed exactly
+with compounded_cents.
+
+project_savings_totals returns only the total balance per horizon.  It sums
+balances per rate first, so it never builds the full matrix; its totals are
+not rounded per account (in cents mode they are float cents).
+
+Savings accounts may be passed either as a dictionary of SavingsAccount
+objects or as an AccountLedger from "bank_ledger.py".
+
+Example:
+    projection = project_savings_balances(savings_acct_objects_dict, range(1, 361))
+    projection.for_account('168555102')[[11, 59]]      # after 12 and 60 months
+    project_savings_totals(savings_acct_objects_dict, [12, 60, 120])
+
+"""
+
+import numpy as np
+
+from bank_classes_and_io_funcs import logger
+from bank_ledger import AccountLedger
+from bank_money import compounded_cents, is_cents_mode
+
+
+def _columns(savings):
+    if isinstance(savings, AccountLedger):
+        return list(savings.account_numbers), savings.balances, savings.annual_interest_rates
+    accts = list(savings.values())
+    n = len(accts)
+    balances = np.fromiter((a.balance for a in accts), dtype=np.int64 if is_cents_mode() else np.float64, count=n)
+    rates = np.fromiter((a.annual_interest_rate for a in accts), dtype=np.float64, count=n)
+    return list(savings), balances, rates
+
+
+def growth_factors(rates, horizons):
+    """Returns (distinct rates, factors, inverse).
+
+    factors[i, j] is (1 + distinct_rates[i]/12)**horizons[j], and rates[k] is
+    distinct_rates[inverse[k]].
+    """
+    distinct, inverse = np.unique(rates, return_inverse=True)
+    horizons = np.asarray(horizons, dtype=np.float64)
+    factors = (1 + distinct[:, None]/12)**horizons[None, :]
+    return distinct, factors, inverse
+
+
+class BalanceProjection:
+    """Projected balances of many accounts over many horizons."""
+
+    def __init__(self, keys, horizons, balances):
+        self.keys = keys
+        self.horizons = horizons
+        self.balances = balances
+        self._index = {key: i for i, key in enumerate(keys)}
+
+    def for_account(self, acct_num):
+        """Projected balances of one account, one per horizon."""
+        return self.balances[self._index[acct_num]]
+
+    def at(self, months):
+        """Projected balance of every account after the given horizon."""
+        return self.balances[:, self.horizons.index(months)]
+
+    def totals(self):
+        return self.balances.sum(axis=0)
+
+
+def _round_cents(balances, rates, horizons, factors, inverse):
+    # balances*factors rounded half to even as compounded_cents does; the float
+    # product is off by at most a few ulps per month of the horizon
+    values = balances[:, None]*factors[inverse]
+    months = np.abs(np.asarray(horizons, dtype=np.float64))
+    tol = np.abs(values)*(months + 4)*1e-15
+    exact = (np.abs(values - np.floor(values) - 0.5) <= tol) | ~(np.abs(values) < 2.0**52)
+    projected = np.rint(np.where(exact, 0, values)).astype(np.int64)
+    for i, j in zip(*np.nonzero(exact)):
+        projected[i, j] = compounded_cents(int(balances[i]), float(rates[i]), horizons[j])
+    return projected
+
+
+def project_savings_balances(savings, horizons):
+    """Projects every savings account over every horizon (in months)."""
+    horizons = [int(h) for h in horizons]
+    keys, balances, rates = _columns(savings)
+    distinct, factors, inverse = growth_factors(rates, horizons)
+    if np.issubdtype(balances.dtype, np.integer):
+        projected = _round_cents(balances, rates, horizons, factors, inverse)
+    else:
+        projected = np.round(balances[:, None]*factors[inverse], 2)
+
+    logger.info("Projected %d savings accounts over %d horizons (%d distinct interest rates).",
+                len(keys), len(horizons), len(distinct))
+    return BalanceProjection(keys, horizons, projected)
+
+
+def project_savings_totals(savings, horizons):
+    """Total projected savings balance per horizon, without building the full matrix."""
+    _, balances, rates = _columns(savings)
+    distinct, factors, inverse = growth_factors(rates, horizons)
+    per_rate = np.bincount(inverse, weights=balances, minlength=len(distinct))
+    return per_rate @ factors
+
+
+### EOF
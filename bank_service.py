@@ -0,0 +1,365 @@
+#!/usr/bin/env python
+
+"""
+@Date: 2026-10-18
+
+This file serves balance lookups and money movements over TCP on localhost
+with asyncio, against the dictionaries returned by the load_*_file_to_dict
+functions.  One event loop on one core holds thousands of open connections.
+
+Protocol: one JSON object per line in each direction.
+
+    request   {"id": 1, "op": "deposit", "kind": "checking", "key": "168555105", "amount": 700}
+    response  {"id": 1, "ok": true, "balance": 1230.5}
+              {"id": 2, "ok": false, "error": "Account 168555999 not found."}
+
+op is one of balance, deposit, withdraw (checking, savings), purchase,
+cash_advance (credit_cards) and payment (credit_cards, loans).  kind names
+the dictionary: checking, savings, credit_cards or loans.  Credit card
+responses also carry available_credit.  In the cents money mode of
+"bank_money.py", amounts and balances are whole numbers of cents.
+
+1. Pipelining: a client may send many requests without waiting.  Each line
+   is handled as soon as it is read, and responses carry the request id.
+2. Batched persistence: writes are applied to the objects at once, but are
+   acknowledged only after the batch they belong to was persisted by the
+   persist callback (for example IncrementalStore.persist from
+   "bank_incremental.py" or TransactionJournal.commit from "bank_journal.py").
+   A batch is persisted when batch_size writes are pending or batch_interval
+   seconds have passed.  A response to a write can therefore arrive after the
+   response to a later balance lookup on the same connection.  When persist
+   raises, every account the batch changed is put back to its state before
+   the batch, and each write of the batch gets an error response.
+3. Backpressure: a connection stops reading while the client is not reading
+   its responses, and every connection stops reading while max_pending writes
+   are waiting to be persisted.
+
+The persist callback runs on the event loop, between requests, so it never
+sees a dictionary while it is being changed.
+
+Example:
+    python bank_service.py serve                 # sample_input data on 127.0.0.1:8765
+    python bank_service.py loadtest 2000 50      # 2000 connections x 50 requests
+
+"""
+
+import asyncio
+import contextlib
+import json
+import math
+import random
+import sys
+import time
+
+from bank_classes_and_io_funcs import has_movement_listeners, notify_movement, logger
+from bank_data_quality_checks import configure_logging
+from bank_money import is_cents_mode
+
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_BATCH_INTERVAL = 0.01
+DEFAULT_MAX_PENDING = 20000
+
+# op -> (method name, account kinds it applies to)
+OPERATIONS = {
+    'deposit': ('deposit', ('checking', 'savings')),
+    'withdraw': ('withdraw', ('checking', 'savings')),
+    'purchase': ('make_purchase', ('credit_cards',)),
+    'cash_advance': ('withdraw_cash', ('credit_cards',)),
+    'payment': ('make_payment', ('credit_cards', 'loans')),
+}
+KINDS = ('checking', 'savings', 'credit_cards', 'loans')
+
+
+class RequestError(Exception):
+    pass
+
+
+class _Discard:
+    # stands in for sys.stdout while mutators print their receipts
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def _account_state(kind, acct):
+    state = {'balance': round(acct.get_balance(), 2)}
+    if kind == 'credit_cards':
+        state['available_credit'] = round(acct.get_available_credit(), 2)
+    return state
+
+
+class BankService:
+    """asyncio TCP service over in-memory account dictionaries."""
+
+    def __init__(self, stores, persist=None, batch_size=DEFAULT_BATCH_SIZE,
+                 batch_interval=DEFAULT_BATCH_INTERVAL, max_pending=DEFAULT_MAX_PENDING):
+        self.stores = stores
+        self.persist = persist
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.max_pending = max_pending
+        self.stats = {'requests': 0, 'writes': 0, 'errors': 0, 'batches': 0, 'connections': 0}
+        self._batch = None
+        # account -> (kind, balance, available_credit) before the current batch changed it
+        self._undo = {}
+        self._pending = 0
+        self._flush_handle = None
+        self._not_full = None
+        self._server = None
+        self._discard = _Discard()
+
+    ##### request handling
+    def handle(self, request):
+        """Applies one request and returns (response, is_write)."""
+        if not isinstance(request, dict):
+            raise RequestError("Request must be a JSON object.")
+        op = request.get('op')
+        kind = request.get('kind')
+        key = request.get('key')
+        if not isinstance(kind, str) or kind not in KINDS:
+            raise RequestError(f"Unknown account kind {kind!r}.")
+        if not isinstance(key, str):
+            raise RequestError(f"Account key must be a string, not {key!r}.")
+        if not isinstance(op, str):
+            raise RequestError(f"Unknown operation {op!r}.")
+        acct = self.stores.get(kind, {}).get(key)
+        if acct is None:
+            raise RequestError(f"Account {key} not found.")
+        if op == 'balance':
+            return _account_state(kind, acct), False
+
+        if op not in OPERATIONS:
+            raise RequestError(f"Unknown operation {op!r}.")
+        method, kinds = OPERATIONS[op]
+        if kind not in kinds:
+            raise RequestError(f"Operation {op} is not available for {kind}.")
+        amount = request.get('amount')
+        if isinstance(amount, bool) or not isinstance(amount, (int, float)):
+            raise RequestError("Amount must be a positive number.")
+        try:
+            # math.isfinite raises OverflowError for an int too large for a float
+            valid = amount > 0 and math.isfinite(amount)
+        except OverflowError:
+            valid = False
+        if not valid:
+            raise RequestError("Amount must be a positive number.")
+        if is_cents_mode() and not isinstance(amount, int):
+            raise RequestError("Amount must be a whole number of cents.")
+
+        if acct not in self._undo:
+            self._undo[acct] = (kind, acct.balance, getattr(acct, 'available_credit', None))
+        with contextlib.redirect_stdout(self._discard):
+            getattr(acct, method)(amount)
+        return _account_state(kind, acct), True
+
+    ##### write batching
+    def _current_batch(self):
+        if self._batch is None:
+            self._batch = asyncio.get_running_loop().create_future()
+            self._flush_handle = asyncio.get_running_loop().call_later(self.batch_interval, self._flush)
+        return self._batch
+
+    def _rollback(self, undo):
+        # put every account back to its state before the batch; listeners
+        # (journal, aggregates, incremental store) see it as one more movement
+        for acct, (kind, balance, available_credit) in undo.items():
+            old_balance = acct.balance
+            acct.balance = balance
+            if available_credit is not None:
+                acct.available_credit = available_credit
+            if has_movement_listeners() and balance != old_balance:
+                if kind in ('checking', 'savings'):
+                    op = 'deposit' if balance > old_balance else 'withdraw'
+                else:
+                    op = 'purchase' if balance > old_balance and kind == 'credit_cards' else 'payment'
+                notify_movement(acct, op, abs(balance - old_balance), old_balance)
+
+    def _flush(self):
+        batch, self._batch = self._batch, None
+        undo, self._undo = self._undo, {}
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if batch is None:
+            return
+        try:
+            if self.persist is not None:
+                self.persist()
+        except Exception as e:
+            logger.error("Persisting a batch of %d writes failed, rolled back: %s", self._pending, e)
+            self._rollback(undo)
+            batch.set_exception(e)
+        else:
+            batch.set_result(None)
+        self.stats['batches'] += 1
+        self._pending = 0
+        self._not_full.set()
+
+    async def _connection(self, reader, writer):
+        self.stats['connections'] += 1
+
+        def send(response):
+            if not writer.is_closing():
+                writer.write(json.dumps(response).encode() + b'\n')
+
+        def send_after_batch(batch, response):
+            if batch.exception() is not None:
+                response = {'id': response['id'], 'ok': False, 'error': 'Write could not be persisted.'}
+            send(response)
+
+        last_batch = None
+        try:
+            while True:
+                # stop reading while too many writes wait to be persisted
+                if not self._not_full.is_set():
+                    await self._not_full.wait()
+                line = await reader.readline()
+                if not line:
+                    break
+                self.stats['requests'] += 1
+                request_id = None
+                try:
+                    request = json.loads(line)
+                    request_id = request.get('id')
+                    state, is_write = self.handle(request)
+                except (RequestError, ValueError, TypeError, AttributeError, OverflowError) as e:
+                    self.stats['errors'] += 1
+                    send({'id': request_id, 'ok': False, 'error': str(e)})
+                else:
+                    response = {'id': request_id, 'ok': True, **state}
+                    if is_write:
+                        self.stats['writes'] += 1
+                        batch = last_batch = self._current_batch()
+                        batch.add_done_callback(lambda b, r=response: send_after_batch(b, r))
+                        self._pending += 1
+                        if self._pending >= self.max_pending:
+                            self._not_full.clear()
+                        if self._pending >= self.batch_size:
+                            self._flush()
+                    else:
+                        send(response)
+                # stop reading while the client is not reading its responses
+                await writer.drain()
+
+            # the client is done sending; acknowledge its last writes before closing
+            if last_batch is not None and not last_batch.done():
+                await asyncio.wait([last_batch])
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            self.stats['connections'] -= 1
+
+    ##### server lifecycle
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, backlog=4096):
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self._server = await asyncio.start_server(self._connection, host, port, backlog=backlog)
+        logger.info("Bank service listening on %s:%d.", host, self._server.sockets[0].getsockname()[1])
+        return self._server
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+        self._flush()
+        logger.info("Bank service stopped: %s.", self.stats)
+
+    async def serve_forever(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        await self.start(host, port)
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+
+################################################
+##### Load-test client
+################################################
+async def _client(host, port, keys, requests, pipeline, rng, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    sent_at = {}
+    window = asyncio.Semaphore(pipeline)
+
+    async def receive():
+        for _ in range(requests):
+            response = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - sent_at.pop(response['id']))
+            if not response['ok']:
+                errors.append(response['error'])
+            window.release()
+
+    receiver = asyncio.create_task(receive())
+    for i in range(requests):
+        await window.acquire()
+        kind, key = rng.choice(keys)
+        if rng.random() < 0.5:
+            request = {'id': i, 'op': 'balance', 'kind': kind, 'key': key}
+        else:
+            op = 'deposit' if kind in ('checking', 'savings') else 'payment'
+            request = {'id': i, 'op': op, 'kind': kind, 'key': key, 'amount': 1}
+        sent_at[i] = time.perf_counter()
+        writer.write(json.dumps(request).encode() + b'\n')
+        await writer.drain()
+    await receiver
+    writer.close()
+
+
+async def run_load_test(keys, host=DEFAULT_HOST, port=DEFAULT_PORT, connections=1000,
+                        requests_per_connection=100, pipeline=16, seed=0):
+    """Opens many connections that each pipeline a mix of lookups and writes.
+
+    keys is a list of (kind, key) to pick accounts from.  Returns a dictionary
+    with the request count, errors, elapsed seconds, requests per second and
+    latency percentiles in milliseconds.
+    """
+    rng = random.Random(seed)
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, keys, requests_per_connection, pipeline,
+                                   random.Random(rng.random()), latencies, errors)
+                           for _ in range(connections)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    pct = lambda p: 1000*latencies[min(int(p*len(latencies)), len(latencies) - 1)] if latencies else 0.0
+    return {'connections': connections,
+            'requests': len(latencies),
+            'errors': len(errors),
+            'seconds': elapsed,
+            'requests_per_second': len(latencies)/elapsed,
+            'p50_ms': pct(0.50),
+            'p99_ms': pct(0.99)}
+
+
+def _load_sample_stores():
+    from bank_parallel_load import DEFAULT_INPUT_FILES
+    from bank_classes_and_io_funcs import (load_checking_file_to_dict, load_savings_file_to_dict,
+                                           load_credit_card_file_to_dict, load_loan_file_to_dict)
+    return {'checking': load_checking_file_to_dict(DEFAULT_INPUT_FILES['checking']),
+            'savings': load_savings_file_to_dict(DEFAULT_INPUT_FILES['savings']),
+            'credit_cards': load_credit_card_file_to_dict(DEFAULT_INPUT_FILES['credit_cards']),
+            'loans': load_loan_file_to_dict(DEFAULT_INPUT_FILES['loans'])}
+
+
+if __name__ == "__main__":
+    configure_logging(queued=True)
+    stores = _load_sample_stores()
+    keys = [(kind, key) for kind, objs in stores.items() for key in objs]
+    if len(sys.argv) > 1 and sys.argv[1] == 'loadtest':
+        connections = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+        requests = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+        result = asyncio.run(run_load_test(keys, connections=connections, requests_per_connection=requests))
+        print(f"{result['requests']:,} requests over {result['connections']:,} connections in "
+              f"{result['seconds']:.2f}s: {result['requests_per_second']:,.0f} req/s, "
+              f"p50 {result['p50_ms']:.1f} ms, p99 {result['p99_ms']:.1f} ms, {result['errors']} errors")
+    else:
+        asyncio.run(BankService(stores).serve_forever())
+
+
+### EOF
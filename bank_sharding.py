@@ -0,0 +1,327 @@
+#!/usr/bin/env python
+
+"""
+@Date: 2026-10-18
+
+This file runs batch jobs (month-end, bulk updates) over N worker processes,
+each owning one shard of the customers, instead of over the single-process
+dictionaries built in bank_main.main.
+
+A customer and all its products belong to shard shard_of(customer_id, N), a
+stable crc32 hash of the customer id, so every operation on one customer's
+accounts stays inside one process.  Branches and employees are not keyed by
+customer and belong to shard 0.
+
+run_sharded works in three steps:
+1. Partition: every customer-keyed input file is cut into byte ranges (see
+   split_file in "bank_parallel_load.py").  Workers send each line of their
+   range to a fragment file of its shard, so each line is hashed once.
+2. Shard jobs: one worker per shard loads only its own fragments with the
+   usual load_*_rows_to_dict functions, in file order, and calls
+   job(stores, shard, num_shards) on the dictionaries.  It then writes each
+   requested output with the usual write_*_to_file function to a
+   per-shard file.
+3. Merge: the coordinator writes one header and appends the shard files in
+   shard order to each output file, replacing it atomically.
+
+Output rows are grouped by shard; within a shard they keep the input order.
+job must be a module-level function so it can be sent to the workers, and
+what it returns is collected per shard.  Input files must not contain line
+breaks inside quoted fields.  Workers run non-interactively; with
+quarantine_dir, rejected rows go to one quarantine file per input file, in
+file order as with the sequential loaders.
+
+Example:
+    results = run_sharded(month_end_job, DEFAULT_INPUT_FILES,
+                          outputs={'savings': "sample_output/SavingsAccounts.csv",
+                                   'credit_cards': "sample_output/CreditCards.csv"},
+                          num_shards=8)
+
+    python bank_sharding.py 1000000 1 2 4       # synthetic rows, then shard counts to time
+
+"""
+
+import csv
+import itertools
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from bank_classes_and_io_funcs import logger
+from bank_csv_writer import output_file_mode
+from bank_data_quality_checks import QuarantineWriter, configure_logging, non_interactive
+from bank_incremental import ENTITIES
+from bank_money import get_money_mode, money_mode
+from bank_parallel_load import DEFAULT_CHUNK_BYTES, DEFAULT_INPUT_FILES, RejectedRows, read_header, split_file
+
+
+# entities whose first column is customer_id; the others all go to shard 0
+CUSTOMER_KEYED = ('customers', 'checking', 'savings', 'credit_cards', 'loans')
+
+
+def shard_of(cust_id, num_shards):
+    """The shard that owns cust_id.  Stable across processes and runs, unlike hash()."""
+    return zlib.crc32(str(cust_id).encode('utf-8')) % num_shards
+
+
+def _line_shard(line, num_shards):
+    return zlib.crc32(line.split(b',', 1)[0].strip(b'"')) % num_shards
+
+
+################################################
+##### Partition step
+################################################
+def _fragment_path(work_dir, entity, part, shard):
+    return os.path.join(work_dir, f"{entity}.{part:05d}.{shard:04d}.csv")
+
+
+def _row_numbers_path(fragment_path):
+    # the data row numbers in the input file of the lines of a fragment, as int64
+    return fragment_path + '.rows'
+
+
+def _partition_range(entity, file, start, end, first_row, part, num_shards, work_dir):
+    with open(file, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    buckets = [[] for _ in range(num_shards)]
+    numbers = [array('q') for _ in range(num_shards)]
+    for row_number, line in enumerate(data.splitlines(keepends=True), first_row):
+        if line.strip():
+            shard = _line_shard(line, num_shards)
+            buckets[shard].append(line)
+            numbers[shard].append(row_number)
+    written = []
+    for shard, lines in enumerate(buckets):
+        if lines:
+            path = _fragment_path(work_dir, entity, part, shard)
+            with open(path, 'wb') as f:
+                f.writelines(lines)
+            with open(_row_numbers_path(path), 'wb') as f:
+                numbers[shard].tofile(f)
+            written.append(shard)
+    return entity, part, written
+
+
+################################################
+##### Shard jobs
+################################################
+class _NumberedRow(list):
+    # a csv row that carries its data row number in the input file, see RejectedRows
+    __slots__ = ('row_number',)
+
+
+def _numbered_rows(csvreader, row_numbers):
+    for row, row_number in zip(csvreader, row_numbers):
+        row = _NumberedRow(row)
+        row.row_number = row_number
+        yield row
+
+
+def _load_fragments(entity, paths, rejected):
+    data_dict = {}
+    for path in paths:
+        row_numbers = array('q')
+        with open(_row_numbers_path(path), 'rb') as f:
+            row_numbers.frombytes(f.read())
+        with open(path, 'r', newline='') as f:
+            data_dict.update(ENTITIES[entity].load_rows(_numbered_rows(csv.reader(f), row_numbers), 0, rejected))
+    return data_dict
+
+
+def _run_shard(job, shard, num_shards, fragments, whole_files, outputs, work_dir, quarantine, mode):
+    t0 = time.perf_counter()
+    stores, rejects = {}, {}
+    # workers started with spawn or forkserver do not inherit the parent's money mode
+    with non_interactive(), money_mode(mode):
+        for entity, paths in fragments.items():
+            rejects[entity] = RejectedRows() if quarantine else None
+            stores[entity] = _load_fragments(entity, paths, rejects[entity])
+        for entity, file in whole_files.items():
+            rejects[entity] = RejectedRows() if quarantine else None
+            with open(file, 'r', newline='') as f:
+                csvreader = csv.reader(f)
+                next(csvreader, None)
+                stores[entity] = ENTITIES[entity].load_rows(_numbered_rows(csvreader, itertools.count()), 0,
+                                                            rejects[entity])
+        load_seconds = time.perf_counter() - t0
+
+        result = job(stores, shard, num_shards) if job is not None else None
+        job_seconds = time.perf_counter() - t0 - load_seconds
+
+        written = {}
+        for entity in outputs:
+            if entity in stores:
+                path = os.path.join(work_dir, f"out.{entity}.{shard:04d}.csv")
+                ENTITIES[entity].write(stores[entity], path)
+                written[entity] = path
+    return {'shard': shard,
+            'result': result,
+            'rows': {entity: len(d) for entity, d in stores.items()},
+            'rejected': rejects,
+            'written': written,
+            'load_seconds': load_seconds,
+            'job_seconds': job_seconds,
+            'seconds': time.perf_counter() - t0}
+
+
+################################################
+##### Merge step
+################################################
+def _merge_outputs(outfile, shard_files):
+    # one header, then every shard file without its header, replaced atomically as write_csv_rows does
+    outdir = os.path.dirname(os.path.abspath(outfile))
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(outfile) + '.', suffix='.tmp', dir=outdir)
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            for i, path in enumerate(shard_files):
+                with open(path, 'rb') as f:
+                    header = f.readline()
+                    if i == 0:
+                        out.write(header)
+                    shutil.copyfileobj(f, out, 1024*1024)
+            out.flush()
+            os.fsync(out.fileno())
+        os.chmod(tmp_path, output_file_mode(outfile))
+        os.replace(tmp_path, outfile)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def run_sharded(job, files=DEFAULT_INPUT_FILES, outputs=None, num_shards=None, chunk_bytes=DEFAULT_CHUNK_BYTES,
+                quarantine_dir=None, work_dir=None):
+    """Runs job on num_shards shards (default: one per CPU) and merges the outputs.
+
+    files maps entity name -> input csv file, outputs maps entity name ->
+    output csv file.  Returns {'results': [job result per shard],
+    'shards': [per-shard rows and timings], 'partition_seconds',
+    'merge_seconds', 'seconds'}.
+    """
+    unknown = set(files) - set(ENTITIES)
+    if unknown:
+        raise ValueError(f"Unknown entity {', '.join(sorted(unknown))}. Expected one of {', '.join(ENTITIES)}.")
+    outputs = outputs or {}
+    num_shards = num_shards or os.cpu_count() or 1
+    t0 = time.perf_counter()
+    own_work_dir = work_dir is None
+    work_dir = work_dir or tempfile.mkdtemp(prefix='bank_sharding_')
+    try:
+        with ProcessPoolExecutor(max_workers=num_shards) as pool:
+            # 1. partition the customer-keyed files by shard
+            fragments = [{} for _ in range(num_shards)]
+            # with one shard every file is loaded whole, without partitioning
+            partitioned = [entity for entity in files if entity in CUSTOMER_KEYED and num_shards > 1]
+            tasks = []
+            for entity, file in files.items():
+                if entity not in partitioned:
+                    continue
+                for shard in range(num_shards):
+                    fragments[shard][entity] = []
+                for part, (start, end, first_row) in enumerate(split_file(file, chunk_bytes)):
+                    tasks.append(pool.submit(_partition_range, entity, file, start, end, first_row, part,
+                                             num_shards, work_dir))
+            for task in tasks:
+                entity, part, written = task.result()
+                for shard in written:
+                    fragments[shard][entity].append((part, _fragment_path(work_dir, entity, part, shard)))
+            for shard_fragments in fragments:
+                for entity, parts in shard_fragments.items():
+                    shard_fragments[entity] = [path for part, path in sorted(parts)]
+            partition_seconds = time.perf_counter() - t0
+
+            # 2. one job per shard
+            whole_files = {entity: file for entity, file in files.items() if entity not in partitioned}
+            tasks = [pool.submit(_run_shard, job, shard, num_shards, fragments[shard],
+                                 whole_files if shard == 0 else {}, outputs, work_dir, quarantine_dir is not None,
+                                 get_money_mode())
+                     for shard in range(num_shards)]
+            shards = [task.result() for task in tasks]
+
+        # 3. merge the shard outputs and the rejected rows
+        t1 = time.perf_counter()
+        for entity, outfile in outputs.items():
+            shard_files = [s['written'][entity] for s in shards if entity in s['written']]
+            if shard_files:
+                _merge_outputs(outfile, shard_files)
+                logger.info("Sharded %s data was written to csv file at location %s.", entity, outfile)
+        if quarantine_dir is not None:
+            for entity, file in files.items():
+                # back in file order, as the sequential and parallel loaders write them
+                rejected = []
+                for s in shards:
+                    rows = s['rejected'].get(entity)
+                    if rows:
+                        rejected.extend(zip(rows.row_numbers, rows))
+                rejected.sort(key=lambda entry: entry[0])
+                if rejected:
+                    with QuarantineWriter.for_file(quarantine_dir, file) as quarantine:
+                        quarantine.set_header(read_header(file))
+                        for _, row in rejected:
+                            quarantine.reject(row[:-1], row[-1])
+        merge_seconds = time.perf_counter() - t1
+    finally:
+        if own_work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    for s in shards:
+        s['rejected'] = {entity: len(rows or []) for entity, rows in s['rejected'].items()}
+    seconds = time.perf_counter() - t0
+    logger.info("Sharded job ran on %d shards in %.3fs.", num_shards, seconds)
+    return {'results': [s.pop('result') for s in shards],
+            'shards': shards,
+            'partition_seconds': partition_seconds,
+            'merge_seconds': merge_seconds,
+            'seconds': seconds}
+
+
+################################################
+##### Jobs
+################################################
+def month_end_job(stores, shard, num_shards):
+    """Month-end interest on the shard's savings accounts and credit cards; returns the run_month_end summary."""
+    from bank_month_end import run_month_end
+    return run_month_end(stores.get('savings'), stores.get('credit_cards'))
+
+
+def merge_month_end_summaries(summaries):
+    """Adds up the month-end summaries of all shards."""
+    merged = {}
+    for summary in summaries:
+        for field, value in summary.items():
+            merged[field] = merged.get(field, 0) + value
+    # the shards round their interest; take it from the unrounded balances instead
+    if 'savings_balance_after' in merged:
+        merged['savings_interest_credited'] = round(merged['savings_balance_after'] - merged['savings_balance_before'], 2)
+    if 'card_balance_after' in merged:
+        merged['card_interest_charged'] = round(merged['card_balance_after'] - merged['card_balance_before'], 2)
+    return merged
+
+
+if __name__ == "__main__":
+    from bank_synthetic_data import generate_dataset
+    configure_logging()
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    shard_counts = [int(n) for n in sys.argv[2:]] or [1, os.cpu_count() or 1]
+    with tempfile.TemporaryDirectory(prefix='bank_sharding_demo_') as demo_dir:
+        files = generate_dataset(os.path.join(demo_dir, 'in'), rows)
+        # month-end needs only the savings accounts and credit cards
+        files = {entity: files[entity] for entity in ('savings', 'credit_cards')}
+        outputs = {entity: os.path.join(demo_dir, f"out_{entity}.csv") for entity in files}
+        baseline = None
+        for num_shards in shard_counts:
+            run = run_sharded(month_end_job, files, outputs, num_shards)
+            baseline = baseline or run['seconds']
+            summary = merge_month_end_summaries(run['results'])
+            print(f"{num_shards:>3} shards  {run['seconds']:8.3f}s  (partition {run['partition_seconds']:.3f}s, "
+                  f"merge {run['merge_seconds']:.3f}s)  speed-up {baseline/run['seconds']:5.2f}x  "
+                  f"interest {summary['savings_interest_credited'] + summary['card_interest_charged']:,.2f}")
+
+
+### EOF
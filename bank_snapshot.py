@@ -0,0 +1,379 @@
+#!/usr/bin/env python
+
+"""
+@Date: 2026-10-18
+
+This file saves the loaded state of the whole bank (all seven entity
+dictionaries) to one compact binary snapshot, and reopens it without
+re-parsing or re-validating any csv file.
+
+Snapshot layout:
+1. An 8 byte magic string and the length of a JSON header.
+2. The JSON header, describing every entity and the byte offset of each column.
+3. One fixed-width little-endian array per column.  Floats are float64,
+   integers are int64, dates are int32 day ordinals (0 = None, -1 = empty
+   string) and strings are int32 indexes into the string table (-1 = None).
+   Money columns are float64 dollars, or int64 cents for a snapshot saved
+   in the cents money mode of "bank_money.py".
+4. A packed string table: int64 offsets followed by the utf-8 bytes of every
+   distinct string.
+
+Every section is 64 byte aligned, so reopening the snapshot only maps the
+file into memory.  The entity dictionaries returned by load_snapshot build an
+object the first time its key is accessed, and the numeric columns can be
+read directly as NumPy arrays with BankSnapshot.column().
+
+The header records the money mode the snapshot was saved in, and a snapshot
+without it is refused.  Objects reopened in the other mode get their amounts
+converted to that mode.
+
+Example:
+    save_snapshot("bank.snap", branches=bank_locations_objects_dict, customers=cust_objects_dict)
+    snap = load_snapshot("bank.snap")
+    snap.customers['600000'].get_full_name()
+    snap.column('savings', 'balance').sum()
+
+"""
+
+import datetime
+import json
+import mmap
+import os
+import struct
+import tempfile
+from collections.abc import MutableMapping
+
+import numpy as np
+
+from bank_classes_and_io_funcs import (Branch, Customer, Employee, CheckingAccount, SavingsAccount,
+                                       CreditCard, LoanAccount, logger)
+from bank_money import FLOAT as FLOAT_MONEY, CENTS, get_money_mode, to_cents, from_cents
+
+
+MAGIC = b'BANKSNP1'
+VERSION = 1
+ALIGNMENT = 64
+
+STR = 'str'
+FLOAT = 'f8'
+INT = 'i8'
+DATE = 'date'
+MONEY = 'money'
+
+DTYPES = {STR: '<i4', FLOAT: '<f8', INT: '<i8', DATE: '<i4'}
+MONEY_DTYPES = {FLOAT_MONEY: '<f8', CENTS: '<i8'}
+
+# entity name -> (class, [(attribute, kind), ...]) in csv column order
+SCHEMAS = {
+    'branches': (Branch, [('bank_id', STR), ('bank_name', STR), ('location_id', STR), ('branch_name', STR)]),
+    'customers': (Customer, [('customer_id', STR), ('membership_date', DATE), ('first_name', STR),
+                             ('last_name', STR), ('birth_date', DATE), ('street_address', STR),
+                             ('city', STR), ('state', STR), ('zip_code', STR), ('phone_number', STR)]),
+    'employees': (Employee, [('employee_id', STR), ('location_id', STR), ('emp_first_name', STR),
+                             ('emp_last_name', STR), ('salary', FLOAT), ('start_date', DATE),
+                             ('termination_date', DATE)]),
+    'checking': (CheckingAccount, [('customer_id', STR), ('account_number', STR), ('balance', MONEY)]),
+    'savings': (SavingsAccount, [('customer_id', STR), ('account_number', STR), ('balance', MONEY),
+                                 ('annual_interest_rate', FLOAT)]),
+    'credit_cards': (CreditCard, [('customer_id', STR), ('annual_interest_rate', FLOAT), ('balance', MONEY),
+                                  ('available_credit', MONEY), ('credit_card_number', STR)]),
+    'loans': (LoanAccount, [('customer_id', STR), ('annual_interest_rate', FLOAT), ('balance', MONEY),
+                            ('loan_amount', MONEY), ('loan_account_number', STR), ('number_of_years', INT)]),
+}
+
+KEY_COLUMN = '_key'
+
+
+################################################
+##### Snapshot writer
+################################################
+def _align(n):
+    return (n + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _encode_date(value):
+    if value is None:
+        return 0
+    if value == '':
+        return -1
+    if isinstance(value, str):
+        value = datetime.date.fromisoformat(value)
+    return value.toordinal()
+
+
+def _decode_date(value):
+    if value == 0:
+        return None
+    if value == -1:
+        return ''
+    return datetime.date.fromordinal(value)
+
+
+class _StringTable:
+    def __init__(self):
+        self.index = {}
+        self.strings = []
+
+    def add(self, value):
+        if value is None:
+            return -1
+        i = self.index.get(value)
+        if i is None:
+            i = len(self.strings)
+            self.index[value] = i
+            self.strings.append(value)
+        return i
+
+    def to_arrays(self):
+        encoded = [s.encode('utf-8') for s in self.strings]
+        offsets = np.zeros(len(encoded) + 1, dtype='<i8')
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        return offsets, b''.join(encoded)
+
+
+def _dtype(kind, money_mode):
+    return MONEY_DTYPES[money_mode] if kind == MONEY else DTYPES[kind]
+
+
+def _money_converter(saved_mode):
+    # converts amounts saved in saved_mode to the current money mode; None when they match
+    mode = get_money_mode()
+    if saved_mode == mode:
+        return None
+    return from_cents if saved_mode == CENTS else to_cents
+
+
+def _encode_column(values, kind, strings, money_mode):
+    n = len(values)
+    if kind == STR:
+        return np.fromiter((strings.add(v) for v in values), dtype=DTYPES[kind], count=n)
+    if kind == DATE:
+        return np.fromiter((_encode_date(v) for v in values), dtype=DTYPES[kind], count=n)
+    return np.asarray(values, dtype=_dtype(kind, money_mode)).reshape(n)
+
+
+def save_snapshot(path, **entity_dicts):
+    """Writes the given entity dictionaries to a binary snapshot at path.
+
+    Keyword names must be keys of SCHEMAS, e.g. customers=cust_objects_dict.
+    """
+    strings = _StringTable()
+    money_mode = get_money_mode()
+    header = {'version': VERSION, 'money_mode': money_mode, 'entities': {}}
+    sections = []
+
+    for name, data_dict in entity_dicts.items():
+        if name not in SCHEMAS:
+            raise ValueError(f"Unknown entity {name!r}. Expected one of {', '.join(SCHEMAS)}.")
+        cls, schema = SCHEMAS[name]
+        objs = list(data_dict.values())
+        columns = [(KEY_COLUMN, STR, _encode_column(list(data_dict.keys()), STR, strings, money_mode))]
+        for attr, kind in schema:
+            columns.append((attr, kind, _encode_column([getattr(o, attr) for o in objs], kind, strings, money_mode)))
+
+        header['entities'][name] = {
+            'count': len(objs),
+            'columns': [{'name': attr, 'kind': kind} for attr, kind, _ in columns],
+        }
+        for attr, kind, arr in columns:
+            sections.append((header['entities'][name]['columns'], attr, arr))
+
+    offsets, data = strings.to_arrays()
+
+    # two passes: the header size decides where the first section starts
+    def layout(start):
+        pos = start
+        for cols, attr, arr in sections:
+            pos = _align(pos)
+            next(c for c in cols if c['name'] == attr)['offset'] = pos
+            pos += arr.nbytes
+        pos = _align(pos)
+        header['strings'] = {'count': len(strings.strings), 'offsets': pos}
+        pos += offsets.nbytes
+        header['strings']['data'] = pos
+        header['strings']['length'] = len(data)
+        return pos + len(data)
+
+    start = 0
+    while True:
+        layout(start)
+        blob = json.dumps(header).encode('utf-8')
+        needed = _align(len(MAGIC) + 8 + len(blob))
+        if needed <= start:
+            break
+        start = needed
+
+    outdir = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp', dir=outdir)
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(MAGIC)
+            file.write(struct.pack('<Q', len(blob)))
+            file.write(blob)
+            for cols, attr, arr in sections:
+                offset = next(c for c in cols if c['name'] == attr)['offset']
+                file.write(b'\0' * (offset - file.tell()))
+                file.write(arr.tobytes())
+            file.write(b'\0' * (header['strings']['offsets'] - file.tell()))
+            file.write(offsets.tobytes())
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    logger.info("Bank snapshot with %d entities was written to %s.", len(entity_dicts), path)
+
+
+################################################
+##### Snapshot reader
+################################################
+class _StringReader:
+    def __init__(self, buf, info):
+        self.offsets = np.frombuffer(buf, dtype='<i8', count=info['count'] + 1, offset=info['offsets'])
+        self.data = memoryview(buf)[info['data']:info['data'] + info['length']]
+
+    def get(self, i):
+        if i < 0:
+            return None
+        return bytes(self.data[self.offsets[i]:self.offsets[i + 1]]).decode('utf-8')
+
+
+class SnapshotDict(MutableMapping):
+    """Dictionary view of one entity in a snapshot.
+
+    Keys are decoded the first time the dictionary is used, and an object is
+    only built when its key is accessed.  Assignments and deletions behave
+    like a normal dictionary and are kept in memory.
+    """
+
+    def __init__(self, cls, columns, strings, money_converter=None):
+        self._cls = cls
+        self._columns = columns
+        self._strings = strings
+        self._money_converter = money_converter
+        self._rows = None
+        self._objects = {}
+
+    def _key_rows(self):
+        if self._rows is None:
+            get = self._strings.get
+            self._rows = {get(i): row for row, i in enumerate(self._columns[KEY_COLUMN][1].tolist())}
+        return self._rows
+
+    def _materialize(self, row):
+        obj = self._cls.__new__(self._cls)
+        for attr, (kind, arr) in self._columns.items():
+            if attr == KEY_COLUMN:
+                continue
+            value = arr[row].item()
+            if kind == STR:
+                value = self._strings.get(value)
+            elif kind == DATE:
+                value = _decode_date(value)
+            elif kind == MONEY and self._money_converter is not None:
+                value = self._money_converter(value)
+            setattr(obj, attr, value)
+        return obj
+
+    def __getitem__(self, key):
+        obj = self._objects.get(key)
+        if obj is None:
+            obj = self._materialize(self._key_rows()[key])
+            self._objects[key] = obj
+        return obj
+
+    def __setitem__(self, key, value):
+        self._key_rows().setdefault(key, None)
+        self._objects[key] = value
+
+    def __delitem__(self, key):
+        del self._key_rows()[key]
+        self._objects.pop(key, None)
+
+    def __iter__(self):
+        return iter(self._key_rows())
+
+    def __len__(self):
+        return len(self._key_rows())
+
+
+class BankSnapshot:
+    """An opened snapshot file.  Entity dictionaries are attributes, e.g. snap.customers."""
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._buf[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a bank snapshot file.")
+        (length,) = struct.unpack_from('<Q', self._buf, len(MAGIC))
+        header = json.loads(self._buf[len(MAGIC) + 8:len(MAGIC) + 8 + length])
+        if header['version'] != VERSION:
+            self.close()
+            raise ValueError(f"Unsupported snapshot version {header['version']}.")
+
+        self.money_mode = header.get('money_mode')
+        if self.money_mode not in MONEY_DTYPES:
+            self.close()
+            raise ValueError(f"Snapshot {path} has no valid money mode ({self.money_mode!r}) in its header.")
+        converter = _money_converter(self.money_mode)
+        self._strings = _StringReader(self._buf, header['strings'])
+        self._columns = {}
+        self.entities = {}
+        for name, info in header['entities'].items():
+            columns = {}
+            for col in info['columns']:
+                kind = col['kind']
+                arr = np.frombuffer(self._buf, dtype=_dtype(kind, self.money_mode), count=info['count'],
+                                    offset=col['offset'])
+                columns[col['name']] = (kind, arr)
+            self._columns[name] = columns
+            self.entities[name] = SnapshotDict(SCHEMAS[name][0], columns, self._strings, converter)
+
+    def __getattr__(self, name):
+        entities = self.__dict__.get('entities', {})
+        if name in entities:
+            return entities[name]
+        raise AttributeError(name)
+
+    def __getitem__(self, name):
+        return self.entities[name]
+
+    def column(self, entity, attr):
+        """Returns the stored column as a read-only NumPy array without building any objects.
+
+        String columns are returned as string table indexes and date columns as day ordinals.
+        Money columns are in the snapshot's money_mode.
+        """
+        return self._columns[entity][attr][1]
+
+    def close(self):
+        self._strings = None
+        self._columns = {}
+        try:
+            self._buf.close()
+        except BufferError:
+            # arrays handed out by column() still reference the mapping
+            pass
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_snapshot(path):
+    snap = BankSnapshot(path)
+    logger.info("Bank snapshot loaded from %s.", path)
+    return snap
+
+
+### EOF
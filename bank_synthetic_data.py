@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+
+"""
+@Date: 2026-10-18
+
+This file generates synthetic input files for all seven entity schemas, in
+the same layout as the files in sample_input, at any size.
+
+The data is deterministic: the same seed and row counts always produce the
+same files.  Keys are unique, accounts belong to generated customers and
+employees work at generated branches, so the files load cleanly with the
+load_*_file_to_dict functions.
+
+With dirty_ratio > 0, about that fraction of the rows is corrupted in a way
+the loaders reject (a missing field, a non-numeric amount, an invalid date,
+a bad card number or a checking balance under the minimum).  Load such files
+inside non_interactive() with a QuarantineWriter, see
+"bank_data_quality_checks.py".
+
+Example:
+    files = generate_dataset("synthetic", rows=100000, seed=42, dirty_ratio=0.01)
+    cust_objects_dict = load_customer_file_to_dict(files['customers'])
+
+    python bank_synthetic_data.py synthetic 100000 42 0.01
+
+"""
+
+import csv
+import datetime
+import os
+import random
+import sys
+
+from bank_classes_and_io_funcs import (BANK_LOCATION_COLUMNS, CUSTOMER_COLUMNS, EMPLOYEE_COLUMNS,
+                                       CHECKING_ACCOUNT_COLUMNS, SAVINGS_ACCOUNT_COLUMNS,
+                                       CREDIT_CARD_COLUMNS, LOAN_ACCOUNT_COLUMNS, CheckingAccount, logger)
+from bank_data_quality_checks import configure_logging
+
+
+FILE_NAMES = {
+    'branches': "BankLocations.csv",
+    'customers': "Customers.csv",
+    'employees': "Employees.csv",
+    'checking': "CheckingAccounts.csv",
+    'savings': "SavingsAccounts.csv",
+    'credit_cards': "CreditCards.csv",
+    'loans': "LoanAccounts.csv",
+}
+
+COLUMNS = {
+    'branches': BANK_LOCATION_COLUMNS,
+    'customers': CUSTOMER_COLUMNS,
+    'employees': EMPLOYEE_COLUMNS,
+    'checking': CHECKING_ACCOUNT_COLUMNS,
+    'savings': SAVINGS_ACCOUNT_COLUMNS,
+    'credit_cards': CREDIT_CARD_COLUMNS,
+    'loans': LOAN_ACCOUNT_COLUMNS,
+}
+
+FIRST_NAMES = ['Susan', 'Adam', 'Maria', 'James', 'Linda', 'Robert', 'Tina', 'Daniel', 'Karen', 'Luis',
+               'Mei', 'Omar', 'Priya', 'Kevin', 'Grace', 'Hiro', 'Fatima', 'Noah', 'Elena', 'Samuel']
+LAST_NAMES = ['Smith', 'Lowe', 'Garcia', 'Nguyen', 'Miller', 'Goodwin', 'Johnson', 'Kim', 'Patel', 'Brown',
+              'Lopez', 'Chen', 'Davis', 'Wilson', 'Martinez', 'Anderson', 'Taylor', 'Thomas', 'Moore', 'Clark']
+STREETS = ['Main Street', 'Scholars Rd', 'Sunset Blvd', 'Oak Ave', 'Venice Blvd', 'Elm Street',
+           'Lincoln Blvd', 'Maple Dr', 'Wilshire Blvd', 'Pico Blvd']
+CITIES = [('Los Angeles', 'CA', '900'), ('Culver City', 'CA', '902'), ('Santa Monica', 'CA', '904'),
+          ('Pasadena', 'CA', '911'), ('San Diego', 'CA', '921'), ('Phoenix', 'AZ', '850'),
+          ('Las Vegas', 'NV', '891'), ('Portland', 'OR', '972'), ('Seattle', 'WA', '981'),
+          ('Austin', 'TX', '787')]
+BANK_NAMES = ['Wells Fargo', 'Chase', 'Bank of America', 'Citibank']
+
+FIRST_CUSTOMER_ID = 600000
+FIRST_EMPLOYEE_ID = 3000
+FIRST_LOCATION_ID = 100
+
+# 15 card digits after the prefix, each one of the 9 digits different from the one before
+_CARD_SPACE = 9**15
+
+
+def _date(rng, first_year, last_year):
+    start = datetime.date(first_year, 1, 1).toordinal()
+    end = datetime.date(last_year, 12, 31).toordinal()
+    return datetime.date.fromordinal(rng.randint(start, end)).isoformat()
+
+
+def _card_number(i, rng_offset):
+    # a bijection of i, so numbers never repeat, and no digit equals the one
+    # before it, so no number has the repeated runs the validator rejects
+    n = (i*7919 + rng_offset) % _CARD_SPACE
+    digits = ['4']
+    for _ in range(15):
+        n, b = divmod(n, 9)
+        digits.append(str((int(digits[-1]) + 1 + b) % 10))
+    d = ''.join(digits)
+    return f"{d[0:4]}-{d[4:8]}-{d[8:12]}-{d[12:16]}"
+
+
+################################################
+##### Clean row generators
+################################################
+def _branch_row(i, rng, counts):
+    bank = BANK_NAMES[i % len(BANK_NAMES)]
+    city = CITIES[rng.randrange(len(CITIES))][0]
+    return [str(10 + i % len(BANK_NAMES)), bank, str(FIRST_LOCATION_ID + i), f"{city} Branch {i}"]
+
+
+def _customer_row(i, rng, counts):
+    city, state, zip_prefix = CITIES[rng.randrange(len(CITIES))]
+    return [str(FIRST_CUSTOMER_ID + i), _date(rng, 2000, 2025), rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES),
+            _date(rng, 1940, 2005), f"{rng.randint(1, 9999)} {rng.choice(STREETS)}", city, state,
+            f"{zip_prefix}{rng.randint(0, 99):02d}", f"{rng.randint(200, 999)}-555-{rng.randint(0, 9999):04d}"]
+
+
+def _employee_row(i, rng, counts):
+    start = _date(rng, 1995, 2025)
+    term = _date(rng, int(start[:4]), 2025) if rng.random() < 0.1 else ''
+    return [str(FIRST_EMPLOYEE_ID + i), str(FIRST_LOCATION_ID + rng.randrange(counts['branches'])),
+            rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), str(rng.randrange(35000, 150000, 500)), start, term]
+
+
+def _customer_id(rng, counts):
+    return str(FIRST_CUSTOMER_ID + rng.randrange(counts['customers']))
+
+
+def _checking_row(i, rng, counts):
+    return [_customer_id(rng, counts), str(168000000 + i), f"{rng.uniform(CheckingAccount.MIN_BALANCE, 20000):.2f}"]
+
+
+def _savings_row(i, rng, counts):
+    return [_customer_id(rng, counts), str(268000000 + i), f"{rng.uniform(0, 100000):.2f}",
+            f"{rng.choice((0.005, 0.008, 0.01, 0.015, 0.02))}"]
+
+
+def _credit_card_row(i, rng, counts):
+    return [_customer_id(rng, counts), f"{rng.choice((0.129, 0.145, 0.163, 0.178, 0.199))}",
+            f"{rng.uniform(0, 8000):.2f}", _card_number(i, counts['card_offset'])]
+
+
+def _loan_row(i, rng, counts):
+    amount = rng.randrange(5000, 60000, 1000)
+    return [_customer_id(rng, counts), f"{rng.choice((0.059, 0.089, 0.132, 0.145))}",
+            f"{rng.uniform(0, amount):.2f}", f"{amount:.2f}", f"555-{i:08d}", str(rng.choice((3, 5, 7, 10)))]
+
+
+ROW_GENERATORS = {
+    'branches': _branch_row,
+    'customers': _customer_row,
+    'employees': _employee_row,
+    'checking': _checking_row,
+    'savings': _savings_row,
+    'credit_cards': _credit_card_row,
+    'loans': _loan_row,
+}
+
+
+################################################
+##### Dirty rows
+################################################
+def _drop_last_field(entity, row, rng):
+    return row[:-1]
+
+
+def _bad_number(entity, row, rng):
+    col = {'employees': 4, 'checking': 2, 'savings': 2, 'credit_cards': 2, 'loans': 3}[entity]
+    row[col] = rng.choice(('n/a', '12,5O', ''))
+    return row
+
+
+# is_valid_date only checks the format and ranges; an impossible day like
+# 2021-02-30 is rejected only where the loader parses the date, not in birth_date
+BAD_DATES = ('2020-13-01', '1850-01-01', '01/02/2020')
+BAD_PARSED_DATES = BAD_DATES + ('2021-02-30',)
+
+def _bad_date(entity, row, rng):
+    col, values = {'customers': rng.choice(((1, BAD_PARSED_DATES), (4, BAD_DATES))),
+                   'employees': (5, BAD_PARSED_DATES)}[entity]
+    row[col] = rng.choice(values)
+    return row
+
+
+def _bad_card(entity, row, rng):
+    row[3] = rng.choice(('1234-5678-9123-4567', '4111-1111-2345-6789', '4123 4567 8912 3456', '41234567891234'))
+    return row
+
+
+def _low_balance(entity, row, rng):
+    row[2] = f"{rng.uniform(0, CheckingAccount.MIN_BALANCE - 0.01):.2f}"
+    return row
+
+
+DIRTY_KINDS = {
+    'branches': (_drop_last_field,),
+    'customers': (_drop_last_field, _bad_date),
+    'employees': (_drop_last_field, _bad_number, _bad_date),
+    'checking': (_drop_last_field, _bad_number, _low_balance),
+    'savings': (_drop_last_field, _bad_number),
+    'credit_cards': (_drop_last_field, _bad_number, _bad_card),
+    'loans': (_drop_last_field, _bad_number),
+}
+
+
+def generate_rows(entity, num_rows, seed=0, dirty_ratio=0.0, counts=None):
+    """Yields num_rows rows for entity.  counts gives the row counts of the other entities."""
+    counts = dict(counts or {})
+    counts.setdefault('branches', num_rows)
+    counts.setdefault('customers', num_rows)
+    # each entity has its own stream, so changing one count does not change the other files
+    rng = random.Random(f"{seed}-{entity}")
+    counts['card_offset'] = random.Random(seed).randrange(_CARD_SPACE)
+    make_row = ROW_GENERATORS[entity]
+    dirty_kinds = DIRTY_KINDS[entity]
+    for i in range(num_rows):
+        row = make_row(i, rng, counts)
+        if dirty_ratio and rng.random() < dirty_ratio:
+            row = rng.choice(dirty_kinds)(entity, row, rng)
+        yield row
+
+
+def generate_dataset(out_dir, rows=1000, seed=0, dirty_ratio=0.0, counts=None):
+    """Writes one csv file per entity to out_dir and returns {entity: file path}.
+
+    Every entity gets rows rows unless counts gives another number for it.
+    """
+    counts = {entity: (counts or {}).get(entity, rows) for entity in FILE_NAMES}
+    os.makedirs(out_dir, exist_ok=True)
+    files = {}
+    for entity, name in FILE_NAMES.items():
+        path = os.path.join(out_dir, name)
+        with open(path, 'w', newline='') as file:
+            csvwriter = csv.writer(file, lineterminator=os.linesep)
+            csvwriter.writerow(COLUMNS[entity])
+            csvwriter.writerows(generate_rows(entity, counts[entity], seed, dirty_ratio, counts))
+        files[entity] = path
+    logger.info("Synthetic dataset written to %s (seed %s, dirty ratio %s).", out_dir, seed, dirty_ratio)
+    return files
+
+
+if __name__ == "__main__":
+    configure_logging()
+    out_dir = sys.argv[1] if len(sys.argv) > 1 else "synthetic"
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    dirty_ratio = float(sys.argv[4]) if len(sys.argv) > 4 else 0.0
+    for entity, path in generate_dataset(out_dir, rows, seed, dirty_ratio).items():
+        print(f"{entity:<13} {path}")
+
+
+### EOF
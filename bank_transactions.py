@@ -0,0 +1,298 @@
+#!/usr/bin/env python
+
+"""
+@Date: 2026-10-18
+
+This file applies a file of money movements to the account dictionaries in
+bulk, instead of calling deposit, withdraw, make_purchase, withdraw_cash or
+make_payment once per row.
+
+The transactions csv file has one movement per row:
+
+    kind,key,op,amount
+    checking,168555105,withdraw,250.00
+    credit_cards,4003600000000014,purchase,89.99
+
+kind      op
+checking  deposit, withdraw
+savings   deposit, withdraw
+credit_cards  purchase, cash_advance, payment
+loans     payment
+
+Rows are grouped by account and the net effect of each account's rows is
+applied at once, with the same rules as the single-account methods:
+1. Checking withdrawals are charged CheckingAccount.WITHDRAWAL_FEE, and
+   CheckingAccount.OVERDRAFT_FEE when the balance falls below zero.
+2. Cash advances are charged CreditCard.CASH_ADVANCE_FEE, and purchases and
+   cash advances reduce the available credit.
+3. Payments reduce the balance only, as in Service.make_payment.
+
+Only the overdraft fee depends on the order of the rows.  The running
+balance of every checking account is computed for all rows at once; an
+account whose running balance never falls below zero after a withdrawal
+gets its net change directly, and only the accounts that may overdraw are
+replayed row by row, in file order.  The receipts the single-account methods
+print are not printed.
+
+In the cents money mode of "bank_money.py" the amounts are read as int
+cents and every balance, fee and per-account sum is int64 arithmetic.
+
+Rows that cannot be applied (unknown kind, operation or account, or an amount
+that is not a positive number) raise ValueError, or go to the quarantine file
+when a QuarantineWriter is passed.
+
+Example:
+    stores = {'checking': checking_acct_objects_dict, 'savings': savings_acct_objects_dict,
+              'credit_cards': credit_card_acct_objects_dict, 'loans': loan_acct_objects_dict}
+    summary = process_transactions_file("transactions.csv", stores)
+
+"""
+
+import csv
+import itertools
+import math
+
+import numpy as np
+
+from bank_classes_and_io_funcs import (CheckingAccount, CreditCard, has_movement_listeners, notify_movement,
+                                       skip_header, quarantine_or_raise, logger)
+from bank_money import is_cents_mode, to_cents
+
+
+TRANSACTION_COLUMNS = ['kind', 'key', 'op', 'amount']
+
+OPS_BY_KIND = {
+    'checking': ('deposit', 'withdraw'),
+    'savings': ('deposit', 'withdraw'),
+    'credit_cards': ('purchase', 'cash_advance', 'payment'),
+    'loans': ('payment',),
+}
+
+# rows applied per pass; accounts carry their balances from one pass to the next
+DEFAULT_CHUNK_ROWS = 1000000
+
+
+def process_transactions_file(file, stores, chunk_rows=DEFAULT_CHUNK_ROWS, quarantine=None):
+    """Applies every movement in the transactions csv file to stores.
+
+    stores maps kind to the dictionary of account objects.  Returns, per kind,
+    the number of rows applied, accounts changed and accounts that were
+    replayed row by row, plus the number of rejected rows.
+    """
+    summary = {kind: {'rows': 0, 'accounts': 0, 'sequential_accounts': 0} for kind in OPS_BY_KIND}
+    summary['rejected'] = 0
+    with open(file, 'r') as file:
+        csvreader = csv.reader(file)
+        # This skips the first header row of the CSV file.
+        skip_header(csvreader, quarantine)
+        while True:
+            rows = list(itertools.islice(csvreader, chunk_rows))
+            if not rows:
+                break
+            chunk = process_transaction_rows(rows, stores, quarantine)
+            for kind in OPS_BY_KIND:
+                for field in ('rows', 'accounts', 'sequential_accounts'):
+                    summary[kind][field] += chunk[kind][field]
+            summary['rejected'] += chunk['rejected']
+
+    logger.info("Transactions file %s applied: %d rows, %d rejected.",
+                file.name, sum(summary[kind]['rows'] for kind in OPS_BY_KIND), summary['rejected'])
+    return summary
+
+
+def _row_error(row):
+    # the reason a row is rejected, or None if it is a valid movement
+    if len(row) != len(TRANSACTION_COLUMNS):
+        return f"Expected {len(TRANSACTION_COLUMNS)} fields, got {len(row)}."
+    kind, key, op, amount = row
+    if kind not in OPS_BY_KIND:
+        return f"Unknown account kind {kind!r}."
+    if op not in OPS_BY_KIND[kind]:
+        return f"Operation {op!r} is not available for {kind}."
+    amount = _to_cents(amount) if is_cents_mode() else _to_float(amount)
+    if not (amount > 0 and math.isfinite(amount)):
+        return f"Amount must be a positive number, got {row[3]!r}."
+    return None
+
+
+def _to_float(text):
+    try:
+        return float(text)
+    except ValueError:
+        return math.nan
+
+
+def _to_cents(text):
+    # 0 cents is rejected like any other amount that is not positive, as are amounts beyond int64
+    try:
+        cents = to_cents(text)
+    except ValueError:
+        return 0
+    return cents if cents < 2**63 else 0
+
+
+def _sum_by(idx, values, n):
+    # per-account sums; cents are added as int64, exactly
+    if values.dtype.kind == 'i':
+        sums = np.zeros(n, dtype=np.int64)
+        np.add.at(sums, idx, values)
+        return sums
+    return np.bincount(idx, weights=values, minlength=n)
+
+
+# (kind, op) -> kind number * 8 + position of op in OPS_BY_KIND[kind]
+_PAIR_CODES = {(kind, op): k*8 + code
+               for k, kind in enumerate(OPS_BY_KIND) for code, op in enumerate(OPS_BY_KIND[kind])}
+
+
+def process_transaction_rows(rows, stores, quarantine=None):
+    """Applies a list of [kind, key, op, amount] rows, in order, to stores."""
+    summary = {kind: {'rows': 0, 'accounts': 0, 'sequential_accounts': 0} for kind in OPS_BY_KIND}
+    summary['rejected'] = 0
+    width = len(TRANSACTION_COLUMNS)
+    if any(len(row) != width for row in rows):
+        for row in rows:
+            if len(row) != width:
+                quarantine_or_raise(quarantine, row, ValueError(_row_error(row)))
+                summary['rejected'] += 1
+        rows = [row for row in rows if len(row) == width]
+    if not rows:
+        return summary
+
+    # one list per column; zip(*rows) is much slower on millions of rows
+    kinds, keys, ops, amounts = ([row[i] for row in rows] for i in range(width))
+    n = len(rows)
+    pairs = np.fromiter(map(_PAIR_CODES.get, zip(kinds, ops), itertools.repeat(-1)), dtype=np.int16, count=n)
+    if is_cents_mode():
+        amounts = np.fromiter(map(_to_cents, amounts), dtype=np.int64, count=n)
+    else:
+        try:
+            amounts = np.array(amounts, dtype=np.float64)
+        except ValueError:
+            amounts = np.fromiter(map(_to_float, amounts), dtype=np.float64, count=n)
+    valid = (pairs >= 0) & (amounts > 0) & np.isfinite(amounts)
+    for i in np.flatnonzero(~valid).tolist():
+        quarantine_or_raise(quarantine, rows[i], ValueError(_row_error(rows[i])))
+    summary['rejected'] += int((~valid).sum())
+
+    # look every account up before changing any of them
+    resolved = {}
+    for k, kind in enumerate(OPS_BY_KIND):
+        positions = np.flatnonzero(valid & (pairs >> 3 == k))
+        if len(positions):
+            resolved[kind] = _resolve(stores.get(kind, {}), rows, keys, positions, quarantine)
+
+    for kind, (objs, idx, positions, dropped) in resolved.items():
+        summary[kind] = _apply_kind(kind, objs, idx, (pairs[positions] & 7).astype(np.int8), amounts[positions])
+        summary['rejected'] += dropped
+    return summary
+
+
+def _resolve(store, rows, keys, positions, quarantine):
+    # returns the distinct accounts, the account of each row, the rows kept and the number dropped
+    index = {}
+    idx = np.fromiter((index.setdefault(keys[p], len(index)) for p in positions.tolist()),
+                      dtype=np.intp, count=len(positions))
+    objs = [store.get(key) for key in index]
+
+    found = np.array([obj is not None for obj in objs], dtype=bool)
+    dropped = 0
+    if not found.all():
+        keep = found[idx]
+        for p in positions[~keep].tolist():
+            quarantine_or_raise(quarantine, rows[p], ValueError(f"Account {keys[p]} not found."))
+        remap = np.cumsum(found) - 1
+        idx, positions = remap[idx[keep]], positions[keep]
+        objs = [obj for obj in objs if obj is not None]
+        dropped = int((~keep).sum())
+    return objs, idx, positions, dropped
+
+
+def _apply_kind(kind, objs, idx, ops, amounts):
+    n = len(objs)
+    if n == 0:
+        return {'rows': 0, 'accounts': 0, 'sequential_accounts': 0}
+    before = np.fromiter((obj.balance for obj in objs), dtype=amounts.dtype, count=n)
+    sequential = 0
+    if kind == 'checking':
+        after, sequential = _apply_checking(before, idx, ops, amounts)
+    else:
+        after = before + _sum_by(idx, _balance_deltas(kind, ops, amounts), n)
+
+    for obj, bal in zip(objs, after.tolist()):
+        obj.balance = bal
+    if kind == 'credit_cards':
+        # purchases and cash advances (with its fee) use up available credit; payments do not
+        used = np.where(ops == 0, amounts, np.where(ops == 1, amounts + _cash_advance_fee(amounts), 0))
+        spent = _sum_by(idx, used, n)
+        for obj, amount in zip(objs, spent.tolist()):
+            obj.available_credit -= amount
+
+    if has_movement_listeners():
+        _notify(kind, objs, before, idx, ops, amounts)
+    return {'rows': len(idx), 'accounts': n, 'sequential_accounts': sequential}
+
+
+def _cash_advance_fee(amounts):
+    return CreditCard.CASH_ADVANCE_FEE_CENTS if amounts.dtype.kind == 'i' else CreditCard.CASH_ADVANCE_FEE
+
+
+def _balance_deltas(kind, ops, amounts):
+    if kind == 'savings':
+        return np.where(ops == 0, amounts, -amounts)
+    if kind == 'credit_cards':
+        return np.where(ops == 0, amounts, np.where(ops == 1, amounts + _cash_advance_fee(amounts), -amounts))
+    return -amounts
+
+
+def _apply_checking(before, idx, ops, amounts):
+    """Returns the checking balances after all rows, and the number of accounts replayed row by row."""
+    cents = amounts.dtype.kind == 'i'
+    withdrawal_fee = CheckingAccount.WITHDRAWAL_FEE_CENTS if cents else CheckingAccount.WITHDRAWAL_FEE
+    overdraft_fee = CheckingAccount.OVERDRAFT_FEE_CENTS if cents else CheckingAccount.OVERDRAFT_FEE
+    withdraw = ops == 1
+    signed = np.where(withdraw, -(amounts + withdrawal_fee), amounts)
+    after = before + _sum_by(idx, signed, len(before))
+
+    # running balance after each row, within each account, in file order
+    order = np.argsort(idx, kind='stable')
+    sorted_idx = idx[order]
+    sorted_signed = signed[order]
+    starts = np.r_[0, np.flatnonzero(np.diff(sorted_idx)) + 1]
+    ends = np.r_[starts[1:], len(sorted_idx)]
+    csum = np.cumsum(sorted_signed)
+    offset = np.repeat(csum[starts] - sorted_signed[starts], ends - starts)
+    running = before[sorted_idx] + (csum - offset)
+
+    # accounts that may overdraw get the exact row by row treatment; for float
+    # dollars a small margin keeps rounding in the cumulative sum on the safe side
+    risky = withdraw[order] & (running < (0 if cents else 1e-6))
+    risky_groups = np.flatnonzero(np.add.reduceat(risky, starts) > 0)
+    for g in risky_groups.tolist():
+        rows = order[starts[g]:ends[g]]
+        acct = int(sorted_idx[starts[g]])
+        bal = before[acct].item()
+        for op, amount in zip(ops[rows].tolist(), amounts[rows].tolist()):
+            if op == 1:
+                bal -= amount
+                bal -= withdrawal_fee
+                if bal < 0:
+                    bal -= overdraft_fee
+            else:
+                bal += amount
+        after[acct] = bal
+    return after, len(risky_groups)
+
+
+def _notify(kind, objs, before, idx, ops, amounts):
+    # one movement per account and operation, with the summed amount; every
+    # notification carries the account's balance before the whole batch
+    names = OPS_BY_KIND[kind]
+    groups, inverse = np.unique(idx.astype(np.int64)*len(names) + ops, return_inverse=True)
+    totals = _sum_by(inverse, amounts, len(groups))
+    for group, total in zip(groups.tolist(), totals.tolist()):
+        acct, op = divmod(group, len(names))
+        notify_movement(objs[acct], names[op], total, before[acct].item())
+
+
+### EOF
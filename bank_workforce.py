@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+
+"""
+@Date: 2026-10-18
+
+This file rolls employees up to their branches in one vectorized pass,
+instead of calling Employee.get_tenure_years once per employee and joining
+the employee and branch dictionaries by hand.
+
+employee_arrays turns a dictionary of Employee objects into arrays of
+location ids, salaries, start dates and end dates (the termination date, or
+the as-of date for active employees).  tenure_years counts whole years
+between two date arrays the way relativedelta(end, start).years does,
+including the month-end rule for start dates such as February 29.
+
+branch_workforce joins the employees to the branches on location_id through
+a hash table and returns one summary per location:
+
+    headcount, active, terminated     all employees, still employed, terminated
+    payroll                           total salary of the active employees
+    mean_salary                       mean salary of the active employees
+    tenure_min/_median/_mean/_max     whole years of tenure over all employees
+    tenure_bands                      employees per band of TENURE_BANDS years
+
+Employees whose location_id is not in the branch dictionary are still
+counted, with bank_name and branch_name set to None.  Branches without
+employees are listed after the others with a headcount of 0, a payroll of 0
+and None for mean_salary and the tenure figures.  A termination date after
+the as-of date counts as active.
+
+Example:
+    workforce = branch_workforce(emp_objects_dict, branches_dict)
+    workforce['105']['payroll'], workforce['105']['tenure_bands']
+    write_branch_workforce_to_file(workforce, "sample_output/BranchWorkforce.csv")
+
+    python bank_workforce.py 1000000       # timing on synthetic employees
+
+"""
+
+import datetime
+import sys
+import time
+
+import numpy as np
+
+from bank_classes_and_io_funcs import Branch, Employee, logger
+from bank_csv_writer import write_csv_rows
+
+
+# lower bounds of the tenure bands, in whole years: [0, 1), [1, 3), [3, 5), [5, 10), [10, ...)
+TENURE_BANDS = (0, 1, 3, 5, 10)
+
+
+def _band_label(i):
+    low = TENURE_BANDS[i]
+    return f"{low}+" if i == len(TENURE_BANDS) - 1 else f"{low}-{TENURE_BANDS[i + 1]}"
+
+TENURE_BAND_LABELS = tuple(_band_label(i) for i in range(len(TENURE_BANDS)))
+
+
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+_NAT = np.iinfo(np.int64).min          # the integer behind NaT
+
+def _day_number(value):
+    # days since 1970-01-01 of a date or YYYY-MM-DD string; NaT for None and ''
+    if not value:
+        return _NAT
+    if isinstance(value, str):
+        value = datetime.date.fromisoformat(value)
+    return value.toordinal() - _EPOCH_ORDINAL
+
+
+def _to_dates(values, employee_ids, what):
+    # date.toordinal is much faster than letting numpy convert date objects
+    try:
+        days = np.fromiter(map(_day_number, values), dtype=np.int64, count=len(values))
+    except (ValueError, TypeError, AttributeError):
+        for emp_id, v in zip(employee_ids, values):
+            try:
+                _day_number(v)
+            except (ValueError, TypeError, AttributeError):
+                raise ValueError(f"Invalid {what} {v!r} for employee {emp_id}.") from None
+        raise
+    return days.view('datetime64[D]')
+
+
+def employee_arrays(employees, as_of=None):
+    """Returns the employee ids and the location, salary, start, end and active arrays.
+
+    end is the termination date, or as_of (default today) for employees that
+    have none or whose termination date is later.
+    """
+    as_of = np.datetime64(as_of or datetime.date.today(), 'D')
+    emps = list(employees.values())
+    n = len(emps)
+    ids = [e.employee_id for e in emps]
+    locations = [e.location_id for e in emps]
+    salaries = np.fromiter((e.salary for e in emps), dtype=np.float64, count=n)
+    starts = _to_dates([e.start_date for e in emps], ids, 'start date')
+    terms = _to_dates([e.termination_date for e in emps], ids, 'termination date')
+
+    active = np.isnat(terms) | (terms > as_of)
+    ends = np.where(active, as_of, terms)
+    return {'employee_ids': ids, 'location_ids': locations, 'salaries': salaries,
+            'start_dates': starts, 'end_dates': ends, 'active': active}
+
+
+def _add_months(months, days):
+    # the date `days` days into each month (an array of datetime64[M]), clamped to the month's length
+    month_len = ((months + 1).astype('datetime64[D]') - months.astype('datetime64[D]')).astype(np.int64)
+    return months.astype('datetime64[D]') + (np.minimum(days, month_len) - 1)
+
+
+def tenure_years(start_dates, end_dates):
+    """Whole years from each start date to its end date, as relativedelta(end, start).years."""
+    start_months = start_dates.astype('datetime64[M]')
+    end_months = end_dates.astype('datetime64[M]')
+    start_days = (start_dates - start_months).astype(np.int64) + 1
+    months = (end_months - start_months).astype(np.int64)
+
+    # step back one month when the start date moved forward that many months is past the end date
+    # (and forward one month for an end date before the start date)
+    moved = _add_months(start_months + months, start_days)
+    months = months - ((months > 0) & (moved > end_dates)) + ((months < 0) & (moved < end_dates))
+    return np.trunc(months/12).astype(np.int64)
+
+
+def _factorize(keys):
+    # hash each distinct key once; returns the distinct keys and each key's position among them
+    index = {}
+    codes = np.fromiter((index.setdefault(key, len(index)) for key in keys), dtype=np.intp, count=len(keys))
+    return list(index), codes
+
+
+def _group_medians(codes, values, counts):
+    order = np.lexsort((values, codes))
+    starts = np.r_[0, np.cumsum(counts)[:-1]]
+    low = values[order[starts + (counts - 1)//2]]
+    high = values[order[starts + counts//2]]
+    return (low + high)/2
+
+
+def _names(branch):
+    if branch is None:
+        return {'bank_name': None, 'branch_name': None}
+    return {'bank_name': branch.get_bank_name(), 'branch_name': branch.get_branch_name()}
+
+
+def _empty_summary(branch):
+    return dict(_names(branch), headcount=0, active=0, terminated=0, payroll=0.0, mean_salary=None,
+                tenure_min=None, tenure_median=None, tenure_mean=None, tenure_max=None,
+                tenure_bands=dict.fromkeys(TENURE_BAND_LABELS, 0))
+
+
+def branch_workforce(employees, branches=None, as_of=None):
+    """Returns {location_id: summary} for every location with an employee and every branch in branches."""
+    branches = branches or {}
+    arrays = employee_arrays(employees, as_of)
+    if not arrays['employee_ids']:
+        return {loc: _empty_summary(branch) for loc, branch in branches.items()}
+    locations, codes = _factorize(arrays['location_ids'])
+    k = len(locations)
+    active = arrays['active']
+    salaries = arrays['salaries']
+    tenure = tenure_years(arrays['start_dates'], arrays['end_dates'])
+
+    headcount = np.bincount(codes, minlength=k)
+    active_count = np.bincount(codes, weights=active, minlength=k).astype(np.int64)
+    payroll = np.bincount(codes, weights=np.where(active, salaries, 0.0), minlength=k)
+    tenure_sum = np.bincount(codes, weights=tenure, minlength=k)
+    tenure_min = np.full(k, np.iinfo(np.int64).max)
+    np.minimum.at(tenure_min, codes, tenure)
+    tenure_max = np.full(k, np.iinfo(np.int64).min)
+    np.maximum.at(tenure_max, codes, tenure)
+    tenure_median = _group_medians(codes, tenure, headcount)
+
+    band = np.searchsorted(TENURE_BANDS, tenure, side='right') - 1
+    band = np.clip(band, 0, len(TENURE_BANDS) - 1)
+    bands = np.bincount(codes*len(TENURE_BANDS) + band, minlength=k*len(TENURE_BANDS))
+    bands = bands.reshape(k, len(TENURE_BANDS))
+
+    summary = {}
+    for i, loc in enumerate(locations):
+        n_active = int(active_count[i])
+        summary[loc] = {
+            **_names(branches.get(loc)),
+            'headcount': int(headcount[i]),
+            'active': n_active,
+            'terminated': int(headcount[i]) - n_active,
+            'payroll': float(payroll[i]),
+            'mean_salary': float(payroll[i])/n_active if n_active else None,
+            'tenure_min': int(tenure_min[i]),
+            'tenure_median': float(tenure_median[i]),
+            'tenure_mean': float(tenure_sum[i])/int(headcount[i]),
+            'tenure_max': int(tenure_max[i]),
+            'tenure_bands': dict(zip(TENURE_BAND_LABELS, bands[i].tolist())),
+        }
+    unmatched = sum(1 for loc in locations if loc not in branches)
+    empty = 0
+    for loc, branch in branches.items():
+        if loc not in summary:
+            summary[loc] = _empty_summary(branch)
+            empty += 1
+    logger.info("Workforce summarised for %d employees at %d locations (%d not in the branch file, "
+                "%d branches without employees).", len(codes), k, unmatched, empty)
+    return summary
+
+
+BRANCH_WORKFORCE_COLUMNS = (['location_id', 'bank_name', 'branch_name', 'headcount', 'active', 'terminated',
+                             'payroll', 'mean_salary', 'tenure_min', 'tenure_median', 'tenure_mean', 'tenure_max']
+                            + [f"tenure_{label}" for label in TENURE_BAND_LABELS])
+
+def branch_workforce_to_row(loc, s):
+    return ([loc, s['bank_name'], s['branch_name'], s['headcount'], s['active'], s['terminated'],
+             round(s['payroll'], 2), None if s['mean_salary'] is None else round(s['mean_salary'], 2),
+             s['tenure_min'], s['tenure_median'], None if s['tenure_mean'] is None else round(s['tenure_mean'], 2),
+             s['tenure_max']]
+            + [s['tenure_bands'][label] for label in TENURE_BAND_LABELS])
+
+def write_branch_workforce_to_file(summary, outfile):
+    write_csv_rows(outfile, BRANCH_WORKFORCE_COLUMNS,
+                   (branch_workforce_to_row(loc, s) for loc, s in summary.items()))
+    logger.info("Branch workforce data was written to csv file at location %s.", outfile)
+
+
+if __name__ == "__main__":
+    from bank_data_quality_checks import configure_logging
+    from bank_synthetic_data import generate_rows
+    configure_logging()
+    num_employees = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    num_branches = max(1, num_employees//1000)
+    counts = {'branches': num_branches}
+    branches = {r[2]: Branch(r[0], r[1], r[2], r[3]) for r in generate_rows('branches', num_branches)}
+    employees = {r[0]: Employee(*r) for r in generate_rows('employees', num_employees, counts=counts)}
+
+    start = time.perf_counter()
+    workforce = branch_workforce(employees, branches)
+    elapsed = time.perf_counter() - start
+    print(f"{num_employees:,} employees at {len(workforce):,} locations summarised in {elapsed:.3f}s")
+
+
+### EOF
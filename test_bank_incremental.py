@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+
+"""
+@Date: 2026-10-18
+
+Tests for "bank_incremental.py": delta files, compaction, torn delta lines
+and detaching the change tracker.
+
+"""
+
+import os
+
+import bank_classes_and_io_funcs
+from bank_classes_and_io_funcs import load_checking_file_to_dict, load_customer_file_to_dict
+from bank_incremental import DELTA_SUFFIX, ChangeTracker, IncrementalStore, load_incremental_file_to_dict
+
+
+SAMPLE_INPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_input')
+
+
+def _customers():
+    return load_customer_file_to_dict(os.path.join(SAMPLE_INPUT, "Customers.csv"))
+
+
+def test_persist_and_reload(tmp_path):
+    path = str(tmp_path / 'Customers.csv')
+    with ChangeTracker() as tracker:
+        customers = tracker.track('customers', _customers())
+        store = IncrementalStore(tracker, {'customers': path})
+        customers['600000'].set_last_name('Smith-Coleman')
+        del customers['600001']
+        assert store.persist() == {'customers': 2}
+        assert store.persist() == {}
+
+    reloaded = load_incremental_file_to_dict('customers', path)
+    assert reloaded['600000'].get_last_name() == 'Smith-Coleman'
+    assert '600001' not in reloaded
+    assert len(reloaded) == len(customers)
+
+
+def test_money_movements_are_tracked(tmp_path):
+    path = str(tmp_path / 'CheckingAccounts.csv')
+    with ChangeTracker() as tracker:
+        checking = tracker.track('checking', load_checking_file_to_dict(os.path.join(SAMPLE_INPUT, "CheckingAccounts.csv")))
+        store = IncrementalStore(tracker, {'checking': path})
+        checking['168555105'].deposit(100)
+        store.persist()
+    assert load_incremental_file_to_dict('checking', path)['168555105'].get_balance() == 1108.95
+
+
+def test_compact_survives_a_crash_before_the_delta_is_removed(tmp_path, monkeypatch):
+    path = str(tmp_path / 'Customers.csv')
+    with ChangeTracker() as tracker:
+        customers = tracker.track('customers', _customers())
+        store = IncrementalStore(tracker, {'customers': path})
+        customers['600000'].set_last_name('Old')
+        store.persist()
+        customers['600000'].set_last_name('New')
+        del customers['600001']
+
+        def crash(path):
+            raise KeyboardInterrupt
+        monkeypatch.setattr(os, 'remove', crash)
+        try:
+            store.compact()
+        except KeyboardInterrupt:
+            pass
+        monkeypatch.undo()
+
+    assert os.path.exists(path + DELTA_SUFFIX)
+    reloaded = load_incremental_file_to_dict('customers', path)
+    assert reloaded['600000'].get_last_name() == 'New'
+    assert '600001' not in reloaded
+
+
+def test_torn_delta_line_is_ignored_and_dropped(tmp_path):
+    path = str(tmp_path / 'Customers.csv')
+    with ChangeTracker() as tracker:
+        customers = tracker.track('customers', _customers())
+        store = IncrementalStore(tracker, {'customers': path})
+        customers['600000'].set_last_name('First')
+        store.persist()
+        with open(path + DELTA_SUFFIX, 'rb+') as file:
+            data = file.read()
+            # a crash in the middle of the next row, cut inside its last field
+            file.write(data[data.index(b'\n') + 1:-3].replace(b'First', b'Torn'))
+
+        assert load_incremental_file_to_dict('customers', path)['600000'].get_last_name() == 'First'
+
+        customers['600002'].set_last_name('Second')
+        store.persist()
+
+    reloaded = load_incremental_file_to_dict('customers', path)
+    assert reloaded['600000'].get_last_name() == 'First'
+    assert reloaded['600002'].get_last_name() == 'Second'
+
+
+def test_close_removes_the_listeners():
+    changes = list(bank_classes_and_io_funcs._change_listeners)
+    movements = list(bank_classes_and_io_funcs._movement_listeners)
+    tracker = ChangeTracker()
+    customers = tracker.track('customers', _customers())
+    tracker.close()
+    tracker.close()
+    assert bank_classes_and_io_funcs._change_listeners == changes
+    assert bank_classes_and_io_funcs._movement_listeners == movements
+    customers['600000'].set_last_name('Untracked')
+    assert not tracker.changes['customers']
+
+
+### EOF
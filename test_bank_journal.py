@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+
+"""
+@Date: 2026-10-18
+
+Tests for "bank_journal.py": replay after a crash, group commit, checkpoint,
+torn tails and the money mode header.
+
+"""
+
+import os
+import time
+
+import pytest
+
+from bank_classes_and_io_funcs import load_checking_file_to_dict, load_credit_card_file_to_dict
+from bank_journal import TransactionJournal, iter_journal, journal_money_mode, replay_journal
+from bank_money import CENTS, FLOAT, money_mode
+
+
+SAMPLE_INPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_input')
+
+
+def _checking():
+    return load_checking_file_to_dict(os.path.join(SAMPLE_INPUT, "CheckingAccounts.csv"))
+
+
+def _credit_cards():
+    return load_credit_card_file_to_dict(os.path.join(SAMPLE_INPUT, "CreditCards.csv"))
+
+
+def test_replay_restores_the_last_balances(tmp_path):
+    path = str(tmp_path / 'bank.journal')
+    checking, cards = _checking(), _credit_cards()
+    card = next(iter(cards))
+    with TransactionJournal(path):
+        checking['168555105'].deposit(100)
+        checking['168555105'].deposit(50)
+        cards[card].make_purchase(25)
+
+    reloaded, reloaded_cards = _checking(), _credit_cards()
+    result = replay_journal(path, {'checking': reloaded, 'credit_cards': reloaded_cards})
+    assert result == {'records': 3, 'restored': 2, 'missing': 0}
+    assert reloaded['168555105'].get_balance() == checking['168555105'].get_balance()
+    assert reloaded_cards[card].get_balance() == cards[card].get_balance()
+    assert reloaded_cards[card].get_available_credit() == cards[card].get_available_credit()
+
+
+def test_timer_commits_a_lone_record(tmp_path):
+    path = str(tmp_path / 'bank.journal')
+    checking = _checking()
+    journal = TransactionJournal(path, group_size=1000, group_interval=0.05)
+    journal.attach()
+    try:
+        checking['168555105'].deposit(100)
+        deadline = time.monotonic() + 2
+        while not list(iter_journal(path)) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(list(iter_journal(path))) == 1
+    finally:
+        journal.close()
+
+
+def test_checkpoint_keeps_pending_records(tmp_path):
+    path = str(tmp_path / 'bank.journal')
+    checking = _checking()
+    with TransactionJournal(path, group_size=1000, group_interval=60) as journal:
+        checking['168555105'].deposit(100)
+        journal.checkpoint()
+    assert [record[:3] for record in iter_journal(path)] == [('checking', 'deposit', '168555105')]
+
+
+def test_torn_tail_is_dropped(tmp_path):
+    path = str(tmp_path / 'bank.journal')
+    checking = _checking()
+    with TransactionJournal(path):
+        checking['168555105'].deposit(100)
+        checking['168555100'].deposit(100)
+    size = os.path.getsize(path)
+    os.truncate(path, size - 3)
+    assert len(list(iter_journal(path))) == 1
+
+    with TransactionJournal(path):
+        checking['168555100'].deposit(1)
+    assert [record[2] for record in iter_journal(path)] == ['168555105', '168555100']
+
+
+def test_replay_converts_between_money_modes(tmp_path):
+    path = str(tmp_path / 'bank.journal')
+    with money_mode(CENTS):
+        checking = _checking()
+        with TransactionJournal(path):
+            checking['168555105'].deposit(10050)
+    assert journal_money_mode(path) == CENTS
+
+    with money_mode(FLOAT):
+        reloaded = _checking()
+        replay_journal(path, {'checking': reloaded})
+        assert reloaded['168555105'].get_balance() == 1109.45
+
+
+def test_journal_refuses_records_of_the_other_mode(tmp_path):
+    path = str(tmp_path / 'bank.journal')
+    checking = _checking()
+    with TransactionJournal(path):
+        checking['168555105'].deposit(100)
+    with money_mode(CENTS), pytest.raises(ValueError):
+        TransactionJournal(path)
+
+
+def test_file_without_header_is_refused(tmp_path):
+    path = tmp_path / 'bank.journal'
+    path.write_bytes(b'\0' * 40)
+    with pytest.raises(ValueError):
+        replay_journal(str(path), {})
+
+
+### EOF
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+
+"""
+@Date: 2026-10-18
+
+Tests for the cents money mode of "bank_money.py" and the modules that keep
+amounts in it: loaders, interest, projections, aggregates and snapshots.
+
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from bank_aggregates import AggregateRegistry
+from bank_classes_and_io_funcs import load_checking_file_to_dict, load_savings_file_to_dict
+from bank_money import (CENTS, FLOAT, compounded_cents, format_cents, format_money, get_money_mode,
+                        money_mode, monthly_interest_cents, monthly_interest_cents_array, set_money_mode,
+                        to_cents)
+from bank_projection import project_savings_balances
+from bank_snapshot import load_snapshot, save_snapshot
+
+
+SAMPLE_INPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_input')
+
+
+def _savings():
+    return load_savings_file_to_dict(os.path.join(SAMPLE_INPUT, "SavingsAccounts.csv"))
+
+
+def test_to_cents():
+    assert to_cents('1234.56') == 123456
+    assert to_cents('-0.07') == -7
+    assert to_cents(0.1) == 10
+    assert to_cents(12) == 1200
+    assert to_cents('1.005') == 100          # half to even
+    assert to_cents('1.015') == 102
+    assert to_cents('1.0051') == 101
+    assert to_cents('1e2') == 10000
+    with pytest.raises(ValueError):
+        to_cents('12,50')
+
+
+def test_formatting():
+    assert format_cents(-123456) == '-1234.56'
+    assert format_cents(5) == '0.05'
+    with money_mode(CENTS):
+        assert format_money(123456789) == '$1,234,567.89'
+    assert format_money(1234567.891) == '$1,234,567.89'
+
+
+def test_money_mode_is_restored():
+    with money_mode(CENTS):
+        assert get_money_mode() == CENTS
+    assert get_money_mode() == FLOAT
+    with pytest.raises(ValueError):
+        set_money_mode('dollars')
+
+
+def test_interest_rounds_half_to_even():
+    # 1500 cents at 8% a year is exactly 10 cents a month, 1503 cents gives 10.02
+    assert monthly_interest_cents(1500, 0.08) == 10
+    assert monthly_interest_cents(1503, 0.08) == 10
+    # 0.06/12 of 100 cents is exactly half a cent
+    assert monthly_interest_cents(100, 0.06) == 0
+    assert monthly_interest_cents(300, 0.06) == 2
+    assert compounded_cents(100000, 0.12, 0) == 100000
+    assert compounded_cents(compounded_cents(100000, 0.12, 12), 0.12, -12) == 100000
+
+
+def test_interest_array_matches_scalar():
+    rng = np.random.default_rng(0)
+    cents = rng.integers(-10**9, 10**9, 2000)
+    rates = rng.choice([0.008, 0.0085, 0.1999, 0.123456789, 0.06], 2000)
+    expected = [monthly_interest_cents(int(c), float(r)) for c, r in zip(cents, rates)]
+    assert monthly_interest_cents_array(cents, rates).tolist() == expected
+
+
+def test_loaders_hold_cents():
+    with money_mode(CENTS):
+        savings = _savings()
+        acct = savings['168444555']
+        assert acct.get_balance() == 1500045
+        acct.deposit(70000)
+        assert acct.get_balance() == 1570045
+        assert acct.get_compounded_balance(12) == compounded_cents(1570045, acct.annual_interest_rate, 12)
+
+
+def test_checking_fees_in_cents(capsys):
+    with money_mode(CENTS):
+        checking = load_checking_file_to_dict(os.path.join(SAMPLE_INPUT, "CheckingAccounts.csv"))
+        acct = checking['168555105']
+        before = acct.get_balance()
+        acct.withdraw(1000)
+        assert isinstance(acct.get_balance(), int)
+        assert acct.get_balance() == before - 1000 - acct.WITHDRAWAL_FEE_CENTS
+
+
+def test_projection_matches_get_compounded_balance():
+    horizons = [1, 12, 60, 120, 360]
+    with money_mode(CENTS):
+        savings = _savings()
+        projection = project_savings_balances(savings, horizons)
+        assert projection.balances.dtype == np.int64
+        for key, acct in savings.items():
+            assert projection.for_account(key).tolist() == [acct.get_compounded_balance(h) for h in horizons]
+
+
+def test_aggregates_stay_int():
+    with money_mode(CENTS):
+        registry = AggregateRegistry()
+        savings = registry.track('savings', _savings())
+        with registry:
+            savings['168444555'].deposit(1)
+        registry.rebuild()
+        total = registry.total('savings')
+        assert isinstance(total, int)
+        assert total == sum(acct.get_balance() for acct in savings.values())
+
+
+def test_snapshot_converts_between_modes(tmp_path):
+    path = str(tmp_path / 'bank.snap')
+    with money_mode(CENTS):
+        save_snapshot(path, savings=_savings())
+        snap = load_snapshot(path)
+        assert snap.money_mode == CENTS
+        assert snap.savings['168444555'].get_balance() == 1500045
+        snap.close()
+    snap = load_snapshot(path)
+    assert snap.savings['168444555'].get_balance() == 15000.45
+    snap.close()
+
+
+### EOF
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+
+"""
+@Date: 2026-10-18
+
+Tests for "bank_service.py": requests over a live connection, malformed
+requests and the rollback of a batch whose persist fails.
+
+"""
+
+import asyncio
+import json
+import os
+
+import pytest
+
+from bank_classes_and_io_funcs import load_checking_file_to_dict
+from bank_money import CENTS, money_mode
+from bank_service import BankService, RequestError
+
+
+SAMPLE_INPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_input')
+
+
+def _stores():
+    return {'checking': load_checking_file_to_dict(os.path.join(SAMPLE_INPUT, "CheckingAccounts.csv"))}
+
+
+async def _exchange(service, requests):
+    # sends requests on one connection and returns the responses by id
+    server = await service.start(port=0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        for request in requests:
+            writer.write((request if isinstance(request, bytes) else json.dumps(request).encode()) + b'\n')
+        await writer.drain()
+        writer.write_eof()
+        responses = {}
+        while True:
+            line = await asyncio.wait_for(reader.readline(), 5)
+            if not line:
+                break
+            response = json.loads(line)
+            responses[response['id']] = response
+        writer.close()
+        return responses
+    finally:
+        await service.stop()
+
+
+def test_deposit_and_balance():
+    service = BankService(_stores())
+    responses = asyncio.run(_exchange(service, [
+        {'id': 1, 'op': 'deposit', 'kind': 'checking', 'key': '168555105', 'amount': 100},
+        {'id': 2, 'op': 'balance', 'kind': 'checking', 'key': '168555105'},
+    ]))
+    assert responses[1] == {'id': 1, 'ok': True, 'balance': 1108.95}
+    assert responses[2] == {'id': 2, 'ok': True, 'balance': 1108.95}
+
+
+def test_malformed_requests_keep_the_connection():
+    service = BankService(_stores())
+    responses = asyncio.run(_exchange(service, [
+        {'id': 1, 'op': 'deposit', 'kind': 'checking', 'key': '168555105', 'amount': 100},
+        {'id': 2, 'op': 'balance', 'kind': 'checking', 'key': []},
+        {'id': 3, 'op': 'deposit', 'kind': 'checking', 'key': '168555105', 'amount': 10**400},
+        {'id': 4, 'op': {}, 'kind': 'checking', 'key': '168555105'},
+        {'id': 5, 'op': 'deposit', 'kind': ['checking'], 'key': '168555105', 'amount': 1},
+        {'id': 6, 'op': 'deposit', 'kind': 'checking', 'key': '168555105', 'amount': float('nan')},
+        b'[1, 2]',
+        b'not json',
+        {'id': 7, 'op': 'balance', 'kind': 'checking', 'key': '168555105'},
+    ]))
+    assert responses[1]['ok'] is True
+    for request_id in (2, 3, 4, 5, 6):
+        assert responses[request_id]['ok'] is False
+    assert responses[None]['ok'] is False
+    assert responses[7] == {'id': 7, 'ok': True, 'balance': 1108.95}
+    assert service.stats['errors'] == 7
+
+
+def test_handle_rejects_bad_amounts():
+    service = BankService(_stores())
+    for amount in (0, -5, True, '10', 10**400, float('inf')):
+        with pytest.raises(RequestError):
+            service.handle({'op': 'deposit', 'kind': 'checking', 'key': '168555105', 'amount': amount})
+    assert service.stores['checking']['168555105'].get_balance() == 1008.95
+
+
+def test_cents_amounts_must_be_whole():
+    with money_mode(CENTS):
+        service = BankService(_stores())
+        with pytest.raises(RequestError):
+            service.handle({'op': 'deposit', 'kind': 'checking', 'key': '168555105', 'amount': 10.5})
+        state, is_write = service.handle({'op': 'deposit', 'kind': 'checking', 'key': '168555105', 'amount': 1050})
+        assert state == {'balance': 101945} and is_write
+
+
+def test_failed_persist_rolls_back():
+    def persist():
+        raise OSError("disk full")
+
+    service = BankService(_stores(), persist=persist)
+    responses = asyncio.run(_exchange(service, [
+        {'id': 1, 'op': 'deposit', 'kind': 'checking', 'key': '168555105', 'amount': 100},
+        {'id': 2, 'op': 'withdraw', 'kind': 'checking', 'key': '168555105', 'amount': 50},
+    ]))
+    assert responses[1] == {'id': 1, 'ok': False, 'error': 'Write could not be persisted.'}
+    assert responses[2]['ok'] is False
+    assert service.stores['checking']['168555105'].get_balance() == 1008.95
+
+
+### EOF